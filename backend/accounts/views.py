@@ -93,38 +93,15 @@ def profile_view(request):
 @login_required
 def customer_dashboard(request):
     """Display customer dashboard with appointment statistics."""
-    from backend.appointments.models import Appointment
-    from backend.services.models import Service
+    from backend.appointments.dashboards import get_customer_dashboard
     from django.utils import timezone
-    from django.db.models import Count, Q
-    
-    today = timezone.now().date()
-    
-    # Get user's appointments
-    appointments = Appointment.objects.filter(
-        user=request.user,
-        schedule__date__gte=today
-    ).select_related('service', 'staff', 'schedule').order_by('schedule__date', 'schedule__time_slot')[:5]
     
-    # Get appointment counts with single aggregated query (optimized)
-    stats = Appointment.objects.filter(user=request.user).aggregate(
-        upcoming=Count('id', filter=Q(
-            schedule__date__gte=today,
-            status__in=['Pending', 'Confirmed']
-        )),
-        completed=Count('id', filter=Q(status='Completed'))
-    )
-    
-    upcoming_count = stats['upcoming']
-    completed_count = stats['completed']
-    total_services = Service.objects.count()
+    # Cached per customer until one of their appointments changes
+    dashboard = get_customer_dashboard(request.user, timezone.now().date())
     
     context = {
         'user': request.user,
-        'appointments': appointments,
-        'upcoming_count': upcoming_count,
-        'completed_count': completed_count,
-        'total_services': total_services,
+        **dashboard,
     }
     
     return render(request, 'dashboard.html', context)
@@ -134,19 +111,12 @@ def customer_dashboard(request):
 def admin_dashboard(request):
     """Display admin dashboard."""
     
-    from backend.services.models import Service
-    from backend.staff.models import Staff
     from backend.appointments.models import Appointment
-    from backend.schedules.models import Schedule
-    from django.db.models import Count
+    from backend.appointments.counters import global_totals
     
-    # Get counts in a single query using aggregation where possible
-    stats = {
-        'total_services': Service.objects.count(),
-        'total_staff': Staff.objects.count(),
-        'total_appointments': Appointment.objects.count(),
-        'total_schedules': Schedule.objects.count(),
-    }
+    # Read the maintained totals instead of counting four tables
+    totals = global_totals()
+    stats = {f'total_{name}': count for name, count in totals.items()}
     
     # Get recent appointments with optimized query
     recent_appointments = Appointment.objects.select_related(
@@ -165,73 +135,21 @@ def admin_dashboard(request):
 @role_required('Staff')
 def staff_dashboard(request):
     """Display staff dashboard with their assignments and schedule."""
-    from backend.staff.models import Staff
-    from backend.appointments.models import Appointment
-    from backend.schedules.models import Schedule
+    from backend.appointments.dashboards import get_staff_dashboard, get_staff_profile
     from django.utils import timezone
-    from django.db.models import Q, Count
     
-    try:
-        staff_profile = Staff.objects.get(user=request.user)
-    except Staff.DoesNotExist:
+    staff_profile = get_staff_profile(request.user)
+    if staff_profile is None:
         messages.error(request, 'Staff profile not found. Please contact admin.')
         return redirect('profile')
     
-    # Get today's appointments for this staff member
-    today = timezone.now().date()
-    todays_appointments = Appointment.objects.filter(
-        staff=staff_profile,
-        schedule__date=today
-    ).select_related('user', 'service', 'schedule').order_by('schedule__time_slot')
-    
-    # Get upcoming appointments (next 7 days)
-    upcoming_appointments = Appointment.objects.filter(
-        staff=staff_profile,
-        schedule__date__gt=today,
-        schedule__date__lte=today + timezone.timedelta(days=7),
-        status__in=['Pending', 'Confirmed']
-    ).select_related('user', 'service', 'schedule').order_by('schedule__date', 'schedule__time_slot')[:10]
-    
-    # Get stats with single aggregated query (optimized)
-    stats = Appointment.objects.filter(staff=staff_profile).aggregate(
-        total=Count('id'),
-        pending=Count('id', filter=Q(status='Pending')),
-        completed_today=Count('id', filter=Q(
-            schedule__date=today,
-            status='Completed'
-        ))
-    )
-    
-    total_appointments = stats['total']
-    pending_appointments = stats['pending']
-    completed_today = stats['completed_today']
-    
-    # Get staff schedule for the week
-    week_schedules = Schedule.objects.filter(
-        staff=staff_profile,
-        date__gte=today,
-        date__lte=today + timezone.timedelta(days=7)
-    ).order_by('date', 'time_slot')
-    
-    # Group schedules by date for tabbed view
-    from collections import defaultdict
-    schedules_by_day = defaultdict(list)
-    for schedule in week_schedules:
-        schedules_by_day[schedule.date].append(schedule)
-    
-    # Convert to sorted list of tuples (date, schedules)
-    schedules_by_day = sorted(schedules_by_day.items())
+    # Cached per staff member until one of their appointments or slots changes
+    dashboard = get_staff_dashboard(staff_profile, timezone.now().date())
     
     context = {
         'user': request.user,
         'staff_profile': staff_profile,
-        'todays_appointments': todays_appointments,
-        'upcoming_appointments': upcoming_appointments,
-        'total_appointments': total_appointments,
-        'completed_today': completed_today,
-        'pending_appointments': pending_appointments,
-        'week_schedules': week_schedules,
-        'schedules_by_day': schedules_by_day,
+        **dashboard,
     }
     
     return render(request, 'staff_dashboard.html', context)
@@ -0,0 +1,216 @@
+"""
+Async versions of the public read endpoints.
+
+DRF views are synchronous, so under ASGI every request to them takes a
+worker thread for its whole life, including time spent waiting on the
+cache or the database. These plain async Django views answer the same
+URLs with the same responses using the async cache and ORM APIs, so one
+process can serve many concurrent availability lookups while they wait.
+
+urls.py routes to them when API_ASYNC_VIEWS is on, which asgi.py turns
+on by default. Under WSGI they would run through async_to_sync on every
+request, so the DRF views stay in place there.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from backend.staff.models import Staff
+from backend.services.catalog import aget_active_services, aget_catalog_version, aget_service
+from backend.schedules.allocation import fitting_starts
+from backend.schedules.availability import aavailability_version, aget_available_slots
+from backend.schedules.holds import aactive_holds, held_by_others
+
+from .conditional import aconditional_response, make_etag
+from .serializers import (
+    ServiceSerializer,
+    StaffSerializer,
+    get_serializer_options,
+    wants_sideload,
+    build_lookup_tables,
+    reshape_data
+)
+from .views import _database_schedule_list, _latest, _parse_date_param, _parse_time_param, _slot_within
+
+
+def _json(data, status=200):
+    """Render data the way the DRF views' JSONRenderer does."""
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def _not_found(model_name):
+    return _json({'detail': f'No {model_name} matches the given query.'}, status=404)
+
+
+def _read_only(view):
+    """Answer GET and HEAD only, like @api_view(['GET'])."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return _json({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        # Query parameter parsing shared with the DRF views
+        return await view(Request(request), *args, **kwargs)
+    return wrapper
+
+
+def _serialize_list(request, serializer_class, instances):
+    """Like views._serialize_list(), for instances that are already loaded."""
+    options = get_serializer_options(request)
+    serializer = serializer_class(instances, many=True, **options)
+    data = serializer.data
+
+    if options.get('compact') and wants_sideload(request):
+        return _json({'results': data, 'included': build_lookup_tables(serializer, instances)})
+    return _json(data)
+
+
+@_read_only
+async def service_list_api(request):
+    """Get all active services. Revalidated against the catalog version."""
+    async def build():
+        return _serialize_list(request, ServiceSerializer, await aget_active_services())
+
+    etag = make_etag(request, 'services', await aget_catalog_version())
+    return await aconditional_response(request, build, etag=etag)
+
+
+@_read_only
+async def staff_list_api(request):
+    """
+    Get all available staff members.
+    Filter by service_id if provided in query parameters.
+    """
+    service_id = request.query_params.get('service_id')
+
+    staff = Staff.objects.filter(is_available=True).select_related('user')
+    if service_id:
+        staff = staff.filter(staff_services__service_id=service_id).distinct()
+
+    aggregates = {
+        'count': Count('id', distinct=True),
+        'staff_modified': Max('updated_at'),
+        'user_modified': Max('user__updated_at'),
+    }
+    if service_id:
+        aggregates['newest_assignment'] = Max('staff_services__id')
+    validators = await staff.aaggregate(**aggregates)
+
+    async def build():
+        return _serialize_list(request, StaffSerializer, [member async for member in staff])
+
+    return await aconditional_response(
+        request,
+        build,
+        etag=make_etag(request, 'staff', *sorted(validators.items())),
+        last_modified=_latest(validators['staff_modified'], validators['user_modified'])
+    )
+
+
+@_read_only
+async def staff_detail_api(request, staff_id):
+    """Get staff details. Revalidated against the staff and user timestamps."""
+    staff = await Staff.objects.select_related('user').filter(id=staff_id).afirst()
+    if staff is None:
+        return _not_found('Staff')
+
+    async def build():
+        return _json(StaffSerializer(staff).data)
+
+    return await aconditional_response(
+        request,
+        build,
+        etag=make_etag(request, 'staff', staff.id, staff.updated_at, staff.user.updated_at),
+        last_modified=_latest(staff.updated_at, staff.user.updated_at)
+    )
+
+
+@_read_only
+async def schedule_list_api(request):
+    """
+    Get available schedules.
+    Per-staff lookups are answered from the in-memory availability index
+    without leaving the event loop; listings across all staff run the
+    database query in a worker thread.
+
+    Takes the same query parameters as views.schedule_list_api.
+    """
+    staff_id = request.query_params.get('staff_id')
+    date = request.query_params.get('date')
+
+    if date:
+        date = _parse_date_param(date)
+        if date is None:
+            return _json({'error': 'date must be a date in YYYY-MM-DD format.'}, status=400)
+
+    time_range = {}
+    for param in ('time_from', 'time_to'):
+        if request.query_params.get(param):
+            value = _parse_time_param(request.query_params[param])
+            if value is None:
+                return _json({'error': f'{param} must be a time in HH:MM format.'}, status=400)
+            time_range[param] = value
+
+    if staff_id and not staff_id.isdigit():
+        return _json({'error': 'staff_id must be a number.'}, status=400)
+
+    duration = None
+    service_id = request.query_params.get('service_id')
+    if service_id:
+        if not service_id.isdigit():
+            return _json({'error': 'service_id must be a number.'}, status=400)
+        service = await aget_service(service_id)
+        if service is None:
+            return _not_found('Service')
+        duration = service.duration
+
+    if staff_id:
+        staff_id = int(staff_id)
+        version = await aavailability_version(staff_id)
+        holds = await aactive_holds([staff_id])
+
+        async def build():
+            return await _indexed_schedule_list(request, staff_id, date, time_range, duration, held, version)
+    else:
+        version = await aavailability_version()
+        holds = await aactive_holds([pk async for pk in Staff.objects.values_list('id', flat=True)])
+
+        async def build():
+            response = await sync_to_async(_database_schedule_list)(
+                request, staff_id, date, time_range, duration, held
+            )
+            return _json(response.data)
+
+    # Authenticating the session queries the database, so only done when
+    # someone holds a slot
+    held = held_by_others(holds, await _auser_id(request)) if holds else frozenset()
+
+    etag = make_etag(request, 'schedules', version, timezone.now().date(), duration, sorted(held))
+    return await aconditional_response(request, build, etag=etag)
+
+
+async def _auser_id(request):
+    """Id of the signed-in user, or None; authenticates in a worker thread."""
+    return await sync_to_async(lambda: request.user.id)()
+
+
+async def _indexed_schedule_list(request, staff_id, date, time_range, duration, held=frozenset(), version=None):
+    """Build the schedule list of one staff member from the availability index."""
+    slots = await aget_available_slots(staff_id, date.isoformat() if date else None, version)
+    if held:
+        slots = [slot for slot in slots if (staff_id, slot['date'], slot['time_slot']) not in held]
+    if time_range:
+        slots = [slot for slot in slots if _slot_within(slot, **time_range)]
+    if duration:
+        slots = fitting_starts(slots, duration)
+    options = get_serializer_options(request)
+    if not options:
+        return _json(slots)
+
+    tables = {} if options.get('compact') and wants_sideload(request) else None
+    data = reshape_data(slots, tables=tables, **options)
+    return _json(data if tables is None else {'results': data, 'included': tables})
@@ -0,0 +1,80 @@
+"""
+Conditional GET support for read endpoints.
+
+Validators are derived from change counters the app already maintains (the
+service catalog version, availability generations) or from updated_at
+columns, so answering a client that already holds the current body costs a
+cache read or one aggregate query and a 304, instead of the full query,
+serialization and payload.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(request, *parts):
+    """
+    Build an ETag for a response from its validator parts.
+
+    The query string and Accept header are folded in, since they change the
+    body (?fields=, ?compact=, browsable API vs. JSON) for the same data.
+
+    Args:
+        request: Incoming request
+        *parts: Values that change whenever the underlying data changes
+
+    Returns:
+        Quoted ETag string
+    """
+    raw = '|'.join(str(part) for part in parts)
+    raw += '|' + request.META.get('QUERY_STRING', '')
+    raw += '|' + request.META.get('HTTP_ACCEPT', '')
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def conditional_response(request, build, etag=None, last_modified=None):
+    """
+    Answer a GET with 304 Not Modified when the client's copy is current.
+
+    Args:
+        request: Incoming request
+        build: Callable returning the full Response; only called on a miss
+        etag: Optional ETag from make_etag()
+        last_modified: Optional datetime of the newest change
+
+    Returns:
+        HttpResponseNotModified, or the built Response with validators set
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build()
+        if response.status_code != 200:
+            return response
+
+    return _set_validators(response, etag, timestamp)
+
+
+async def aconditional_response(request, build, etag=None, last_modified=None):
+    """Like conditional_response(), for async views; build is a coroutine function."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = await build()
+        if response.status_code != 200:
+            return response
+
+    return _set_validators(response, etag, timestamp)
+
+
+def _set_validators(response, etag, timestamp):
+    if etag:
+        response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    # Cacheable, but clients must revalidate before reuse
+    patch_cache_control(response, no_cache=True)
+    return response
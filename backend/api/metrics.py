@@ -0,0 +1,83 @@
+"""
+Prometheus metrics for request latency, throughput and booking outcomes.
+
+Metrics live in prometheus_client's in-process registry. Under gunicorn
+each worker has its own, so with PROMETHEUS_MULTIPROC_DIR set every worker
+writes its samples to memory-mapped files in that shared directory and the
+scrape endpoint aggregates all of them; gunicorn.conf.py empties the
+directory on start and retires the files of exited workers.
+"""
+import hmac
+import os
+
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest,
+)
+from prometheus_client import multiprocess
+
+
+REQUEST_LATENCY = Histogram(
+    'salon_http_request_duration_seconds',
+    'Time from request to response headers, by URL route',
+    ['route', 'method']
+)
+
+REQUESTS = Counter(
+    'salon_http_requests_total',
+    'Requests served, by URL route and status code',
+    ['route', 'method', 'status']
+)
+
+BOOKINGS = Counter(
+    'salon_booking_outcomes_total',
+    'Booking attempts, by how they ended',
+    ['source', 'outcome']
+)
+
+# Booking outcomes
+BOOKED = 'success'
+SLOT_TAKEN = 'slot_taken'
+NOT_FOUND = 'not_found'
+FAILED = 'error'
+
+
+def record_booking(source, outcome, count=1):
+    """
+    Count booking attempts.
+
+    Args:
+        source: Where the booking came from ('api', 'batch' or 'web')
+        outcome: BOOKED, SLOT_TAKEN, NOT_FOUND or FAILED
+        count: Number of appointments the attempt covered
+    """
+    BOOKINGS.labels(source=source, outcome=outcome).inc(count)
+
+
+def _registry():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Fresh registry per scrape, reading every worker's files
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view(request):
+    """
+    Serve all metrics in the Prometheus text format.
+
+    When METRICS_TOKEN is set, scrapers must send it as a bearer token.
+    Without one the endpoint is only served under DEBUG, since route names,
+    request rates and booking outcomes are not for the public.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token and not settings.DEBUG:
+        return HttpResponse('Not Found', status=404, content_type='text/plain')
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied, token):
+            return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+
+    return HttpResponse(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
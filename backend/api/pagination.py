@@ -0,0 +1,109 @@
+"""
+Keyset (cursor) pagination for API list endpoints.
+
+Pages are addressed by the (created_at, id) of the last row already seen
+instead of an OFFSET, so every page is a bounded index range scan no matter
+how deep the client has paged or how large the table has grown.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination:
+    """
+    Forward-only cursor pagination ordered newest first on (created_at, id).
+
+    The id column breaks ties between rows created in the same instant, so
+    no row is skipped or repeated across page boundaries.
+    """
+    page_size = 25
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def __init__(self):
+        self.request = None
+        self.next_cursor = None
+
+    def paginate_queryset(self, queryset, request):
+        """
+        Return one page of rows from the queryset.
+
+        Args:
+            queryset: Queryset to paginate (any ordering is replaced)
+            request: DRF request carrying the cursor and page size
+
+        Returns:
+            List of model instances for the requested page
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by('-created_at', '-id')
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            created_at, pk = self.decode_cursor(encoded)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        # Fetch one extra row to learn whether another page exists
+        rows = list(queryset[:page_size + 1])
+
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            self.next_cursor = self.encode_cursor(last.created_at, last.id)
+        else:
+            self.next_cursor = None
+
+        return rows
+
+    def get_page_size(self, request):
+        """Read the requested page size, clamped to max_page_size."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def encode_cursor(self, created_at, pk):
+        payload = json.dumps([created_at.isoformat(), pk]).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    def decode_cursor(self, encoded):
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii'))
+            created_at, pk = json.loads(raw)
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return created_at, pk
@@ -6,20 +6,110 @@ from backend.schedules.models import Schedule
 from backend.appointments.models import Appointment, Payment
 
 
-class UserSerializer(serializers.ModelSerializer):
+# Nested relations and the lookup-table name their rows are side-loaded under
+RELATION_TABLES = {
+    'user': 'users',
+    'service': 'services',
+    'staff': 'staff',
+    'schedule': 'schedules',
+    'appointment': 'appointments',
+}
+
+TRUTHY = ('1', 'true', 'yes')
+
+
+def _split_expand(expand, name):
+    """Return the sub-paths of ``expand`` below relation ``name``."""
+    prefix = f'{name}.'
+    return [path[len(prefix):] for path in expand if path.startswith(prefix)]
+
+
+def _is_expanded(expand, name):
+    return any(path == name or path.startswith(f'{name}.') for path in expand)
+
+
+def get_serializer_options(request):
+    """
+    Read sparse-fieldset query parameters into serializer keyword arguments.
+    
+    ?fields=id,status    only render these top-level fields
+    ?compact=1           render nested relations as primary keys
+    ?expand=staff.user   keep these relations nested in compact mode
+    
+    Args:
+        request: DRF request
+        
+    Returns:
+        Dict of keyword arguments for DynamicFieldsModelSerializer
+    """
+    params = request.query_params
+    options = {}
+    
+    if params.get('fields'):
+        options['fields'] = [name for name in params['fields'].split(',') if name]
+    if params.get('expand'):
+        options['expand'] = [path for path in params['expand'].split(',') if path]
+    if params.get('compact', '').lower() in TRUTHY:
+        options['compact'] = True
+    
+    return options
+
+
+def wants_sideload(request):
+    """Whether the client asked for a side-loaded lookup table (?sideload=1)."""
+    return request.query_params.get('sideload', '').lower() in TRUTHY
+
+
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer whose output shape is chosen by the caller.
+    
+    Takes three optional keyword arguments:
+        fields: only these top-level fields are rendered
+        compact: nested relations are rendered as primary keys
+        expand: relations (dotted for deeper levels) that stay nested in compact mode
+    """
+    
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        expand = kwargs.pop('expand', None) or []
+        compact = kwargs.pop('compact', False)
+        
+        super().__init__(*args, **kwargs)
+        
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        
+        if compact:
+            for name, field in list(self.fields.items()):
+                if not isinstance(field, serializers.BaseSerializer):
+                    continue
+                if _is_expanded(expand, name):
+                    self.fields[name] = type(field)(
+                        read_only=True,
+                        compact=True,
+                        expand=_split_expand(expand, name)
+                    )
+                else:
+                    # Reads the FK column directly, so no related row is fetched
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+class UserSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'role', 'phone']
         extra_kwargs = {'password': {'write_only': True}}
 
 
-class ServiceSerializer(serializers.ModelSerializer):
+class ServiceSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = Service
         fields = ['id', 'name', 'description', 'price', 'duration', 'is_active']
 
 
-class StaffSerializer(serializers.ModelSerializer):
+class StaffSerializer(DynamicFieldsModelSerializer):
     user = UserSerializer(read_only=True)
     
     class Meta:
@@ -27,15 +117,15 @@ class StaffSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'specialization', 'bio', 'is_available']
 
 
-class ScheduleSerializer(serializers.ModelSerializer):
+class ScheduleSerializer(DynamicFieldsModelSerializer):
     staff = StaffSerializer(read_only=True)
     
     class Meta:
         model = Schedule
-        fields = ['id', 'staff', 'date', 'time_slot', 'availability_status']
+        fields = ['id', 'staff', 'date', 'time_slot', 'start_time', 'end_time', 'availability_status']
 
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(DynamicFieldsModelSerializer):
     user = UserSerializer(read_only=True)
     service = ServiceSerializer(read_only=True)
     staff = StaffSerializer(read_only=True)
@@ -55,9 +145,121 @@ class AppointmentCreateSerializer(serializers.Serializer):
     notes = serializers.CharField(required=False, allow_blank=True)
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class AppointmentItemSerializer(serializers.Serializer):
+    service_id = serializers.IntegerField()
+    staff_id = serializers.IntegerField()
+    date = serializers.DateField()
+    time_slot = serializers.CharField(max_length=50)
+    notes = serializers.CharField(required=False, allow_blank=True)
+
+
+class AppointmentBatchCreateSerializer(serializers.Serializer):
+    MAX_ITEMS = 50
+    
+    user_id = serializers.IntegerField()
+    items = AppointmentItemSerializer(many=True, allow_empty=False)
+    
+    def validate_items(self, items):
+        if len(items) > self.MAX_ITEMS:
+            raise serializers.ValidationError(f'At most {self.MAX_ITEMS} appointments can be booked at once.')
+        return items
+
+
+class PaymentSerializer(DynamicFieldsModelSerializer):
     appointment = AppointmentSerializer(read_only=True)
     
     class Meta:
         model = Payment
         fields = ['id', 'appointment', 'amount', 'payment_date', 'payment_method', 'transaction_id']
+
+
+def build_lookup_tables(serializer, instances):
+    """
+    Collect the related objects referenced by compact rows into lookup tables.
+    
+    Only relations the rows render as IDs are collected, so fields left out
+    with ?fields= add no tables; relations kept nested with ?expand= are
+    walked for the IDs inside them. Related objects are read from the
+    instances already loaded (use select_related on the queryset),
+    de-duplicated by primary key and serialized once each in compact form.
+    
+    Args:
+        serializer: Serializer that rendered the rows, e.g.
+            AppointmentSerializer(instances, many=True, compact=True)
+        instances: Model instances that were serialized
+        
+    Returns:
+        Dict of table name -> {pk: compact representation}
+    """
+    tables = {}
+    _collect_related(getattr(serializer, 'child', serializer), instances, tables)
+    return tables
+
+
+def _collect_related(serializer, instances, tables):
+    declared = type(serializer)._declared_fields
+    for name, field in serializer.fields.items():
+        related_class = type(declared.get(name))
+        if not issubclass(related_class, serializers.BaseSerializer):
+            continue
+        
+        related = {}
+        for instance in instances:
+            obj = getattr(instance, name, None)
+            if obj is not None:
+                related[obj.pk] = obj
+        
+        if isinstance(field, serializers.BaseSerializer):
+            # Expanded: rendered nested, but may hold IDs of its own
+            _collect_related(field, related.values(), tables)
+            continue
+        
+        table = tables.setdefault(RELATION_TABLES.get(name, name), {})
+        new_objects = {pk: obj for pk, obj in related.items() if pk not in table}
+        for pk, obj in new_objects.items():
+            table[pk] = related_class(obj, compact=True).data
+        
+        _collect_related(related_class(compact=True), new_objects.values(), tables)
+
+
+def reshape_data(rows, fields=None, expand=None, compact=False, tables=None):
+    """
+    Apply sparse-fieldset options to rows that are already serialized.
+    
+    Used for responses served from in-memory caches, where re-running the
+    serializers would defeat the cache. Nested dicts are treated as
+    relations exactly like DynamicFieldsModelSerializer treats nested
+    serializers.
+    
+    Args:
+        rows: List of dicts in full (nested) form
+        fields: Optional list of top-level fields to keep
+        expand: Optional relation paths that stay nested in compact mode
+        compact: Render nested relations as primary keys
+        tables: Optional dict that collects side-loaded related rows
+        
+    Returns:
+        List of reshaped dicts
+    """
+    expand = expand or []
+    return [_reshape_row(row, fields, expand, compact, tables) for row in rows]
+
+
+def _reshape_row(row, fields, expand, compact, tables):
+    shaped = {}
+    for name, value in row.items():
+        if fields and name not in fields:
+            continue
+        
+        if compact and isinstance(value, dict):
+            if _is_expanded(expand, name):
+                value = _reshape_row(value, None, _split_expand(expand, name), True, tables)
+            else:
+                if tables is not None:
+                    table = tables.setdefault(RELATION_TABLES.get(name, name), {})
+                    if value['id'] not in table:
+                        table[value['id']] = _reshape_row(value, None, [], True, tables)
+                value = value['id']
+        
+        shaped[name] = value
+    return shaped
@@ -0,0 +1,93 @@
+"""
+Server-sent event streams.
+
+These are plain async Django views rather than DRF views: a connection
+spends nearly all of its life asleep between cheap cache reads, so when
+served from the ASGI entry point (salon_booking_system/asgi.py) idle
+booking pages hold no worker threads. Under WSGI every open stream would
+pin a worker, so streams are capped by AVAILABILITY_STREAM_MAX_AGE and
+browsers reconnect transparently.
+"""
+import asyncio
+import json
+import time
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+
+from backend.schedules.availability import aget_availability_events
+
+
+HEARTBEAT_INTERVAL = 15
+
+
+def _format_event(generation, event):
+    return f"id: {generation}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def _availability_events(staff_id, date, since):
+    poll_interval = getattr(settings, 'AVAILABILITY_STREAM_POLL_INTERVAL', 1.0)
+    max_age = getattr(settings, 'AVAILABILITY_STREAM_MAX_AGE', 300)
+
+    # Tell EventSource how soon to reconnect once the stream ends
+    yield f'retry: {int(poll_interval * 1000) + 1000}\n\n'
+
+    if since is None:
+        since, _ = await aget_availability_events(staff_id, None)
+
+    started = last_sent = time.monotonic()
+    while time.monotonic() - started < max_age:
+        since, events = await aget_availability_events(staff_id, since)
+
+        for generation, event in events:
+            # Refresh events carry no date and always go out
+            if date and event.get('date', date) != date:
+                continue
+            yield _format_event(generation, event)
+            last_sent = time.monotonic()
+
+        if time.monotonic() - last_sent >= HEARTBEAT_INTERVAL:
+            yield ': keep-alive\n\n'
+            last_sent = time.monotonic()
+
+        await asyncio.sleep(poll_interval)
+
+
+async def availability_stream(request):
+    """
+    Stream slot claim and release events of one staff member.
+
+    Query parameters: staff_id (required) and date (YYYY-MM-DD) to only
+    receive events for that day.
+
+    Event types are "claimed" and "released" (with schedule_id, date and
+    time_slot), and "refresh", which asks the client to reload its slot
+    list because availability changed in a way that was not recorded slot
+    by slot. Each event's id is the availability generation, so a
+    reconnecting EventSource resumes where it left off via Last-Event-ID.
+    """
+    staff_id = request.GET.get('staff_id', '')
+    if not staff_id.isdigit():
+        return JsonResponse({'error': 'staff_id is required.'}, status=400)
+
+    date = request.GET.get('date')
+    if date:
+        try:
+            valid = parse_date(date) is not None
+        except ValueError:
+            valid = False
+        if not valid:
+            return JsonResponse({'error': 'date must be a date in YYYY-MM-DD format.'}, status=400)
+
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    since = int(last_event_id) if last_event_id.isdigit() else None
+
+    response = StreamingHttpResponse(
+        _availability_events(int(staff_id), date, since),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Keep reverse proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
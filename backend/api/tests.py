@@ -0,0 +1,538 @@
+import datetime
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from prometheus_client import REGISTRY
+
+from backend.accounts.models import User
+from backend.appointments.booking import book_appointment
+from backend.appointments.models import Appointment
+from backend.schedules.availability import aget_availability_events, availability_index, mark_slot_booked
+from backend.schedules.models import AvailabilityRule, Schedule
+from backend.services.catalog import bump_catalog_version
+from backend.services.models import Service
+from backend.staff.models import Staff, StaffService
+
+from . import async_views, streams
+from .metrics import BOOKED, NOT_FOUND, SLOT_TAKEN
+from .serializers import AppointmentSerializer, build_lookup_tables
+
+
+class ScheduleListTests(TestCase):
+    """The schedule list API, sync and async."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user('customer', password='pw')
+        staff_user = User.objects.create_user('stylist', password='pw', role='Staff')
+        cls.staff = Staff.objects.create(user=staff_user, specialization='Hair')
+        cls.day = datetime.date.today() + datetime.timedelta(days=1)
+        Schedule.objects.create(staff=cls.staff, date=cls.day, time_slot='10:00-11:00')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.customer)
+
+    def _async_get(self, params):
+        request = RequestFactory().get('/api/schedules/', params, HTTP_HOST='localhost')
+        request.user = self.customer
+        return async_to_sync(async_views.schedule_list_api)(request)
+
+    def test_non_numeric_staff_id_is_rejected(self):
+        response = self.client.get('/api/schedules/', {'staff_id': 'abc'}, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'staff_id must be a number.'})
+
+    def test_non_numeric_staff_id_is_rejected_async(self):
+        response = self._async_get({'staff_id': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {'error': 'staff_id must be a number.'})
+
+    def test_lists_slots_for_staff(self):
+        response = self.client.get('/api/schedules/', {'staff_id': self.staff.id}, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([slot['time_slot'] for slot in response.json()], ['10:00-11:00'])
+
+    def test_lists_slots_for_staff_async(self):
+        response = self._async_get({'staff_id': self.staff.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([slot['time_slot'] for slot in json.loads(response.content)], ['10:00-11:00'])
+
+
+class CompactSerializerTests(TestCase):
+    """Sparse fieldsets, compact rows and side-loaded lookup tables."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user('customer', password='pw')
+        staff_user = User.objects.create_user('stylist', password='pw', role='Staff')
+        cls.staff = Staff.objects.create(user=staff_user, specialization='Hair')
+        cls.service = Service.objects.create(name='Cut', price=30, duration=60)
+        day = datetime.date.today() + datetime.timedelta(days=1)
+        schedule = Schedule.objects.create(staff=cls.staff, date=day, time_slot='10:00-11:00')
+        Appointment.objects.create(user=cls.customer, service=cls.service, staff=cls.staff, schedule=schedule)
+
+    def instances(self):
+        return list(
+            Appointment.objects.select_related('user', 'service', 'staff__user', 'schedule__staff__user')
+        )
+
+    def test_compact_rows_reference_ids(self):
+        [row] = AppointmentSerializer(self.instances(), many=True, compact=True).data
+        self.assertEqual(row['staff'], self.staff.id)
+        self.assertEqual(row['service'], self.service.id)
+
+    def test_sideload_covers_every_referenced_row(self):
+        instances = self.instances()
+        serializer = AppointmentSerializer(instances, many=True, compact=True)
+        tables = build_lookup_tables(serializer, instances)
+        self.assertEqual(set(tables), {'users', 'services', 'staff', 'schedules'})
+        self.assertEqual(set(tables['users']), {self.customer.id, self.staff.user_id})
+        self.assertEqual(tables['staff'][self.staff.id]['user'], self.staff.user_id)
+
+    def test_sideload_follows_the_trimmed_fields(self):
+        instances = self.instances()
+        serializer = AppointmentSerializer(instances, many=True, compact=True, fields=['id', 'service'])
+        self.assertEqual(set(build_lookup_tables(serializer, instances)), {'services'})
+
+    def test_expanded_relations_are_walked_not_tabled(self):
+        instances = self.instances()
+        serializer = AppointmentSerializer(
+            instances, many=True, compact=True, fields=['id', 'staff'], expand=['staff']
+        )
+        [row] = serializer.data
+        self.assertEqual(row['staff']['user'], self.staff.user_id)
+        tables = build_lookup_tables(serializer, instances)
+        self.assertEqual(set(tables), {'users'})
+        self.assertEqual(set(tables['users']), {self.staff.user_id})
+
+
+class ApiFixtures:
+    """A customer, a stylist with a day of hourly slots and a one-hour service."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user('customer', password='pw')
+        cls.other = User.objects.create_user('other', password='pw')
+        cls.admin = User.objects.create_user('admin', password='pw', role='Admin')
+        staff_user = User.objects.create_user('stylist', password='pw', role='Staff')
+        cls.staff = Staff.objects.create(user=staff_user, specialization='Hair')
+        cls.service = Service.objects.create(name='Cut', price=30, duration=60)
+        cls.day = datetime.date.today() + datetime.timedelta(days=1)
+        cls.slots = [
+            Schedule.objects.create(staff=cls.staff, date=cls.day, time_slot=f'{hour}:00-{hour + 1}:00')
+            for hour in range(9, 17)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        availability_index.clear()
+        self.client.force_login(self.customer)
+
+    def get(self, path, params=None, **headers):
+        return self.client.get(path, params or {}, HTTP_HOST='localhost', **headers)
+
+    def post(self, path, data):
+        return self.client.post(path, data, content_type='application/json', HTTP_HOST='localhost')
+
+
+class AppointmentListTests(ApiFixtures, TestCase):
+    """Keyset pages and filters of the appointment list."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for index, schedule in enumerate(cls.slots[:5]):
+            Appointment.objects.create(
+                user=cls.customer, service=cls.service, staff=cls.staff, schedule=schedule,
+                status='Completed' if index == 0 else 'Pending'
+            )
+        Appointment.objects.create(user=cls.other, service=cls.service, staff=cls.staff, schedule=cls.slots[5])
+        # Rows created in the same instant are ordered by id
+        Appointment.objects.filter(schedule__in=cls.slots[1:4]).update(created_at=timezone.now())
+
+    def walk(self, params):
+        ids, cursor = [], None
+        while True:
+            response = self.get('/api/appointments/', dict(params, **({'cursor': cursor} if cursor else {})))
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            ids.extend(row['id'] for row in body['results'])
+            if not body['next']:
+                return ids
+            cursor = parse_qs(urlsplit(body['next']).query)['cursor'][0]
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        ids = self.walk({'page_size': 2})
+        expected = list(
+            Appointment.objects.filter(user=self.customer).order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_admins_see_everyone(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(len(self.walk({'page_size': 4})), 6)
+
+    def test_filters(self):
+        self.assertEqual(len(self.walk({'status': 'Pending'})), 4)
+        self.assertEqual(len(self.walk({'staff_id': self.staff.id, 'date_from': self.day.isoformat()})), 5)
+        self.assertEqual(self.walk({'date_to': (self.day - datetime.timedelta(days=1)).isoformat()}), [])
+
+    def test_malformed_filters_are_rejected(self):
+        for params in ({'staff_id': 'abc'}, {'service_id': '1;'}, {'date_from': '18/10/2026'}):
+            with self.subTest(params):
+                self.assertEqual(self.get('/api/appointments/', params).status_code, 400)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.get('/api/appointments/', {'cursor': 'not-a-cursor'}).status_code, 404)
+
+    def test_compact_sideloaded_page(self):
+        body = self.get('/api/appointments/', {'compact': 1, 'sideload': 1, 'fields': 'id,service'}).json()
+        self.assertEqual(set(body['included']), {'services'})
+        self.assertEqual({row['service'] for row in body['results']}, {self.service.id})
+
+
+class BatchBookingTests(ApiFixtures, TestCase):
+    """All-or-nothing booking of several slots in one request."""
+
+    def book(self, slots):
+        return self.post('/api/appointments/book/batch/', {
+            'user_id': self.customer.id,
+            'items': [
+                {'service_id': self.service.id, 'staff_id': self.staff.id,
+                 'date': self.day.isoformat(), 'time_slot': slot.time_slot}
+                for slot in slots
+            ],
+        })
+
+    def test_books_every_item(self):
+        response = self.book(self.slots[:3])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['appointments']), 3)
+        self.assertEqual(Schedule.objects.filter(availability_status=False).count(), 3)
+
+    def test_one_taken_slot_books_nothing(self):
+        self.assertEqual(self.book(self.slots[2:3]).status_code, 201)
+        response = self.book(self.slots[:3])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Appointment.objects.count(), 1)
+        self.assertEqual(Schedule.objects.filter(availability_status=False).count(), 1)
+
+    def test_repeated_slots_are_refused(self):
+        self.assertEqual(self.book([self.slots[0], self.slots[0]]).status_code, 400)
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_unknown_slots_are_not_found(self):
+        unknown = Schedule(time_slot='20:00-21:00')
+        self.assertEqual(self.book([self.slots[0], unknown]).status_code, 404)
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_round_trips_do_not_grow_with_the_batch(self):
+        with CaptureQueriesContext(connection) as two:
+            self.assertEqual(self.book(self.slots[:2]).status_code, 201)
+        with CaptureQueriesContext(connection) as five:
+            self.assertEqual(self.book(self.slots[3:8]).status_code, 201)
+        self.assertEqual(len(two), len(five))
+
+
+class ScheduleFilterTests(ApiFixtures, TestCase):
+    """time_from/time_to and service_id filters of the schedule list."""
+
+    def time_slots(self, params):
+        response = self.get('/api/schedules/', dict(params, staff_id=self.staff.id))
+        self.assertEqual(response.status_code, 200)
+        return [slot['time_slot'] for slot in response.json()]
+
+    def test_time_range(self):
+        self.assertEqual(self.time_slots({'time_from': '14:00', 'time_to': '16:00'}), ['14:00-15:00', '15:00-16:00'])
+
+    def test_malformed_times_are_rejected(self):
+        self.assertEqual(self.get('/api/schedules/', {'time_from': '2pm'}).status_code, 400)
+
+
+class ConditionalGetTests(ApiFixtures, TestCase):
+    """ETag and Last-Modified revalidation of the read endpoints."""
+
+    def revalidate(self, path, params=None):
+        first = self.get(path, params)
+        self.assertEqual(first.status_code, 200)
+        again = self.get(path, params, HTTP_IF_NONE_MATCH=first['ETag'])
+        return first, again
+
+    def test_unchanged_reads_answer_304(self):
+        for path, params in (
+            ('/api/services/', None),
+            (f'/api/services/{self.service.id}/', None),
+            ('/api/staff/', None),
+            (f'/api/staff/{self.staff.id}/', None),
+            ('/api/schedules/', {'staff_id': self.staff.id}),
+            ('/api/schedules/', None),
+        ):
+            with self.subTest(path=path, params=params):
+                _, again = self.revalidate(path, params)
+                self.assertEqual(again.status_code, 304)
+                self.assertEqual(again.content, b'')
+
+    def test_response_shape_is_part_of_the_etag(self):
+        first = self.get('/api/services/')
+        compact = self.get('/api/services/', {'fields': 'id'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(compact.status_code, 200)
+
+    def test_staff_list_is_revalidated_by_date(self):
+        first = self.get('/api/staff/')
+        again = self.get('/api/staff/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_changes_invalidate_the_etag(self):
+        first, _ = self.revalidate('/api/schedules/', {'staff_id': self.staff.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            book_appointment(self.customer, self.service, self.staff, self.slots[0])
+        again = self.get('/api/schedules/', {'staff_id': self.staff.id}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(len(again.json()), len(self.slots) - 1)
+
+        first = self.get('/api/services/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.price = 35
+            self.service.save()
+            bump_catalog_version()
+        self.assertEqual(self.get('/api/services/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+
+class AvailabilityStreamTests(ApiFixtures, TestCase):
+    """Claim and release events relayed to booking pages."""
+
+    def claim(self, schedule):
+        with self.captureOnCommitCallbacks(execute=True):
+            mark_slot_booked(schedule)
+
+    def events(self, since, **kwargs):
+        return async_to_sync(aget_availability_events)(self.staff.id, since, **kwargs)
+
+    def test_events_after_a_generation(self):
+        start, events = self.events(None)
+        self.assertEqual(events, [])
+        self.claim(self.slots[0])
+        self.claim(self.slots[1])
+
+        current, events = self.events(start)
+        self.assertEqual(current, start + 2)
+        self.assertEqual(
+            [(event['type'], event['schedule_id']) for _, event in events],
+            [('claimed', self.slots[0].id), ('claimed', self.slots[1].id)]
+        )
+
+    def test_callers_too_far_behind_get_a_refresh(self):
+        start, _ = self.events(None)
+        for schedule in self.slots[:3]:
+            self.claim(schedule)
+        self.assertEqual(self.events(start, limit=2), (start + 3, [(start + 3, {'type': 'refresh'})]))
+        self.assertEqual(self.events(start + 10), (start + 3, [(start + 3, {'type': 'refresh'})]))
+
+    @override_settings(AVAILABILITY_STREAM_POLL_INTERVAL=0, AVAILABILITY_STREAM_MAX_AGE=0.05)
+    def test_stream_resumes_from_last_event_id(self):
+        start, _ = self.events(None)
+        self.claim(self.slots[0])
+        request = RequestFactory().get(
+            '/api/schedules/stream/', {'staff_id': self.staff.id}, HTTP_LAST_EVENT_ID=str(start)
+        )
+        response = async_to_sync(streams.availability_stream)(request)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        async def read():
+            return [chunk async for chunk in response.streaming_content]
+
+        body = b''.join(async_to_sync(read)()).decode()
+        self.assertTrue(body.startswith('retry: '))
+        self.assertIn(f'id: {start + 1}\nevent: claimed\n', body)
+
+    def test_stream_needs_a_staff_member(self):
+        request = RequestFactory().get('/api/schedules/stream/')
+        self.assertEqual(async_to_sync(streams.availability_stream)(request).status_code, 400)
+
+
+class BookingBootstrapTests(ApiFixtures, TestCase):
+    """The one-call payload of the booking page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.long_service = Service.objects.create(name='Colour', price=80, duration=120)
+        StaffService.objects.create(staff=cls.staff, service=cls.long_service)
+
+    def bootstrap(self, **params):
+        return self.get('/api/booking/bootstrap/', dict({'service_id': self.long_service.id}, **params))
+
+    def test_fitting_starts_per_staff_member(self):
+        body = self.bootstrap().json()
+        self.assertEqual(body['service']['id'], self.long_service.id)
+        self.assertEqual([member['id'] for member in body['staff']], [self.staff.id])
+        starts = [time_slot for _, _, time_slot in body['slots'][str(self.staff.id)]]
+        # Every hourly slot but the last can start a two-hour service
+        self.assertEqual(starts, [slot.time_slot for slot in self.slots[:-1]])
+
+    def test_rule_slots_have_no_id(self):
+        tomorrow_weekday = (self.day + datetime.timedelta(days=1)).weekday()
+        for hour in (9, 10):
+            AvailabilityRule.objects.create(staff=self.staff, weekday=tomorrow_weekday, time_slot=f'{hour}:00-{hour + 1}:00')
+        rows = self.bootstrap(days=3).json()['slots'][str(self.staff.id)]
+        day_after = (self.day + datetime.timedelta(days=1)).isoformat()
+        self.assertIn([None, day_after, '9:00-10:00'], rows)
+
+    def test_query_count_does_not_grow_with_the_team(self):
+        # Warm the catalog version cache
+        self.bootstrap()
+        with CaptureQueriesContext(connection) as one:
+            self.bootstrap()
+        for index in range(3):
+            member = Staff.objects.create(
+                user=User.objects.create_user(f'extra{index}', password='pw', role='Staff'), specialization='Hair'
+            )
+            StaffService.objects.create(staff=member, service=self.long_service)
+            Schedule.objects.create(staff=member, date=self.day, time_slot='9:00-10:00')
+        with CaptureQueriesContext(connection) as four:
+            self.assertEqual(len(self.bootstrap().json()['staff']), 4)
+        self.assertEqual(len(one), len(four))
+
+    def test_parameters_are_validated(self):
+        self.assertEqual(self.get('/api/booking/bootstrap/').status_code, 400)
+        self.assertEqual(self.bootstrap(days=0).status_code, 400)
+        self.assertEqual(self.bootstrap(days=32).status_code, 400)
+        self.assertEqual(self.get('/api/booking/bootstrap/', {'service_id': 0}).status_code, 404)
+
+
+class MetricsTests(ApiFixtures, TestCase):
+    """The Prometheus scrape endpoint and the booking outcome counters."""
+
+    def outcome(self, outcome):
+        return REGISTRY.get_sample_value(
+            'salon_booking_outcomes_total', {'source': 'api', 'outcome': outcome}
+        ) or 0
+
+    def book(self, slot):
+        return self.post('/api/appointments/book/', {
+            'user_id': self.customer.id, 'service_id': self.service.id, 'staff_id': self.staff.id,
+            'date': self.day.isoformat(), 'time_slot': slot,
+        })
+
+    @override_settings(DEBUG=False, METRICS_TOKEN='')
+    def test_hidden_without_a_token_outside_debug(self):
+        self.assertEqual(self.get('/metrics').status_code, 404)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_is_required_when_set(self):
+        self.assertEqual(self.get('/metrics').status_code, 401)
+        self.assertEqual(self.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        response = self.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'salon_http_requests_total', response.content)
+
+    def test_booking_outcomes_are_counted(self):
+        booked, taken, missing = self.outcome(BOOKED), self.outcome(SLOT_TAKEN), self.outcome(NOT_FOUND)
+        self.assertEqual(self.book(self.slots[0].time_slot).status_code, 201)
+        self.assertEqual(self.book(self.slots[0].time_slot).status_code, 400)
+        self.assertEqual(self.book('23:00-24:00').status_code, 404)
+        self.assertEqual(self.outcome(BOOKED), booked + 1)
+        self.assertEqual(self.outcome(SLOT_TAKEN), taken + 1)
+        self.assertEqual(self.outcome(NOT_FOUND), missing + 1)
+
+    def test_requests_are_counted_by_route(self):
+        labels = {'route': 'api/services/', 'method': 'GET', 'status': '200'}
+        before = REGISTRY.get_sample_value('salon_http_requests_total', labels) or 0
+        self.get('/api/services/')
+        self.assertEqual(REGISTRY.get_sample_value('salon_http_requests_total', labels), before + 1)
+
+
+class AsyncViewParityTests(ApiFixtures, TestCase):
+    """The async read endpoints answer exactly like the DRF ones."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        StaffService.objects.create(staff=cls.staff, service=cls.service)
+
+    def async_get(self, view, path, params=None, **kwargs):
+        request = RequestFactory().get(path, params or {}, HTTP_HOST='localhost')
+        request.user = self.customer
+        return async_to_sync(view)(request, **kwargs)
+
+    def assertSameResponse(self, view, path, params=None, **kwargs):
+        expected = self.get(path, params)
+        response = self.async_get(view, path, params, **kwargs)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), expected.json())
+        self.assertEqual(response.get('ETag'), expected.get('ETag'))
+
+    def test_responses_match_the_sync_views(self):
+        for view, path, params, kwargs in (
+            (async_views.service_list_api, '/api/services/', None, {}),
+            (async_views.staff_list_api, '/api/staff/', {'compact': '1', 'sideload': '1'}, {}),
+            (async_views.staff_list_api, '/api/staff/', None, {}),
+            (async_views.staff_list_api, '/api/staff/', {'service_id': self.service.id}, {}),
+            (async_views.staff_detail_api, f'/api/staff/{self.staff.id}/', None, {'staff_id': self.staff.id}),
+            (async_views.staff_detail_api, '/api/staff/0/', None, {'staff_id': 0}),
+            (async_views.schedule_list_api, '/api/schedules/', None, {}),
+            (async_views.schedule_list_api, '/api/schedules/',
+             {'staff_id': self.staff.id, 'date': self.day.isoformat(), 'time_from': '12:00'}, {}),
+            (async_views.schedule_list_api, '/api/schedules/', {'service_id': 0}, {}),
+            (async_views.schedule_list_api, '/api/schedules/', {'date': 'tomorrow'}, {}),
+        ):
+            with self.subTest(path=path, params=params):
+                self.assertSameResponse(view, path, params, **kwargs)
+
+    def test_revalidation_answers_304(self):
+        etag = self.async_get(async_views.service_list_api, '/api/services/')['ETag']
+        request = RequestFactory().get('/api/services/', HTTP_HOST='localhost', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(async_to_sync(async_views.service_list_api)(request).status_code, 304)
+
+    def test_only_reads_are_allowed(self):
+        request = RequestFactory().post('/api/services/', HTTP_HOST='localhost')
+        self.assertEqual(async_to_sync(async_views.service_list_api)(request).status_code, 405)
+
+
+class SlotHoldApiTests(ApiFixtures, TestCase):
+    """Holding a slot through the API while checking out."""
+
+    def hold(self, slot):
+        return self.post('/api/schedules/hold/', {
+            'staff_id': self.staff.id, 'date': self.day.isoformat(), 'time_slot': slot.time_slot,
+        })
+
+    def listed(self):
+        return [slot['time_slot'] for slot in self.get('/api/schedules/', {'staff_id': self.staff.id}).json()]
+
+    def test_held_slots_are_hidden_from_others(self):
+        response = self.hold(self.slots[0])
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.json()['expires_in'], 0)
+        self.assertIn(self.slots[0].time_slot, self.listed())
+
+        self.client.force_login(self.other)
+        self.assertNotIn(self.slots[0].time_slot, self.listed())
+        self.assertEqual(self.hold(self.slots[0]).status_code, 409)
+        booking = self.post('/api/appointments/book/', {
+            'user_id': self.other.id, 'service_id': self.service.id, 'staff_id': self.staff.id,
+            'date': self.day.isoformat(), 'time_slot': self.slots[0].time_slot,
+        })
+        self.assertEqual(booking.status_code, 400)
+
+    def test_releasing_frees_the_slot(self):
+        self.hold(self.slots[0])
+        response = self.client.delete('/api/schedules/hold/', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 204)
+
+        self.client.force_login(self.other)
+        self.assertIn(self.slots[0].time_slot, self.listed())
+        self.assertEqual(self.hold(self.slots[0]).status_code, 200)
+
+    def test_only_free_slots_can_be_held(self):
+        book_appointment(self.customer, self.service, self.staff, self.slots[1])
+        self.assertEqual(self.hold(self.slots[1]).status_code, 409)
+        response = self.post('/api/schedules/hold/', {'staff_id': 'x', 'date': 'soon', 'time_slot': ''})
+        self.assertEqual(response.status_code, 400)
@@ -1,24 +1,34 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views, streams
+
+# Public reads come from the async views when served through asgi.py
+reads = async_views if settings.API_ASYNC_VIEWS else views
 
 urlpatterns = [
     # API Overview
     path('', views.api_overview, name='api_overview'),
     
     # Services
-    path('services/', views.service_list_api, name='service_list_api'),
+    path('services/', reads.service_list_api, name='service_list_api'),
     path('services/<int:service_id>/', views.service_detail_api, name='service_detail_api'),
     
     # Staff
-    path('staff/', views.staff_list_api, name='staff_list_api'),
-    path('staff/<int:staff_id>/', views.staff_detail_api, name='staff_detail_api'),
+    path('staff/', reads.staff_list_api, name='staff_list_api'),
+    path('staff/<int:staff_id>/', reads.staff_detail_api, name='staff_detail_api'),
     
     # Schedules
-    path('schedules/', views.schedule_list_api, name='schedule_list_api'),
+    path('schedules/', reads.schedule_list_api, name='schedule_list_api'),
+    path('schedules/stream/', streams.availability_stream, name='availability_stream'),
+    path('schedules/hold/', views.schedule_hold_api, name='schedule_hold_api'),
+    
+    # Booking
+    path('booking/bootstrap/', views.booking_bootstrap_api, name='booking_bootstrap_api'),
     
     # Appointments
     path('appointments/', views.appointment_list_api, name='appointment_list_api'),
     path('appointments/book/', views.appointment_book_api, name='appointment_book_api'),
+    path('appointments/book/batch/', views.appointment_book_batch_api, name='appointment_book_batch_api'),
     path('appointments/<int:appointment_id>/', views.appointment_detail_api, name='appointment_detail_api'),
     path('appointments/<int:appointment_id>/update-status/', views.appointment_update_status_api, name='appointment_update_status_api'),
     path('appointments/<int:appointment_id>/cancel/', views.appointment_cancel_api, name='appointment_cancel_api'),
@@ -3,30 +3,111 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from django.db import transaction
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from functools import partial
 
 from backend.services.models import Service
 from backend.staff.models import Staff
 from backend.schedules.models import Schedule
 from backend.appointments.models import Appointment, Payment
 from backend.accounts.models import User
-from backend.appointments.validators import (
-    validate_schedule_availability,
-    validate_no_double_booking
+from backend.appointments.booking import (
+    book_appointment,
+    book_appointments,
+    cancel_appointment,
+    reschedule_appointment,
+    update_appointment_status
 )
-
+from backend.services.catalog import get_active_services, get_catalog_version, get_service_or_404
+from backend.schedules.allocation import fitting_starts
+from backend.schedules.availability import availability_version, get_available_slots
+from backend.schedules.holds import HELD_MESSAGE, active_holds, held_by_others, hold_slot, release_hold
+from backend.schedules.rules import materialize_slots, rule_horizon, virtual_schedules
+
+from .conditional import conditional_response, make_etag
+from .metrics import BOOKED, FAILED, NOT_FOUND, SLOT_TAKEN, record_booking
+from .pagination import KeysetPagination
 from .serializers import (
     ServiceSerializer,
     StaffSerializer,
     ScheduleSerializer,
     AppointmentSerializer,
     AppointmentCreateSerializer,
+    AppointmentBatchCreateSerializer,
     PaymentSerializer,
-    UserSerializer
+    UserSerializer,
+    get_serializer_options,
+    wants_sideload,
+    build_lookup_tables,
+    reshape_data
 )
 
 
+def _parse_date_param(value):
+    """Parse a YYYY-MM-DD query parameter, returning None if it is invalid."""
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+def _parse_time_param(value):
+    """Parse an HH:MM query parameter, returning None if it is invalid."""
+    try:
+        return parse_time(value)
+    except ValueError:
+        return None
+
+
+def _slot_within(slot, time_from=None, time_to=None):
+    """Check a slot dict against an optional time_from/time_to window."""
+    start_time, end_time = slot['start_time'], slot['end_time']
+    if start_time is None or end_time is None:
+        return False
+    if isinstance(start_time, str):
+        start_time, end_time = parse_time(start_time), parse_time(end_time)
+    if time_from is not None and start_time < time_from:
+        return False
+    if time_to is not None and end_time > time_to:
+        return False
+    return True
+
+
+def _latest(*timestamps):
+    """Return the newest of several optional datetimes, or None."""
+    timestamps = [timestamp for timestamp in timestamps if timestamp is not None]
+    return max(timestamps) if timestamps else None
+
+
+def _serialize_list(request, serializer_class, instances):
+    """
+    Serialize a list honouring ?fields=, ?compact=, ?expand= and ?sideload=.
+    
+    Returns:
+        Tuple of (serialized rows, lookup tables or None)
+    """
+    options = get_serializer_options(request)
+    serializer = serializer_class(instances, many=True, **options)
+    data = serializer.data
+    
+    tables = None
+    if options.get('compact') and wants_sideload(request):
+        tables = build_lookup_tables(serializer, instances)
+    
+    return data, tables
+
+
+def _list_response(data, tables):
+    """Wrap rows with their lookup tables when side-loading was requested."""
+    if tables is None:
+        return Response(data)
+    return Response({'results': data, 'included': tables})
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def api_overview(request):
@@ -35,8 +116,12 @@ def api_overview(request):
         'services': '/api/services/',
         'staff': '/api/staff/',
         'schedules': '/api/schedules/',
+        'schedule_stream': '/api/schedules/stream/?staff_id=<id>',
+        'schedule_hold': '/api/schedules/hold/',
+        'booking_bootstrap': '/api/booking/bootstrap/?service_id=<id>',
         'appointments': '/api/appointments/',
         'book_appointment': '/api/appointments/book/',
+        'book_appointments_batch': '/api/appointments/book/batch/',
         'reschedule_appointment': '/api/appointments/<id>/reschedule/',
         'cancel_appointment': '/api/appointments/<id>/cancel/',
         'staff_service_assign': '/api/staff-services/assign/',
@@ -50,19 +135,22 @@ def api_overview(request):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def service_list_api(request):
-    """Get all active services."""
-    services = Service.objects.filter(is_active=True)
-    serializer = ServiceSerializer(services, many=True)
-    return Response(serializer.data)
+    """Get all active services. Revalidated against the catalog version."""
+    def build():
+        data, tables = _serialize_list(request, ServiceSerializer, get_active_services())
+        return _list_response(data, tables)
+    
+    etag = make_etag(request, 'services', get_catalog_version())
+    return conditional_response(request, build, etag=etag)
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def service_detail_api(request, service_id):
-    """Get service details."""
-    service = get_object_or_404(Service, id=service_id)
-    serializer = ServiceSerializer(service)
-    return Response(serializer.data)
+    """Get service details. Revalidated against the catalog version."""
+    service = get_service_or_404(service_id)
+    etag = make_etag(request, 'service', service.id, get_catalog_version())
+    return conditional_response(request, lambda: Response(ServiceSerializer(service).data), etag=etag)
 
 
 # Staff Endpoints
@@ -75,61 +163,393 @@ def staff_list_api(request):
     """
     service_id = request.query_params.get('service_id')
     
-    staff = Staff.objects.filter(is_available=True)
+    staff = Staff.objects.filter(is_available=True).select_related('user')
     
     # Filter by service if service_id is provided
     if service_id:
         # Optimized: Use JOIN instead of subquery
         staff = staff.filter(staff_services__service_id=service_id).distinct()
     
-    serializer = StaffSerializer(staff, many=True)
-    return Response(serializer.data)
+    # One aggregate query decides whether the list needs rebuilding; the
+    # count and newest assignment catch removals that leave no timestamp
+    aggregates = {
+        'count': Count('id', distinct=True),
+        'staff_modified': Max('updated_at'),
+        'user_modified': Max('user__updated_at'),
+    }
+    if service_id:
+        aggregates['newest_assignment'] = Max('staff_services__id')
+    validators = staff.aggregate(**aggregates)
+    
+    def build():
+        data, tables = _serialize_list(request, StaffSerializer, staff)
+        return _list_response(data, tables)
+    
+    return conditional_response(
+        request,
+        build,
+        etag=make_etag(request, 'staff', *sorted(validators.items())),
+        last_modified=_latest(validators['staff_modified'], validators['user_modified'])
+    )
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def staff_detail_api(request, staff_id):
-    """Get staff details."""
-    staff = get_object_or_404(Staff, id=staff_id)
-    serializer = StaffSerializer(staff)
-    return Response(serializer.data)
+    """Get staff details. Revalidated against the staff and user timestamps."""
+    staff = get_object_or_404(Staff.objects.select_related('user'), id=staff_id)
+    return conditional_response(
+        request,
+        lambda: Response(StaffSerializer(staff).data),
+        etag=make_etag(request, 'staff', staff.id, staff.updated_at, staff.user.updated_at),
+        last_modified=_latest(staff.updated_at, staff.user.updated_at)
+    )
 
 
 # Schedules Endpoints
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def schedule_list_api(request):
-    """Get available schedules."""
+    """
+    Get available schedules.
+    Per-staff lookups are answered from the in-memory availability index,
+    and clients are revalidated against the availability generation.
+    
+    Optional query parameters: staff_id, date (YYYY-MM-DD),
+    time_from/time_to (HH:MM) to only return slots that start at or after
+    time_from and end by time_to, and service_id to only return slots that
+    start enough back-to-back free time for that service's duration.
+    
+    Slots other customers are holding during checkout are left out.
+    """
     staff_id = request.query_params.get('staff_id')
     date = request.query_params.get('date')
     
+    if date:
+        date = _parse_date_param(date)
+        if date is None:
+            return Response(
+                {'error': 'date must be a date in YYYY-MM-DD format.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    time_range = {}
+    for param in ('time_from', 'time_to'):
+        if request.query_params.get(param):
+            value = _parse_time_param(request.query_params[param])
+            if value is None:
+                return Response(
+                    {'error': f'{param} must be a time in HH:MM format.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            time_range[param] = value
+    
+    if staff_id and not staff_id.isdigit():
+        return Response(
+            {'error': 'staff_id must be a number.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    duration = None
+    service_id = request.query_params.get('service_id')
+    if service_id:
+        if not service_id.isdigit():
+            return Response(
+                {'error': 'service_id must be a number.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        duration = get_service_or_404(service_id).duration
+    
+    if staff_id:
+        staff_id = int(staff_id)
+        version = availability_version(staff_id)
+        holds = active_holds([staff_id])
+        # The index checks the entry against the version the ETag used
+        build = partial(_indexed_schedule_list, version=version)
+    else:
+        version = availability_version()
+        holds = active_holds(Staff.objects.values_list('id', flat=True))
+        build = _database_schedule_list
+    held = held_by_others(holds, request.user.id)
+    
+    # Rule-derived slots also move with the date, fitting slots with the
+    # service duration, and holds come and go without a generation bump
+    etag = make_etag(request, 'schedules', version, timezone.now().date(), duration, sorted(held))
+    return conditional_response(
+        request,
+        lambda: build(request, staff_id, date, time_range, duration, held),
+        etag=etag
+    )
+
+
+def _indexed_schedule_list(request, staff_id, date, time_range, duration, held=frozenset(), version=None):
+    """Build the schedule list of one staff member from the availability index."""
+    slots = get_available_slots(staff_id, date.isoformat() if date else None, version)
+    if held:
+        slots = [slot for slot in slots if (staff_id, slot['date'], slot['time_slot']) not in held]
+    if time_range:
+        slots = [slot for slot in slots if _slot_within(slot, **time_range)]
+    if duration:
+        slots = fitting_starts(slots, duration)
+    options = get_serializer_options(request)
+    if not options:
+        return Response(slots)
+    
+    tables = {} if options.get('compact') and wants_sideload(request) else None
+    return _list_response(reshape_data(slots, tables=tables, **options), tables)
+
+
+def _database_schedule_list(request, staff_id, date, time_range, duration, held=frozenset()):
+    """Build the schedule list from the database plus recurring rules."""
     schedules = Schedule.objects.filter(availability_status=True)
     
     if staff_id:
         schedules = schedules.filter(staff_id=staff_id)
     if date:
         schedules = schedules.filter(date=date)
+    if time_range:
+        schedules = schedules.within(**time_range)
     
-    serializer = ScheduleSerializer(schedules, many=True)
-    return Response(serializer.data)
+    schedules = list(schedules.select_related('staff__user'))
+    
+    # Merge in recurring-rule slots that have not been materialized yet
+    start_date, end_date = rule_horizon()
+    if date:
+        start_date, end_date = max(date, start_date), min(date, end_date)
+    virtual = virtual_schedules([staff_id] if staff_id else None, start_date, end_date)
+    if time_range:
+        virtual = [
+            schedule for schedule in virtual
+            if _slot_within(
+                {'start_time': schedule.start_time, 'end_time': schedule.end_time},
+                **time_range
+            )
+        ]
+    if held:
+        schedules = [s for s in schedules if (s.staff_id, str(s.date), s.time_slot) not in held]
+        virtual = [s for s in virtual if (s.staff_id, str(s.date), s.time_slot) not in held]
+    if virtual or duration:
+        schedules = sorted(
+            schedules + virtual,
+            key=lambda s: (s.date, s.start_time is None, s.start_time or time.min, s.time_slot)
+        )
+    if duration:
+        # Runs are found per staff member and day, then put back in time order
+        by_staff = sorted(schedules, key=lambda s: s.staff_id)
+        fitting = {id(s) for s in fitting_starts(by_staff, duration)}
+        schedules = [s for s in schedules if id(s) in fitting]
+    
+    data, tables = _serialize_list(request, ScheduleSerializer, schedules)
+    return _list_response(data, tables)
+
+
+@api_view(['POST', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def schedule_hold_api(request):
+    """
+    Hold a free slot for the signed-in customer while they check out.
+    Expected JSON payload:
+    {
+        "staff_id": 1,
+        "date": "2026-03-01",
+        "time_slot": "10:00-11:00"
+    }
+    
+    The hold lasts SLOT_HOLD_TTL seconds (expires_in in the response) and is
+    renewed by posting the same slot again, which the booking page does while
+    the time stays selected. A customer holds one slot at a time: holding another one
+    releases the previous hold, and DELETE releases it right away.
+    """
+    if request.method == 'DELETE':
+        release_hold(request.user.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    staff_id = str(request.data.get('staff_id', ''))
+    date = _parse_date_param(str(request.data.get('date', '')))
+    time_slot = request.data.get('time_slot')
+    if not staff_id.isdigit() or date is None or not time_slot:
+        return Response(
+            {'error': 'staff_id, date (YYYY-MM-DD) and time_slot are required.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    staff_id = int(staff_id)
+    
+    # Only free slots can be held; checked against the availability index
+    if not any(slot['time_slot'] == time_slot for slot in get_available_slots(staff_id, date.isoformat())):
+        return Response(
+            {'error': 'This time slot is not available.'},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    try:
+        expires_at = hold_slot(request.user.id, staff_id, date, time_slot)
+    except DjangoValidationError as e:
+        return Response(
+            {'error': ' '.join(e.messages)},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    return Response({
+        'staff_id': staff_id,
+        'date': date.isoformat(),
+        'time_slot': time_slot,
+        'expires_at': datetime.fromtimestamp(expires_at, tz=dt_timezone.utc).isoformat(),
+        # Lets clients renew in time without comparing clocks with the server
+        'expires_in': max(int(expires_at - timezone.now().timestamp()), 0),
+    })
+
+
+# Booking Endpoints
+BOOTSTRAP_DAYS = 14
+BOOTSTRAP_MAX_DAYS = 31
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def booking_bootstrap_api(request):
+    """
+    Everything the booking page needs for one service, in one response.
+    
+    Query parameters: service_id (required) and days (default 14, max 31).
+    Returns the service, the available staff who provide it, and per staff
+    member the free start times over the next days that fit the service's
+    duration, as compact [schedule_id, date, time_slot] rows. schedule_id is
+    null for slots that come from recurring availability rules. Slots other
+    customers are holding during checkout are left out.
+    
+    Built with the same handful of queries however many staff qualify.
+    """
+    service_id = request.query_params.get('service_id', '')
+    days = request.query_params.get('days', str(BOOTSTRAP_DAYS))
+    
+    if not service_id.isdigit():
+        return Response(
+            {'error': 'service_id is required.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not days.isdigit() or not 1 <= int(days) <= BOOTSTRAP_MAX_DAYS:
+        return Response(
+            {'error': f'days must be between 1 and {BOOTSTRAP_MAX_DAYS}.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    days = int(days)
+    
+    service = get_service_or_404(service_id)
+    if not service.is_active:
+        return Response(
+            {'error': 'Service not found.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    staff = list(
+        Staff.objects.filter(is_available=True, staff_services__service_id=service.id)
+        .select_related('user')
+        .order_by('id')
+        .distinct()
+    )
+    staff_ids = [member.id for member in staff]
+    
+    start_date = timezone.now().date()
+    end_date = start_date + timedelta(days=days - 1)
+    
+    # One query for stored slots and a fixed few for rule-derived ones
+    slots = []
+    if staff_ids:
+        slots = list(
+            Schedule.objects.filter(
+                staff_id__in=staff_ids,
+                date__range=(start_date, end_date),
+                availability_status=True
+            ).values('id', 'staff', 'date', 'time_slot', 'start_time', 'end_time')
+        )
+        slots.extend(
+            {
+                'id': None,
+                'staff': schedule.staff_id,
+                'date': schedule.date,
+                'time_slot': schedule.time_slot,
+                'start_time': schedule.start_time,
+                'end_time': schedule.end_time,
+            }
+            for schedule in virtual_schedules(staff_ids, start_date, end_date)
+        )
+    
+    held = held_by_others(active_holds(staff_ids), request.user.id)
+    if held:
+        slots = [s for s in slots if (s['staff'], s['date'].isoformat(), s['time_slot']) not in held]
+    
+    slots.sort(key=lambda s: (s['staff'], s['date'], s['start_time'] is None, s['start_time'] or time.min, s['time_slot']))
+    
+    rows = {member.id: [] for member in staff}
+    for slot in fitting_starts(slots, service.duration):
+        rows[slot['staff']].append([slot['id'], slot['date'].isoformat(), slot['time_slot']])
+    
+    return Response({
+        'service': ServiceSerializer(service).data,
+        'days': days,
+        'staff': [
+            {
+                'id': member.id,
+                'name': member.user.first_name or member.user.username,
+                'specialization': member.specialization,
+            }
+            for member in staff
+        ],
+        'slots': rows,
+    })
 
 
 # Appointments Endpoints
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def appointment_list_api(request):
-    """Get user's appointments."""
+    """
+    Get user's appointments, newest first, one keyset page at a time.
+    
+    Optional query parameters: status, staff_id, service_id,
+    date_from and date_to (appointment date, YYYY-MM-DD),
+    cursor and page_size, plus fields/compact/expand/sideload.
+    """
     if request.user.role == 'Admin':
         appointments = Appointment.objects.select_related(
-            'user', 'service', 'staff__user', 'schedule__staff'
+            'user', 'service', 'staff__user', 'schedule__staff__user'
         ).all()
     else:
         appointments = Appointment.objects.select_related(
-            'service', 'staff__user', 'schedule__staff'
+            'user', 'service', 'staff__user', 'schedule__staff__user'
         ).filter(user=request.user)
     
-    serializer = AppointmentSerializer(appointments, many=True)
-    return Response(serializer.data)
+    params = request.query_params
+    
+    if params.get('status'):
+        appointments = appointments.filter(status=params['status'])
+    for param in ('staff_id', 'service_id'):
+        if params.get(param):
+            if not params[param].isdigit():
+                return Response(
+                    {'error': f'{param} must be a number.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            appointments = appointments.filter(**{param: int(params[param])})
+    
+    for param, lookup in (('date_from', 'schedule__date__gte'), ('date_to', 'schedule__date__lte')):
+        if params.get(param):
+            value = _parse_date_param(params[param])
+            if value is None:
+                return Response(
+                    {'error': f'{param} must be a date in YYYY-MM-DD format.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            appointments = appointments.filter(**{lookup: value})
+    
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(appointments, request)
+    data, tables = _serialize_list(request, AppointmentSerializer, page)
+    
+    response = paginator.get_paginated_response(data)
+    if tables is not None:
+        response.data['included'] = tables
+    return response
 
 
 @api_view(['POST'])
@@ -154,63 +574,144 @@ def appointment_book_api(request):
     
     data = serializer.validated_data
     
+    user = get_object_or_404(User, id=data['user_id'])
+    service = get_service_or_404(data['service_id'])
+    
+    # Refused up front, before a rule slot's row is created for it;
+    # book_appointment() checks the rest of a longer service's run. Holds
+    # belong to whoever is signed in, whatever user_id the body names.
+    key = (data['staff_id'], data['date'], data['time_slot'])
+    held = held_by_others(active_holds([data['staff_id']]), request.user.id)
+    if (data['staff_id'], str(data['date']), data['time_slot']) in held:
+        record_booking('api', SLOT_TAKEN)
+        return Response(
+            {'error': HELD_MESSAGE},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # The staff member is loaded along with the schedule; a slot that only
+    # exists as a recurring rule gets its Schedule row created here
+    schedule = materialize_slots([key]).get(key)
+    
+    if not schedule:
+        record_booking('api', NOT_FOUND)
+        return Response(
+            {'error': 'Schedule not found for the selected date and time.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
     try:
-        with transaction.atomic():
-            # Get related objects
-            user = get_object_or_404(User, id=data['user_id'])
-            service = get_object_or_404(Service, id=data['service_id'])
-            staff = get_object_or_404(Staff, id=data['staff_id'])
-            
-            # Get or validate schedule
-            schedule = Schedule.objects.filter(
-                staff=staff,
-                date=data['date'],
-                time_slot=data['time_slot']
-            ).first()
-            
-            if not schedule:
-                return Response(
-                    {'error': 'Schedule not found for the selected date and time.'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-            
-            # Validate availability
-            try:
-                validate_schedule_availability(schedule)
-                validate_no_double_booking(schedule)
-            except DjangoValidationError as e:
-                return Response(
-                    {'error': str(e)},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Create appointment
-            appointment = Appointment.objects.create(
-                user=user,
-                service=service,
-                staff=staff,
-                schedule=schedule,
-                notes=data.get('notes', '')
+        appointment = book_appointment(
+            user=user,
+            service=service,
+            staff=schedule.staff,
+            schedule=schedule,
+            notes=data.get('notes', ''),
+            holder_id=request.user.id
+        )
+    except DjangoValidationError as e:
+        record_booking('api', SLOT_TAKEN)
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except Exception as e:
+        record_booking('api', FAILED)
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    record_booking('api', BOOKED)
+    response_serializer = AppointmentSerializer(appointment)
+    return Response(
+        {
+            'message': 'Appointment booked successfully!',
+            'appointment': response_serializer.data
+        },
+        status=status.HTTP_201_CREATED
+    )
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def appointment_book_batch_api(request):
+    """
+    Book several appointments at once, all or nothing.
+    Expected JSON payload:
+    {
+        "user_id": 5,
+        "items": [
+            {"service_id": 2, "staff_id": 1, "date": "2026-03-01", "time_slot": "10:00-11:00"},
+            {"service_id": 3, "staff_id": 2, "date": "2026-03-01", "time_slot": "10:00-11:00", "notes": "Optional"}
+        ]
+    }
+    """
+    serializer = AppointmentBatchCreateSerializer(data=request.data)
+    
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    data = serializer.validated_data
+    items = data['items']
+    
+    user = get_object_or_404(User, id=data['user_id'])
+    
+    services = {
+        service.id: service
+        for service in Service.objects.filter(id__in={item['service_id'] for item in items})
+    }
+    
+    # All slots in one query (plus one insert for rule-derived slots);
+    # staff members are loaded along with them
+    schedules = materialize_slots(
+        (item['staff_id'], item['date'], item['time_slot']) for item in items
+    )
+    
+    bookings = []
+    for index, item in enumerate(items):
+        service = services.get(item['service_id'])
+        schedule = schedules.get((item['staff_id'], item['date'], item['time_slot']))
+        
+        if service is None:
+            record_booking('batch', NOT_FOUND, len(items))
+            return Response(
+                {'error': f'Service not found for item {index}.'},
+                status=status.HTTP_404_NOT_FOUND
             )
-            
-            # Mark schedule as unavailable
-            schedule.availability_status = False
-            schedule.save()
-            
-            response_serializer = AppointmentSerializer(appointment)
+        if schedule is None:
+            record_booking('batch', NOT_FOUND, len(items))
             return Response(
-                {
-                    'message': 'Appointment booked successfully!',
-                    'appointment': response_serializer.data
-                },
-                status=status.HTTP_201_CREATED
+                {'error': f'Schedule not found for the selected date and time of item {index}.'},
+                status=status.HTTP_404_NOT_FOUND
             )
+        
+        bookings.append((service, schedule.staff, schedule, item.get('notes', '')))
     
+    try:
+        appointments = book_appointments(user, bookings, holder_id=request.user.id)
+    except DjangoValidationError as e:
+        record_booking('batch', SLOT_TAKEN, len(items))
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     except Exception as e:
+        record_booking('batch', FAILED, len(items))
         return Response(
             {'error': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+    
+    record_booking('batch', BOOKED, len(appointments))
+    response_serializer = AppointmentSerializer(appointments, many=True)
+    return Response(
+        {
+            'message': f'{len(appointments)} appointments booked successfully!',
+            'appointments': response_serializer.data
+        },
+        status=status.HTTP_201_CREATED
+    )
 
 
 @api_view(['GET'])
@@ -248,14 +749,13 @@ def appointment_update_status_api(request, appointment_id):
     appointment = get_object_or_404(Appointment, id=appointment_id)
     new_status = request.data.get('status')
     
-    if new_status not in ['Pending', 'Confirmed', 'Completed', 'Cancelled']:
+    if new_status not in ['Pending', 'Confirmed', 'Completed', 'Cancelled', 'No-show']:
         return Response(
             {'error': 'Invalid status.'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    appointment.status = new_status
-    appointment.save()
+    update_appointment_status(appointment, new_status)
     
     serializer = AppointmentSerializer(appointment)
     return Response({
@@ -283,12 +783,7 @@ def appointment_cancel_api(request, appointment_id):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    appointment.status = 'Cancelled'
-    appointment.save()
-    
-    # Make schedule available again
-    appointment.schedule.availability_status = True
-    appointment.schedule.save()
+    cancel_appointment(appointment)
     
     return Response({'message': 'Appointment cancelled successfully!'})
 
@@ -314,7 +809,7 @@ def appointment_reschedule_api(request, appointment_id):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    if appointment.status in ['Cancelled', 'Completed']:
+    if appointment.status in ['Cancelled', 'Completed', 'No-show']:
         return Response(
             {'error': f'Cannot reschedule {appointment.status.lower()} appointments.'},
             status=status.HTTP_400_BAD_REQUEST
@@ -330,61 +825,46 @@ def appointment_reschedule_api(request, appointment_id):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    try:
-        with transaction.atomic():
-            staff = get_object_or_404(Staff, id=staff_id)
-            
-            # Get new schedule
-            new_schedule = Schedule.objects.filter(
-                staff=staff,
-                date=date,
-                time_slot=time_slot
-            ).first()
-            
-            if not new_schedule:
-                return Response(
-                    {'error': 'Schedule not found for the selected date and time.'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-            
-            # Validate availability
-            try:
-                validate_schedule_availability(new_schedule)
-                validate_no_double_booking(new_schedule, exclude_appointment_id=appointment.id)
-            except DjangoValidationError as e:
-                return Response(
-                    {'error': str(e)},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Make old schedule available
-            old_schedule = appointment.schedule
-            old_schedule.availability_status = True
-            old_schedule.save()
-            
-            # Update appointment
-            appointment.staff = staff
-            appointment.schedule = new_schedule
-            appointment.save()
-            
-            # Mark new schedule as unavailable
-            new_schedule.availability_status = False
-            new_schedule.save()
-            
-            serializer = AppointmentSerializer(appointment)
-            return Response(
-                {
-                    'message': 'Appointment rescheduled successfully!',
-                    'appointment': serializer.data
-                },
-                status=status.HTTP_200_OK
-            )
+    date = _parse_date_param(str(date))
+    if date is None:
+        return Response(
+            {'error': 'date must be a date in YYYY-MM-DD format.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    staff = get_object_or_404(Staff.objects.select_related('user'), id=staff_id)
+    
+    # Get new schedule, creating it from a recurring rule if needed
+    key = (staff.id, date, time_slot)
+    new_schedule = materialize_slots([key]).get(key)
+    
+    if not new_schedule:
+        return Response(
+            {'error': 'Schedule not found for the selected date and time.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
     
+    try:
+        reschedule_appointment(appointment, staff, new_schedule)
+    except DjangoValidationError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     except Exception as e:
         return Response(
             {'error': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+    
+    serializer = AppointmentSerializer(appointment)
+    return Response(
+        {
+            'message': 'Appointment rescheduled successfully!',
+            'appointment': serializer.data
+        },
+        status=status.HTTP_200_OK
+    )
 
 
 # User Registration
@@ -508,7 +988,15 @@ def staff_services_list_api(request, staff_id):
     from backend.staff.models import StaffService
     
     staff_services = StaffService.objects.filter(staff=staff).select_related('service')
-    services = [ss.service for ss in staff_services]
+    assignments = staff_services.aggregate(count=Count('id'), newest=Max('id'))
     
-    serializer = ServiceSerializer(services, many=True)
-    return Response(serializer.data)
+    def build():
+        services = [ss.service for ss in staff_services]
+        serializer = ServiceSerializer(services, many=True)
+        return Response(serializer.data)
+    
+    etag = make_etag(
+        request, 'staff-services', staff.id,
+        assignments['count'], assignments['newest'], get_catalog_version()
+    )
+    return conditional_response(request, build, etag=etag)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AppointmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.appointments'
+
+    def ready(self):
+        from .counters import connect_signals
+        connect_signals()
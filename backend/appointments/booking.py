@@ -0,0 +1,331 @@
+"""
+Slot claiming for booking and rescheduling.
+
+A slot is claimed with a single conditional UPDATE that only succeeds while
+the schedule is still available and has no active appointment. The database
+serializes concurrent claims on the row, so exactly one of several racing
+requests wins and the others see zero rows updated, without a separate
+read-validate-write round trip or an explicit lock.
+
+Services longer than one slot occupy a run of back-to-back slots (see
+backend.schedules.allocation); the whole run is claimed by the same single
+UPDATE, which only succeeds if every slot in it is free.
+
+Slots another customer is holding during checkout (backend.schedules.holds)
+are refused before the claim, and a customer's own hold is let go once
+their booking commits.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from backend.jobs.queue import enqueue
+from backend.schedules.models import Schedule
+from backend.schedules.allocation import allocate_runs
+from backend.schedules.availability import mark_slot_booked, mark_slot_released
+from backend.schedules.holds import ensure_not_held, release_hold
+from .counters import ACTIVE_STATUSES, appointment_state, record_appointment_changes
+from .models import Appointment
+
+
+def _unbooked(exclude_appointment_id=None):
+    """Condition that no active appointment occupies the outer schedule."""
+    def active(**lookup):
+        bookings = Appointment.objects.filter(status__in=ACTIVE_STATUSES, **lookup)
+        if exclude_appointment_id:
+            bookings = bookings.exclude(id=exclude_appointment_id)
+        return Exists(bookings)
+
+    return ~active(schedule=OuterRef('pk')) & ~active(additional_schedules=OuterRef('pk'))
+
+
+def claim_slots(schedules, exclude_appointment_id=None):
+    """
+    Atomically mark schedules as booked, all or none.
+
+    Args:
+        schedules: Schedule instances to claim
+        exclude_appointment_id: Optional appointment ID to ignore when checking
+            for active bookings (for rescheduling)
+
+    Raises:
+        ValidationError: If any slot is unavailable or already booked. The
+            caller's transaction must be rolled back in that case.
+    """
+    schedule_ids = [schedule.id for schedule in schedules]
+    if len(set(schedule_ids)) != len(schedule_ids):
+        raise ValidationError('The same time slot appears more than once.')
+
+    claimed = Schedule.objects.filter(
+        _unbooked(exclude_appointment_id),
+        id__in=schedule_ids,
+        availability_status=True
+    ).update(availability_status=False, updated_at=timezone.now())
+
+    if claimed != len(schedule_ids):
+        if len(schedule_ids) == 1:
+            raise ValidationError('This time slot is not available.')
+        raise ValidationError('One or more time slots are not available.')
+
+    for schedule in schedules:
+        schedule.availability_status = False
+        mark_slot_booked(schedule)
+
+
+def claim_slot(schedule, exclude_appointment_id=None):
+    """
+    Atomically mark a schedule as booked.
+
+    Args:
+        schedule: Schedule instance to claim
+        exclude_appointment_id: Optional appointment ID to ignore when checking
+            for active bookings (for rescheduling)
+
+    Raises:
+        ValidationError: If the slot is unavailable or already booked
+    """
+    claim_slots([schedule], exclude_appointment_id)
+
+
+def release_slots(schedules):
+    """
+    Mark schedules as available again.
+
+    Args:
+        schedules: Schedule instances to release
+    """
+    Schedule.objects.filter(id__in=[schedule.id for schedule in schedules]).update(
+        availability_status=True,
+        updated_at=timezone.now()
+    )
+    for schedule in schedules:
+        schedule.availability_status = True
+        mark_slot_released(schedule)
+
+
+def release_slot(schedule):
+    """
+    Mark a schedule as available again.
+
+    Args:
+        schedule: Schedule instance to release
+    """
+    release_slots([schedule])
+
+
+def release_vacated_slots(appointment_ids):
+    """
+    Release the slots of appointments that no active appointment occupies.
+
+    Slots that are already free, or that an active appointment (including
+    one of appointment_ids) still holds, are left alone, so calling this
+    again is harmless.
+
+    Args:
+        appointment_ids: IDs of cancelled or otherwise inactive appointments
+
+    Returns:
+        Number of slots released
+    """
+    Through = Appointment.additional_schedules.through
+    slot_ids = {
+        *Appointment.objects.filter(id__in=appointment_ids).values_list('schedule_id', flat=True),
+        *Through.objects.filter(appointment_id__in=appointment_ids).values_list('schedule_id', flat=True),
+    }
+    vacated = list(Schedule.objects.filter(_unbooked(), id__in=slot_ids, availability_status=False))
+    if vacated:
+        release_slots(vacated)
+    return len(vacated)
+
+
+def booked_schedules(appointment):
+    """
+    Return every schedule an appointment occupies, starting slot first.
+
+    Args:
+        appointment: Appointment instance
+
+    Returns:
+        List of Schedule instances
+    """
+    return [appointment.schedule, *appointment.additional_schedules.all()]
+
+
+def book_appointment(user, service, staff, schedule, notes='', holder_id=None):
+    """
+    Claim the slots a service needs and create the appointment in one transaction.
+
+    Services longer than the chosen slot also claim the back-to-back free
+    slots that follow it.
+
+    Args:
+        user: Customer making the booking
+        service: Service being booked
+        staff: Staff member performing the service
+        schedule: Schedule slot the service starts in
+        notes: Optional booking notes
+        holder_id: User whose slot holds the booking may use (default: the
+            customer); the signed-in user when booking on someone's behalf
+
+    Returns:
+        The created Appointment
+
+    Raises:
+        ValidationError: If the slots are no longer available or held by
+            another customer
+    """
+    with transaction.atomic():
+        [run] = allocate_runs([(schedule, service.duration, ())])
+        holder_id = user.id if holder_id is None else holder_id
+        ensure_not_held(holder_id, run)
+        claim_slots(run)
+        transaction.on_commit(lambda: release_hold(holder_id))
+        appointment = Appointment.objects.create(
+            user=user,
+            service=service,
+            staff=staff,
+            schedule=schedule,
+            notes=notes
+        )
+        if len(run) > 1:
+            appointment.additional_schedules.add(*run[1:])
+        return appointment
+
+
+def book_appointments(user, items, holder_id=None):
+    """
+    Claim several slots and create their appointments all-or-nothing.
+
+    Every slot is claimed with one conditional UPDATE and every appointment
+    is inserted with one bulk INSERT, so the number of round trips does not
+    grow with the size of the group.
+
+    Args:
+        user: Customer making the bookings
+        items: List of (service, staff, schedule, notes) tuples
+        holder_id: User whose slot holds the bookings may use (default: the
+            customer)
+
+    Returns:
+        List of created Appointments, in the order of items
+
+    Raises:
+        ValidationError: If any slot is repeated, no longer available or
+            held by another customer
+    """
+    with transaction.atomic():
+        runs = allocate_runs([(schedule, service.duration, ()) for service, _, schedule, _ in items])
+        slots = [slot for run in runs for slot in run]
+        holder_id = user.id if holder_id is None else holder_id
+        ensure_not_held(holder_id, slots)
+
+        # Raising rolls back the slots that were claimed
+        claim_slots(slots)
+        transaction.on_commit(lambda: release_hold(holder_id))
+
+        appointments = Appointment.objects.bulk_create([
+            Appointment(
+                user=user,
+                service=service,
+                staff=staff,
+                schedule=schedule,
+                notes=notes
+            )
+            for service, staff, schedule, notes in items
+        ])
+
+        # Backends that cannot return ids from a bulk insert (MySQL)
+        if any(appointment.pk is None for appointment in appointments):
+            ids = dict(
+                Appointment.objects.filter(
+                    schedule_id__in=[schedule.id for _, _, schedule, _ in items],
+                    status__in=ACTIVE_STATUSES
+                ).values_list('schedule_id', 'id')
+            )
+            for appointment in appointments:
+                appointment.pk = ids[appointment.schedule_id]
+
+        Through = Appointment.additional_schedules.through
+        Through.objects.bulk_create([
+            Through(appointment_id=appointment.pk, schedule_id=slot.id)
+            for appointment, run in zip(appointments, runs)
+            for slot in run[1:]
+        ])
+
+        # bulk_create() sends no signals for the counters to pick up
+        record_appointment_changes((None, appointment_state(appointment)) for appointment in appointments)
+
+    return appointments
+
+
+def update_appointment_status(appointment, status):
+    """
+    Change the status of an appointment.
+
+    Cancelling an active appointment queues the release of its slots
+    (see backend/appointments/jobs.py) in the same transaction, so the
+    request only writes the appointment row.
+
+    Args:
+        appointment: Appointment instance to update
+        status: New status
+    """
+    with transaction.atomic():
+        was_active = appointment.status in ACTIVE_STATUSES
+        appointment.status = status
+        appointment.save(update_fields=['status', 'updated_at'])
+        if status == 'Cancelled' and was_active:
+            enqueue('appointments.release_slots', appointment_id=appointment.id)
+
+
+def cancel_appointment(appointment):
+    """
+    Cancel an appointment; its slots are released by a background job.
+
+    Args:
+        appointment: Appointment instance to cancel
+    """
+    update_appointment_status(appointment, 'Cancelled')
+
+
+def reschedule_appointment(appointment, staff, new_schedule):
+    """
+    Move an appointment to a new start slot.
+
+    The new run of slots is claimed and the old slots it no longer covers
+    are released in one transaction; slots shared by both runs stay booked.
+
+    Args:
+        appointment: Appointment instance to move
+        staff: Staff member for the new slot
+        new_schedule: Schedule slot the service should start in
+
+    Raises:
+        ValidationError: If the new slots are no longer available or held
+            by another customer
+    """
+    with transaction.atomic():
+        old_run = booked_schedules(appointment)
+        held_ids = {schedule.id for schedule in old_run}
+
+        [new_run] = allocate_runs([(new_schedule, appointment.service.duration, held_ids)])
+        new_ids = {schedule.id for schedule in new_run}
+
+        to_claim = [schedule for schedule in new_run if schedule.id not in held_ids]
+        if to_claim:
+            ensure_not_held(appointment.user_id, to_claim)
+            claim_slots(to_claim, exclude_appointment_id=appointment.id)
+
+        to_release = [schedule for schedule in old_run if schedule.id not in new_ids]
+        if to_release:
+            release_slots(to_release)
+
+        appointment.staff = staff
+        appointment.schedule = new_schedule
+        # Remind the customer again of the new time
+        appointment.reminder_sent_at = None
+        appointment.save(update_fields=['staff', 'schedule', 'reminder_sent_at', 'updated_at'])
+        appointment.additional_schedules.set(new_run[1:])
+
+    return appointment
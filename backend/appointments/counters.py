@@ -0,0 +1,419 @@
+"""
+Incrementally maintained dashboard counters.
+
+Dashboards read their figures from DashboardCounter rows instead of
+counting whole tables or aggregating a member's appointment history on
+every load. The rows are kept current by applying +1/-1 deltas whenever a
+service, staff member, schedule or appointment is created, changed or
+deleted:
+
+- Single-row writes are caught by model signals, so admin edits, form
+  views and cascading deletes (removing a user deletes their appointments)
+  are all accounted for without every call site having to remember.
+- bulk_create() and queryset.update() bypass signals, so the bulk paths
+  (batch booking, schedule generation, rule slot materialization, the
+  appointment sweeper) call the record_* helpers here themselves.
+
+Deltas are applied after the surrounding transaction commits, in a short
+transaction of their own, so concurrent bookings do not queue on the lock
+of the shared total rows. A crash between the two commits, or a write
+that bypasses both paths (queryset.update(), raw SQL), leaves a counter
+off; the reconcile_dashboard_counters command rebuilds them from the
+source tables.
+"""
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from .dashboards import invalidate_dashboards
+from .models import TOTAL_DATE, Appointment, DashboardCounter
+
+
+ACTIVE_STATUSES = ('Pending', 'Confirmed')
+
+# Global totals shown on the admin dashboard
+GLOBAL_TOTALS = ('services', 'staff', 'appointments', 'schedules')
+
+# Above this many counters, a change set is applied with batched statements
+# rather than an UPDATE per counter (batch bookings, the appointment sweeper)
+BULK_APPLY_THRESHOLD = 20
+
+
+def appointment_counter(status):
+    """Counter name of appointments in a status."""
+    return f'appointments:{status}'
+
+
+def appointment_state(appointment):
+    """
+    Return the fields of an appointment that its counters depend on.
+
+    Args:
+        appointment: Appointment instance
+
+    Returns:
+        Tuple of (staff_id, user_id, schedule date, status)
+    """
+    return (appointment.staff_id, appointment.user_id, appointment.schedule.date, appointment.status)
+
+
+def _state_deltas(state, sign):
+    staff_id, user_id, date, status = state
+    name = appointment_counter(status)
+    return {
+        ('staff', staff_id, name, TOTAL_DATE): sign,
+        ('staff', staff_id, name, date): sign,
+        ('customer', user_id, name, TOTAL_DATE): sign,
+        ('customer', user_id, name, date): sign,
+    }
+
+
+def _apply(deltas):
+    # Fixed key order so two appliers never wait on each other's rows
+    keys = sorted(key for key, delta in deltas.items() if delta)
+    if not keys:
+        return
+    if len(keys) > BULK_APPLY_THRESHOLD:
+        _apply_bulk(deltas, keys)
+        return
+
+    with transaction.atomic():
+        for scope, owner_id, name, date in keys:
+            delta = deltas[(scope, owner_id, name, date)]
+            lookup = {'scope': scope, 'owner_id': owner_id, 'name': name, 'date': date}
+
+            if DashboardCounter.objects.filter(**lookup).update(value=F('value') + delta):
+                continue
+            try:
+                with transaction.atomic():
+                    DashboardCounter.objects.create(
+                        scope=scope, owner_id=owner_id, name=name, date=date, value=delta
+                    )
+            except IntegrityError:
+                # Another applier created the row first
+                DashboardCounter.objects.filter(**lookup).update(value=F('value') + delta)
+
+
+def _apply_bulk(deltas, keys):
+    """Apply many deltas with one locking read and an UPDATE per distinct delta."""
+    wanted = defaultdict(lambda: (set(), set(), set()))
+    for scope, owner_id, name, date in keys:
+        owner_ids, names, dates = wanted[scope]
+        owner_ids.add(owner_id)
+        names.add(name)
+        dates.add(date)
+
+    lookup = Q()
+    for scope, (owner_ids, names, dates) in wanted.items():
+        lookup |= Q(scope=scope, owner_id__in=owner_ids, name__in=names, date__in=dates)
+
+    def locked_rows():
+        # Locked in the same order as the row by row path
+        rows = (
+            DashboardCounter.objects.select_for_update().filter(lookup)
+            .order_by('scope', 'owner_id', 'name', 'date')
+        )
+        return {(row.scope, row.owner_id, row.name, row.date): row for row in rows}
+
+    with transaction.atomic():
+        rows = locked_rows()
+        missing = [key for key in keys if key not in rows]
+        if missing:
+            # Rows another applier creates meanwhile are skipped, then updated
+            DashboardCounter.objects.bulk_create(
+                [DashboardCounter(scope=scope, owner_id=owner_id, name=name, date=date, value=0)
+                 for scope, owner_id, name, date in missing],
+                batch_size=500,
+                ignore_conflicts=True
+            )
+            rows = locked_rows()
+
+        # Deltas are mostly +1/-1, so grouping by delta needs few statements
+        ids_by_delta = defaultdict(list)
+        for key in keys:
+            ids_by_delta[deltas[key]].append(rows[key].id)
+        for delta, ids in sorted(ids_by_delta.items()):
+            for start in range(0, len(ids), 500):
+                DashboardCounter.objects.filter(id__in=ids[start:start + 500]).update(value=F('value') + delta)
+
+
+def _schedule(deltas):
+    deltas = dict(deltas)
+    transaction.on_commit(lambda: _apply(deltas))
+
+
+def record_total(name, delta):
+    """
+    Adjust a global total once the current transaction commits.
+
+    Args:
+        name: One of GLOBAL_TOTALS
+        delta: Number of rows created (positive) or deleted (negative)
+    """
+    _schedule({('global', 0, name, TOTAL_DATE): delta})
+
+
+def record_appointment_change(before, after):
+    """
+    Move an appointment's counts once the current transaction commits.
+
+    Args:
+        before: appointment_state() before the change, or None if it was created
+        after: appointment_state() after the change, or None if it was deleted
+    """
+    record_appointment_changes([(before, after)])
+
+
+def record_appointment_changes(changes):
+    """
+    Move the counts of several appointments in one counter update.
+
+    Args:
+        changes: Iterable of (before, after) appointment_state() pairs
+    """
+    deltas = Counter()
+    staff_ids, user_ids = set(), set()
+    for before, after in changes:
+        if before == after:
+            continue
+        for state in (before, after):
+            if state is not None:
+                staff_ids.add(state[0])
+                user_ids.add(state[1])
+        if before is not None:
+            deltas.update(_state_deltas(before, -1))
+        if after is not None:
+            deltas.update(_state_deltas(after, 1))
+        if before is None or after is None:
+            deltas[('global', 0, 'appointments', TOTAL_DATE)] += 1 if before is None else -1
+    if deltas:
+        _schedule(deltas)
+        invalidate_dashboards(staff_ids, user_ids)
+
+
+def record_status_changes(groups, status):
+    """
+    Move the counts of appointments that a bulk UPDATE gave a new status.
+
+    queryset.update() sends no signals, so set-based status changes (see
+    backend.appointments.sweeper) report what they changed here, grouped
+    the way the counters are keyed.
+
+    Args:
+        groups: Iterable of (staff_id, user_id, schedule date, old status, count) rows
+        status: Status the appointments were given
+    """
+    deltas = Counter()
+    staff_ids, user_ids = set(), set()
+    for staff_id, user_id, date, old_status, count in groups:
+        if old_status == status:
+            continue
+        staff_ids.add(staff_id)
+        user_ids.add(user_id)
+        for state, sign in (((staff_id, user_id, date, old_status), -count), ((staff_id, user_id, date, status), count)):
+            for key, delta in _state_deltas(state, sign).items():
+                deltas[key] += delta
+    if deltas:
+        _schedule(deltas)
+        invalidate_dashboards(staff_ids, user_ids)
+
+
+def global_totals():
+    """
+    Return the global totals shown on the admin dashboard.
+
+    Returns:
+        Dict of name -> count for every name in GLOBAL_TOTALS
+    """
+    values = dict(
+        DashboardCounter.objects.filter(
+            scope='global', owner_id=0, name__in=GLOBAL_TOTALS, date=TOTAL_DATE
+        ).values_list('name', 'value')
+    )
+    return {name: values.get(name, 0) for name in GLOBAL_TOTALS}
+
+
+def customer_counts(user_id, today):
+    """
+    Return the appointment figures of a customer's dashboard in one query.
+
+    Args:
+        user_id: Customer's user ID
+        today: Current date
+
+    Returns:
+        Dict with upcoming (active appointments from today on), completed
+        and total_services counts
+    """
+    rows = DashboardCounter.objects.filter(
+        Q(scope='customer', owner_id=user_id, date__gte=today,
+          name__in=[appointment_counter(status) for status in ACTIVE_STATUSES])
+        | Q(scope='customer', owner_id=user_id, date=TOTAL_DATE, name=appointment_counter('Completed'))
+        | Q(scope='global', owner_id=0, date=TOTAL_DATE, name='services')
+    ).values_list('scope', 'date', 'value')
+
+    counts = {'upcoming': 0, 'completed': 0, 'total_services': 0}
+    for scope, date, value in rows:
+        if scope == 'global':
+            counts['total_services'] = value
+        elif date == TOTAL_DATE:
+            counts['completed'] = value
+        else:
+            counts['upcoming'] += value
+    return counts
+
+
+def staff_counts(staff_id, today):
+    """
+    Return the appointment figures of a staff dashboard in one query.
+
+    Args:
+        staff_id: Staff primary key
+        today: Current date
+
+    Returns:
+        Dict with total, pending and completed_today counts
+    """
+    completed = appointment_counter('Completed')
+    rows = DashboardCounter.objects.filter(
+        Q(date=TOTAL_DATE) | Q(date=today, name=completed),
+        scope='staff',
+        owner_id=staff_id
+    ).values_list('name', 'date', 'value')
+
+    counts = {'total': 0, 'pending': 0, 'completed_today': 0}
+    for name, date, value in rows:
+        if date != TOTAL_DATE:
+            counts['completed_today'] = value
+            continue
+        counts['total'] += value
+        if name == appointment_counter('Pending'):
+            counts['pending'] = value
+    return counts
+
+
+def expected_counters():
+    """
+    Compute every counter from the source tables.
+
+    Returns:
+        Dict of (scope, owner_id, name, date) -> value, without zero counts
+    """
+    from backend.schedules.models import Schedule
+    from backend.services.models import Service
+    from backend.staff.models import Staff
+
+    expected = {
+        ('global', 0, 'services', TOTAL_DATE): Service.objects.count(),
+        ('global', 0, 'staff', TOTAL_DATE): Staff.objects.count(),
+        ('global', 0, 'appointments', TOTAL_DATE): Appointment.objects.count(),
+        ('global', 0, 'schedules', TOTAL_DATE): Schedule.objects.count(),
+    }
+
+    for scope, owner in (('staff', 'staff_id'), ('customer', 'user_id')):
+        rows = (
+            Appointment.objects.values_list(owner, 'schedule__date', 'status')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        for owner_id, date, status, count in rows:
+            name = appointment_counter(status)
+            expected[(scope, owner_id, name, date)] = count
+            total = (scope, owner_id, name, TOTAL_DATE)
+            expected[total] = expected.get(total, 0) + count
+
+    return {key: value for key, value in expected.items() if value}
+
+
+def rebuild_counters(batch_size=1000):
+    """
+    Replace every counter with a fresh count from the source tables.
+
+    For freshly seeded data; reconcile_dashboard_counters is the safe way to
+    correct a live database, as it only rewrites the counters that drifted.
+
+    Args:
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        Number of counters written
+    """
+    counters = [
+        DashboardCounter(scope=scope, owner_id=owner_id, name=name, date=date, value=value)
+        for (scope, owner_id, name, date), value in expected_counters().items()
+    ]
+    with transaction.atomic():
+        DashboardCounter.objects.all().delete()
+        DashboardCounter.objects.bulk_create(counters, batch_size=batch_size)
+    return len(counters)
+
+
+def _on_appointment_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._counter_before = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not {'staff', 'user', 'schedule', 'status'} & set(update_fields):
+        return
+    instance._counter_before = (
+        Appointment.objects.filter(pk=instance.pk)
+        .values_list('staff_id', 'user_id', 'schedule__date', 'status', 'schedule_id')
+        .first()
+    )
+
+
+def _on_appointment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        record_appointment_change(None, appointment_state(instance))
+        return
+
+    # Dashboards also show fields the counters ignore (service, notes)
+    invalidate_dashboards([instance.staff_id], [instance.user_id])
+
+    previous = getattr(instance, '_counter_before', None)
+    if previous is None:
+        return
+    *before, schedule_id = previous
+    # Reuse the stored date rather than loading an unchanged schedule
+    date = before[2] if schedule_id == instance.schedule_id else instance.schedule.date
+    record_appointment_change(
+        tuple(before),
+        (instance.staff_id, instance.user_id, date, instance.status)
+    )
+
+
+def _on_appointment_pre_delete(sender, instance, **kwargs):
+    # Runs before the cascade removes the schedule, and only takes effect
+    # if the delete commits
+    record_appointment_change(appointment_state(instance), None)
+
+
+def _total_receivers(name):
+    def saved(sender, instance, created, raw=False, **kwargs):
+        if created and not raw:
+            record_total(name, 1)
+
+    def deleted(sender, instance, **kwargs):
+        record_total(name, -1)
+
+    return saved, deleted
+
+
+def connect_signals():
+    """Keep the counters current on single-row writes; called from AppConfig.ready()."""
+    from backend.schedules.models import Schedule
+    from backend.services.models import Service
+    from backend.staff.models import Staff
+
+    pre_save.connect(_on_appointment_pre_save, sender=Appointment, dispatch_uid='counters_appointment_pre_save')
+    post_save.connect(_on_appointment_saved, sender=Appointment, dispatch_uid='counters_appointment_saved')
+    pre_delete.connect(_on_appointment_pre_delete, sender=Appointment, dispatch_uid='counters_appointment_deleted')
+
+    for model, name in ((Service, 'services'), (Staff, 'staff'), (Schedule, 'schedules')):
+        saved, deleted = _total_receivers(name)
+        # Closures would be garbage collected under the default weak reference
+        post_save.connect(saved, sender=model, weak=False, dispatch_uid=f'counters_{name}_saved')
+        post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=f'counters_{name}_deleted')
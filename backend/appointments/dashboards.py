@@ -0,0 +1,270 @@
+"""
+Per-member cache of staff and customer dashboard data.
+
+Staff refresh their dashboard all day, while what it shows only changes
+when one of their appointments or slots does. Each member's dashboard data
+is cached under a key that embeds everything it depends on:
+
+- a per-member version stamp, bumped whenever an appointment of that staff
+  member or customer is created, changed or deleted (see counters.py),
+- the staff member's availability generation, which already moves on
+  every claim, release and edit of their slots,
+- the catalog version, since service names and prices are shown,
+- today's date, so "today" and "upcoming" roll over at midnight.
+
+Any of these moving orphans the cached entry, so repeat loads cost a few
+cache reads and no queries. Edits the key does not cover (a customer
+renaming themselves) show up once DASHBOARD_CACHE_TIMEOUT expires.
+
+A bumped stamp only reaches other worker processes through a shared cache.
+With a process-local cache (the LocMemCache default) the per-member stamp
+is instead read from the member's appointments, their count and newest
+updated_at, and kept for LOCAL_VERSION_TTL seconds, so a booking made
+through another worker shows up within that time.
+"""
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+
+from backend.caching import cache_is_shared
+from backend.services.catalog import get_catalog_version
+
+
+VERSION_KEY = 'dashboard:version:{scope}:{owner_id}'
+LOCAL_VERSION_KEY = 'dashboard:local-version:{scope}:{owner_id}'
+PROFILE_KEY = 'dashboard:staff-profile:{user_id}'
+
+# Seconds a worker without a shared cache reuses the stamp it read from
+# the database
+LOCAL_VERSION_TTL = 2
+
+UPCOMING_DAYS = 7
+
+
+def _timeout():
+    return getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 600)
+
+
+def _version_key(scope, owner_id):
+    return VERSION_KEY.format(scope=scope, owner_id=owner_id)
+
+
+def _local_version_key(scope, owner_id):
+    return LOCAL_VERSION_KEY.format(scope=scope, owner_id=owner_id)
+
+
+def _database_version(scope, owner_id):
+    from .models import Appointment
+
+    owner = {'staff_id': owner_id} if scope == 'staff' else {'user_id': owner_id}
+    stats = Appointment.objects.filter(**owner).aggregate(count=Count('id'), newest=Max('updated_at'))
+    newest = stats['newest']
+    return f"db-{stats['count']}-{int(newest.timestamp() * 1000000) if newest else 0}"
+
+
+def _version(scope, owner_id):
+    if not cache_is_shared():
+        key = _local_version_key(scope, owner_id)
+        version = cache.get(key)
+        if version is None:
+            version = _database_version(scope, owner_id)
+            cache.set(key, version, LOCAL_VERSION_TTL)
+        return version
+
+    # Re-seeded from the clock when missing so it never repeats a stamp
+    key = _version_key(scope, owner_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key, 0)
+    return version
+
+
+def _bump(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Nothing cached under the old stamp either
+            pass
+
+
+def invalidate_dashboards(staff_ids=(), user_ids=()):
+    """
+    Drop cached dashboards of staff members and customers, once the current
+    transaction commits.
+
+    Args:
+        staff_ids: Staff primary keys
+        user_ids: Customer user IDs
+    """
+    owners = {('staff', staff_id) for staff_id in staff_ids if staff_id}
+    owners.update(('customer', user_id) for user_id in user_ids if user_id)
+    if not owners:
+        return
+    if not cache_is_shared():
+        # Other workers notice the change in the table within LOCAL_VERSION_TTL
+        keys = [_local_version_key(*owner) for owner in owners]
+        transaction.on_commit(lambda: cache.delete_many(keys))
+        return
+    keys = {_version_key(*owner) for owner in owners}
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate_staff_profile(user_id):
+    """
+    Drop the cached staff profile of a user, once the current transaction commits.
+
+    Args:
+        user_id: User ID of the staff member
+    """
+    transaction.on_commit(lambda: cache.delete(PROFILE_KEY.format(user_id=user_id)))
+
+
+def get_staff_profile(user):
+    """
+    Return the Staff profile of a user, cached.
+
+    Args:
+        user: User instance
+
+    Returns:
+        Staff instance (with user loaded), or None if the user has no profile
+    """
+    from backend.staff.models import Staff
+
+    key = PROFILE_KEY.format(user_id=user.id)
+    staff_profile = cache.get(key)
+    if staff_profile is None:
+        staff_profile = Staff.objects.select_related('user').filter(user=user).first()
+        if staff_profile is not None:
+            cache.set(key, staff_profile, _timeout())
+    return staff_profile
+
+
+def get_staff_dashboard(staff_profile, today):
+    """
+    Return the data shown on a staff member's dashboard.
+
+    Args:
+        staff_profile: Staff instance
+        today: Current date
+
+    Returns:
+        Dict with todays_appointments, upcoming_appointments, week_schedules,
+        schedules_by_day (sorted (date, schedules) pairs) and the
+        total_appointments, pending_appointments and completed_today counts
+    """
+    # Imported here: the availability module loads counters, which loads this one
+    from backend.schedules.availability import availability_version
+
+    key = 'dashboard:staff:{}:{}:{}:{}:{}'.format(
+        staff_profile.id,
+        today,
+        _version('staff', staff_profile.id),
+        availability_version(staff_profile.id),
+        get_catalog_version()
+    )
+    data = cache.get(key)
+    if data is None:
+        data = _build_staff_dashboard(staff_profile, today)
+        cache.set(key, data, _timeout())
+    return data
+
+
+def get_customer_dashboard(user, today):
+    """
+    Return the data shown on a customer's dashboard.
+
+    Args:
+        user: Customer User instance
+        today: Current date
+
+    Returns:
+        Dict with the next five appointments and the upcoming_count,
+        completed_count and total_services counts
+    """
+    key = 'dashboard:customer:{}:{}:{}:{}'.format(
+        user.id,
+        today,
+        _version('customer', user.id),
+        get_catalog_version()
+    )
+    data = cache.get(key)
+    if data is None:
+        data = _build_customer_dashboard(user, today)
+        cache.set(key, data, _timeout())
+    return data
+
+
+def _build_staff_dashboard(staff_profile, today):
+    from backend.schedules.models import Schedule
+    from .counters import ACTIVE_STATUSES, staff_counts
+    from .models import Appointment
+
+    todays_appointments = list(
+        Appointment.objects.filter(staff=staff_profile, schedule__date=today)
+        .select_related('user', 'service', 'schedule')
+        .order_by('schedule__start_time', 'schedule__time_slot')
+    )
+
+    upcoming_appointments = list(
+        Appointment.objects.filter(
+            staff=staff_profile,
+            schedule__date__gt=today,
+            schedule__date__lte=today + timedelta(days=UPCOMING_DAYS),
+            status__in=ACTIVE_STATUSES
+        )
+        .select_related('user', 'service', 'schedule')
+        .order_by('schedule__date', 'schedule__start_time', 'schedule__time_slot')[:10]
+    )
+
+    stats = staff_counts(staff_profile.id, today)
+
+    week_schedules = list(
+        Schedule.objects.filter(
+            staff=staff_profile,
+            date__gte=today,
+            date__lte=today + timedelta(days=UPCOMING_DAYS)
+        )
+    )
+
+    # Group schedules by date for the tabbed view
+    schedules_by_day = defaultdict(list)
+    for schedule in week_schedules:
+        schedules_by_day[schedule.date].append(schedule)
+
+    return {
+        'todays_appointments': todays_appointments,
+        'upcoming_appointments': upcoming_appointments,
+        'total_appointments': stats['total'],
+        'pending_appointments': stats['pending'],
+        'completed_today': stats['completed_today'],
+        'week_schedules': week_schedules,
+        'schedules_by_day': sorted(schedules_by_day.items()),
+    }
+
+
+def _build_customer_dashboard(user, today):
+    from .counters import customer_counts
+    from .models import Appointment
+
+    appointments = list(
+        Appointment.objects.filter(user=user, schedule__date__gte=today)
+        .select_related('service', 'staff__user', 'schedule')
+        .order_by('schedule__date', 'schedule__start_time', 'schedule__time_slot')[:5]
+    )
+
+    stats = customer_counts(user.id, today)
+
+    return {
+        'appointments': appointments,
+        'upcoming_count': stats['upcoming'],
+        'completed_count': stats['completed'],
+        'total_services': stats['total_services'],
+    }
@@ -0,0 +1,22 @@
+"""
+Background jobs queued by appointment changes (see backend.jobs.queue).
+"""
+from backend.jobs.queue import job
+from .booking import release_vacated_slots
+from .models import Appointment
+
+
+@job('appointments.release_slots')
+def release_cancelled_slots(appointment_id):
+    """
+    Make the slots of a cancelled appointment bookable again.
+
+    Does nothing if the appointment was deleted or is no longer cancelled
+    by the time the job runs, and skips slots that are already free, so
+    running it twice is harmless.
+
+    Args:
+        appointment_id: Appointment primary key
+    """
+    if Appointment.objects.filter(id=appointment_id, status='Cancelled').exists():
+        release_vacated_slots([appointment_id])
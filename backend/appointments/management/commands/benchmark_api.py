@@ -0,0 +1,375 @@
+import json
+import os
+import platform
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+import warnings
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.utils import timezone
+
+from backend.accounts.models import User
+from backend.staff.models import Staff, StaffService
+from backend.schedules.models import Schedule
+from backend.appointments.synthetic import seed_salon
+
+
+# Settings the benchmark runs under: no DEBUG query log or sampled SQL
+# logging, no manifest for the templates' static files, and a private
+# cache so runs start cold and never touch a shared one
+BENCHMARK_SETTINGS = {
+    'DEBUG': False,
+    'SQL_INSTRUMENTATION_SAMPLE_RATE': 0.0,
+    'STATICFILES_STORAGE': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    'CACHES': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'benchmark',
+        }
+    },
+}
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request')
+
+
+def _scenarios(salon, today):
+    """
+    The benchmarked requests, as (name, role, method, path builder); the
+    booking scenario has no path builder and posts its own payloads.
+
+    Paths are built per request from a counter, so clients walk through
+    different staff members, services and days rather than one hot URL.
+    """
+    staff_ids = salon['staff_ids']
+    service_ids = salon['service_ids']
+    days = max(salon['days'], 1)
+
+    def pick(items, i):
+        return items[i % len(items)]
+
+    return [
+        ('services list', 'customer', 'get', lambda i: '/api/services/'),
+        ('staff by service', 'customer', 'get',
+         lambda i: f'/api/staff/?service_id={pick(service_ids, i)}'),
+        ('schedules of a staff member and day', 'customer', 'get',
+         lambda i: f'/api/schedules/?staff_id={pick(staff_ids, i)}&date={today + timedelta(days=i % days)}'),
+        ('schedules fitting a service', 'customer', 'get',
+         lambda i: f'/api/schedules/?staff_id={pick(staff_ids, i)}&service_id={pick(service_ids, i // len(staff_ids))}'),
+        ('booking bootstrap', 'customer', 'get',
+         lambda i: f'/api/booking/bootstrap/?service_id={pick(service_ids, i)}'),
+        ('appointment list (customer)', 'customer', 'get', lambda i: '/api/appointments/'),
+        ('appointment list (admin)', 'admin', 'get', lambda i: '/api/appointments/'),
+        ('book appointment', 'customer', 'post', None),
+        ('customer dashboard', 'customer', 'get', lambda i: '/accounts/dashboard/'),
+        ('staff dashboard', 'staff', 'get', lambda i: '/accounts/staff-dashboard/'),
+        ('admin dashboard', 'admin', 'get', lambda i: '/accounts/admin-dashboard/'),
+    ]
+
+
+def _percentile(ordered, percent):
+    # Nearest rank
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def _summarize(samples, elapsed):
+    latencies = sorted(sample[0] for sample in samples)
+    count = len(samples)
+    return {
+        'requests': count,
+        'errors': sum(1 for sample in samples if sample[2] >= 400),
+        'p50_ms': round(_percentile(latencies, 50), 2),
+        'p95_ms': round(_percentile(latencies, 95), 2),
+        'p99_ms': round(_percentile(latencies, 99), 2),
+        'mean_ms': round(sum(latencies) / count, 2) if count else 0.0,
+        'queries_per_request': round(sum(sample[1] for sample in samples) / count, 2) if count else 0.0,
+        'throughput_rps': round(count / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic salon into a throwaway test database, drive the API '
+        'endpoints and dashboards with concurrent clients and report latency '
+        'percentiles, queries per request and throughput. Results can be saved '
+        'as a JSON baseline and later runs compared against it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--staff', type=int, default=10, help='Staff members to seed (default: 10)')
+        parser.add_argument('--customers', type=int, default=200, help='Customers to seed (default: 200)')
+        parser.add_argument('--services', type=int, default=10, help='Services to seed (default: 10)')
+        parser.add_argument('--days', type=int, default=30, help='Days of slots ahead of today (default: 30)')
+        parser.add_argument('--history-days', type=int, default=60, help='Days of past appointments (default: 60)')
+        parser.add_argument('--booked', type=float, default=0.5, help='Share of slots booked (default: 0.5)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the dataset (default: 0)')
+        parser.add_argument('--clients', type=int, default=4, help='Concurrent clients (default: 4)')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario (default: 200)')
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per scenario (default: 10)')
+        parser.add_argument('--only', action='append', default=[], help='Run scenarios whose name contains this text')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--compare', help='Compare against a JSON file written by --output')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Allowed relative slowdown of p95 latency before --compare fails (default: 0.2)'
+        )
+
+    def handle(self, *args, **options):
+        if options['staff'] < 1 or options['customers'] < 1 or options['services'] < 1:
+            raise CommandError('--staff, --customers and --services must be at least 1.')
+        if options['clients'] < 1 or options['requests'] < 1:
+            raise CommandError('--clients and --requests must be at least 1.')
+        if not 0 <= options['booked'] < 1:
+            raise CommandError('--booked must be at least 0 and below 1.')
+
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        setup_test_environment()
+        try:
+            with override_settings(**BENCHMARK_SETTINGS), warnings.catch_warnings():
+                # WhiteNoise complains when collectstatic has not run
+                warnings.filterwarnings('ignore', 'No directory at', UserWarning)
+                results = self._run_in_test_database(options)
+        finally:
+            teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            self._compare(baseline, results, options['tolerance'])
+
+    def _run_in_test_database(self, options):
+        temp_dir = None
+        if connection.vendor == 'sqlite':
+            # A file rather than the in-memory default, so every client
+            # thread sees the same database
+            temp_dir = tempfile.TemporaryDirectory()
+            connection.settings_dict['TEST']['NAME'] = os.path.join(temp_dir.name, 'benchmark.sqlite3')
+
+        self.stdout.write('Creating the test database...')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            return self._benchmark(options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if temp_dir is not None:
+                temp_dir.cleanup()
+
+    def _benchmark(self, options):
+        started = time.perf_counter()
+        salon = seed_salon(
+            staff=options['staff'],
+            customers=options['customers'],
+            services=options['services'],
+            days=options['days'],
+            history_days=options['history_days'],
+            booked=options['booked'],
+            seed=options['seed'],
+            tag='bench',
+            log=self.stdout.write
+        )
+        salon['days'] = options['days']
+        self.stdout.write(
+            f"Seeded {salon['schedules']} slots and {salon['appointments']} appointments "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        today = timezone.now().date()
+        users = {
+            'admin': User.objects.get(id=salon['admin_id']),
+            'customer': User.objects.get(id=salon['customer_ids'][0]),
+            'staff': Staff.objects.select_related('user').get(id=salon['staff_ids'][0]).user,
+        }
+        bookable = self._bookable_slots(salon, today)
+
+        scenarios = [
+            scenario for scenario in _scenarios(salon, today)
+            if not options['only'] or any(text in scenario[0] for text in options['only'])
+        ]
+        if not scenarios:
+            raise CommandError('No scenario matches --only.')
+
+        self.stdout.write(
+            f"\n{'Scenario':<38} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8} {'req/s':>8} {'errors':>7}"
+        )
+        results = {}
+        for name, role, method, path in scenarios:
+            if path is None:
+                if bookable.empty():
+                    self.stdout.write(f'{name:<38} skipped: no free slots to book')
+                    continue
+                request = self._booking_request(bookable, users['customer'])
+            else:
+                request = lambda client, i, method=method, path=path: getattr(client, method)(path(i))
+
+            summary = self._run_scenario(users[role], request, options)
+            results[name] = summary
+            style = self.style.ERROR if summary['errors'] else (lambda text: text)
+            self.stdout.write(style(
+                f"{name:<38} {summary['p50_ms']:>8.1f} {summary['p95_ms']:>8.1f} "
+                f"{summary['p99_ms']:>8.1f} {summary['queries_per_request']:>8.1f} "
+                f"{summary['throughput_rps']:>8.1f} {summary['errors']:>7}"
+            ))
+
+        self.stdout.write('(latencies in ms)')
+
+        return {
+            'meta': {
+                'commit': _git_commit(),
+                'created_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'parameters': {
+                    key: options[key] for key in (
+                        'staff', 'customers', 'services', 'days', 'history_days', 'booked',
+                        'seed', 'clients', 'requests', 'warmup'
+                    )
+                },
+            },
+            'scenarios': results,
+        }
+
+    def _bookable_slots(self, salon, today):
+        """Free future slots, each with a one-slot service their staff member offers."""
+        short_services = {}
+        for staff_id, service_id in (
+            StaffService.objects.filter(staff_id__in=salon['staff_ids'], service__duration__lte=60)
+            .order_by('staff_id', 'service_id').values_list('staff_id', 'service_id')
+        ):
+            short_services.setdefault(staff_id, service_id)
+
+        slots = queue.SimpleQueue()
+        for staff_id, date, time_slot in (
+            Schedule.objects.filter(
+                staff_id__in=list(short_services), availability_status=True, date__gt=today
+            ).order_by('date', 'start_time', 'staff_id').values_list('staff_id', 'date', 'time_slot')
+        ):
+            slots.put({
+                'service_id': short_services[staff_id],
+                'staff_id': staff_id,
+                'date': str(date),
+                'time_slot': time_slot,
+            })
+        return slots
+
+    def _booking_request(self, bookable, customer):
+        # Every request books a different free slot; once they run out the
+        # rest are measured as "slot taken" rejections of the last one
+        last = {}
+
+        def request(client, i):
+            try:
+                last['payload'] = payload = {**bookable.get_nowait(), 'user_id': customer.id}
+            except queue.Empty:
+                payload = last['payload']
+            return client.post('/api/appointments/book/', payload, content_type='application/json')
+
+        return request
+
+    def _run_scenario(self, user, request, options):
+        clients = options['clients']
+        warmup = options['warmup']
+        warming = iter(range(warmup))
+        measuring = iter(range(warmup, warmup + options['requests']))
+        lock = threading.Lock()
+        barrier = threading.Barrier(clients)
+        samples = []
+        window = []
+
+        def next_index(indexes):
+            with lock:
+                return next(indexes, None)
+
+        def run():
+            client = Client(raise_request_exception=False)
+            client.force_login(user)
+            try:
+                while (index := next_index(warming)) is not None:
+                    request(client, index)
+
+                barrier.wait()
+                with lock:
+                    if not window:
+                        window.append(time.perf_counter())
+
+                measured = []
+                while (index := next_index(measuring)) is not None:
+                    with CaptureQueriesContext(connection) as queries:
+                        began = time.perf_counter()
+                        response = request(client, index)
+                        duration = (time.perf_counter() - began) * 1000
+                    measured.append((duration, len(queries), response.status_code))
+
+                with lock:
+                    samples.extend(measured)
+                    window[1:] = [time.perf_counter()]
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        elapsed = window[1] - window[0] if len(window) == 2 else 0.0
+        return _summarize(samples, elapsed)
+
+    def _compare(self, baseline, results, tolerance):
+        self.stdout.write(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'}:")
+        if baseline['meta'].get('parameters') != results['meta']['parameters']:
+            self.stdout.write(self.style.WARNING('  The runs used different parameters.'))
+
+        regressions = []
+        for name, current in results['scenarios'].items():
+            before = baseline['scenarios'].get(name)
+            if before is None:
+                self.stdout.write(f'  {name}: not in the baseline')
+                continue
+
+            changes = ', '.join(
+                f'{metric} {before[metric]:.1f} → {current[metric]:.1f}' for metric in METRICS
+            )
+            slower = current['p95_ms'] > before['p95_ms'] * (1 + tolerance)
+            # Query counts do not depend on the machine, so any growth counts
+            more_queries = current['queries_per_request'] > before['queries_per_request'] + 0.5
+            if slower or more_queries:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(f'✗ {name}: {changes}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✓ {name}: {changes}'))
+
+        if regressions:
+            raise CommandError(f'{len(regressions)} scenario(s) regressed against the baseline.')
+        self.stdout.write(self.style.SUCCESS('\n✓ No regressions against the baseline'))
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from backend.services.models import Service
+from backend.staff.models import Staff
+
+
+# How each deployment is started; both read the configured database
+SERVERS = {
+    'wsgi': {
+        'args': ['salon_booking_system.wsgi:application'],
+        'env': {'API_ASYNC_VIEWS': 'False'},
+    },
+    'asgi': {
+        'args': ['salon_booking_system.asgi:application', '-k', 'uvicorn.workers.UvicornWorker'],
+        'env': {'API_ASYNC_VIEWS': 'True'},
+    },
+}
+
+# Staff members the lookups cycle through; the default warmup loads all of
+# their availability index entries, so cold loads do not skew the results
+STAFF_POOL = 50
+
+
+def _scenarios(staff_ids, service_ids, today):
+    def pick(items, i):
+        return items[i % len(items)]
+
+    return [
+        ('availability of a staff member and day',
+         lambda i: f'/api/schedules/?staff_id={pick(staff_ids, i)}&date={today + timedelta(days=i % 14)}'),
+        ('availability fitting a service',
+         lambda i: f'/api/schedules/?staff_id={pick(staff_ids, i)}&service_id={pick(service_ids, i // len(staff_ids))}'),
+        ('staff by service', lambda i: f'/api/staff/?service_id={pick(service_ids, i)}'),
+        ('staff detail', lambda i: f'/api/staff/{pick(staff_ids, i)}/'),
+        ('services list', lambda i: '/api/services/'),
+    ]
+
+
+def _percentile(ordered, percent):
+    # Nearest rank
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+async def _get(port, path, send_delay=0.0):
+    """
+    GET a path over a fresh connection; return the status code.
+
+    With send_delay the request headers arrive in two parts that many
+    seconds apart, like from a client on a slow network.
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n'.encode())
+        if send_delay:
+            await writer.drain()
+            await asyncio.sleep(send_delay)
+        writer.write(b'Accept: application/json\r\nConnection: close\r\n\r\n')
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b' ', 2)[1]) if response else 599
+
+
+async def _load(port, path, count, concurrency, send_delay):
+    """Fire count requests from concurrency connections at a time."""
+    indexes = iter(range(count))
+    samples = []
+
+    async def client():
+        for index in indexes:
+            began = time.perf_counter()
+            try:
+                status = await _get(port, path(index), send_delay)
+            except OSError:
+                status = 599
+            samples.append(((time.perf_counter() - began) * 1000, status))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        'Start the app under gunicorn twice, as WSGI with the DRF read views and '
+        'as ASGI with the async read views, fire the same concurrent availability '
+        'and catalog lookups at each and compare latency and throughput. Reads '
+        'the configured database, so seed it first (e.g. with seed_salon).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Server processes of each deployment (default: 1)')
+        parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight at once (default: 50)')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per scenario (default: 1000)')
+        parser.add_argument('--warmup', type=int, default=100, help='Unmeasured requests per scenario (default: 100)')
+        parser.add_argument(
+            '--slow-clients', type=float, default=0, metavar='MS',
+            help='Make every client take this long to send its request headers (default: 0)'
+        )
+        parser.add_argument('--port', type=int, default=8765, help='Port the servers listen on (default: 8765)')
+        parser.add_argument('--server', action='append', choices=sorted(SERVERS), help='Only run these deployments')
+        parser.add_argument('--only', action='append', default=[], help='Run scenarios whose name contains this text')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--workers, --concurrency and --requests must be at least 1.')
+
+        staff_ids = list(Staff.objects.filter(is_available=True).order_by('id').values_list('id', flat=True)[:STAFF_POOL])
+        service_ids = list(Service.objects.filter(is_active=True).order_by('id').values_list('id', flat=True))
+        if not staff_ids or not service_ids:
+            raise CommandError('The database has no available staff or active services; seed it first.')
+
+        scenarios = [
+            scenario for scenario in _scenarios(staff_ids, service_ids, timezone.now().date())
+            if not options['only'] or any(text in scenario[0] for text in options['only'])
+        ]
+        if not scenarios:
+            raise CommandError('No scenario matches --only.')
+
+        results = {}
+        for server in options['server'] or list(SERVERS):
+            self.stdout.write(
+                f"\n{server.upper()} ({options['workers']} worker(s), {options['concurrency']} concurrent requests"
+                + (f", clients sending over {options['slow_clients']:g}ms" if options['slow_clients'] else '')
+                + ')'
+            )
+            self.stdout.write(f"{'Scenario':<42} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'errors':>7}")
+            results[server] = self._run_server(server, scenarios, options)
+
+        if len(results) == len(SERVERS):
+            self.stdout.write('\nASGI throughput relative to WSGI:')
+            for name, _ in scenarios:
+                wsgi, asgi = results['wsgi'][name], results['asgi'][name]
+                ratio = asgi['throughput_rps'] / wsgi['throughput_rps'] if wsgi['throughput_rps'] else 0.0
+                self.stdout.write(f'  {name:<42} {ratio:.2f}x')
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({
+                    'meta': {
+                        'created_at': timezone.now().isoformat(),
+                        'parameters': {
+                            key: options[key]
+                            for key in ('workers', 'concurrency', 'requests', 'warmup', 'slow_clients')
+                        },
+                    },
+                    'servers': results,
+                }, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        self.stdout.write(self.style.SUCCESS('\n✓ Benchmark finished'))
+
+    def _run_server(self, server, scenarios, options):
+        port = options['port']
+        process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn', *SERVERS[server]['args'],
+                '--workers', str(options['workers']),
+                '--bind', f'127.0.0.1:{port}',
+                '--log-level', 'warning',
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, **SERVERS[server]['env'], 'SQL_INSTRUMENTATION_SAMPLE_RATE': '0'},
+        )
+        try:
+            self._wait_until_up(process, port)
+            return asyncio.run(self._run_scenarios(scenarios, options))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    def _wait_until_up(self, process, port):
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'The server exited with status {process.returncode}.')
+            try:
+                asyncio.run(_get(port, '/api/'))
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError('The server did not start within 30 seconds.')
+
+    async def _run_scenarios(self, scenarios, options):
+        results = {}
+        send_delay = options['slow_clients'] / 1000
+        for name, path in scenarios:
+            await _load(options['port'], path, options['warmup'], options['concurrency'], send_delay)
+            samples, elapsed = await _load(
+                options['port'], path, options['requests'], options['concurrency'], send_delay
+            )
+
+            latencies = sorted(sample[0] for sample in samples)
+            summary = {
+                'requests': len(samples),
+                'errors': sum(1 for sample in samples if sample[1] >= 400),
+                'p50_ms': round(_percentile(latencies, 50), 2),
+                'p95_ms': round(_percentile(latencies, 95), 2),
+                'p99_ms': round(_percentile(latencies, 99), 2),
+                'throughput_rps': round(len(samples) / elapsed, 1),
+            }
+            results[name] = summary
+
+            style = self.style.ERROR if summary['errors'] else (lambda text: text)
+            self.stdout.write(style(
+                f"{name:<42} {summary['p50_ms']:>8.1f} {summary['p95_ms']:>8.1f} "
+                f"{summary['p99_ms']:>8.1f} {summary['throughput_rps']:>8.1f} {summary['errors']:>7}"
+            ))
+        return results
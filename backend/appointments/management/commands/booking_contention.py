@@ -0,0 +1,189 @@
+import multiprocessing
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from backend.accounts.models import User
+from backend.services.models import Service
+from backend.staff.models import Staff
+from backend.schedules.models import Schedule
+from backend.appointments.models import Appointment
+from backend.appointments.booking import ACTIVE_STATUSES
+from backend.appointments.counters import record_total
+
+
+def _book_slots(barrier, results, user_id, service_id, schedule_ids, seed):
+    """Worker process: try to book every slot, in its own random order."""
+    import django
+    django.setup()
+
+    from django.db import DatabaseError
+    from backend.appointments.booking import book_appointment
+
+    user = User.objects.get(id=user_id)
+    service = Service.objects.get(id=service_id)
+    schedules = list(Schedule.objects.select_related('staff').filter(id__in=schedule_ids))
+    random.Random(seed).shuffle(schedules)
+
+    booked = taken = errors = 0
+
+    barrier.wait()
+    started = time.perf_counter()
+
+    for schedule in schedules:
+        try:
+            book_appointment(user, service, schedule.staff, schedule)
+            booked += 1
+        except ValidationError:
+            taken += 1
+        except DatabaseError:
+            # Lock timeouts or deadlocks surfaced by the database
+            errors += 1
+
+    finished = time.perf_counter()
+    connections.close_all()
+    results.put((booked, taken, errors, started, finished))
+
+
+class Command(BaseCommand):
+    help = (
+        'Race several processes to book the same slots and verify that no slot '
+        'is ever booked twice. Creates its own throwaway staff, customers and '
+        'schedules and deletes them afterwards. Refuses to run with DEBUG off '
+        'unless --force is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Number of competing processes')
+        parser.add_argument('--slots', type=int, default=50, help='Number of contested schedule slots')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated rows for inspection')
+        parser.add_argument('--force', action='store_true', help='Run even with DEBUG off (e.g. against staging)')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        slot_count = options['slots']
+
+        if workers < 2 or slot_count < 1:
+            raise CommandError('Need at least 2 workers and 1 slot.')
+        if not settings.DEBUG and not options['force']:
+            raise CommandError(
+                'DEBUG is off, so this may be a production database. '
+                'Pass --force to race bookings against it anyway.'
+            )
+
+        tag = f'contention{int(time.time())}'
+        created_service = False
+
+        service = Service.objects.filter(is_active=True).first()
+        if service is None:
+            service = Service.objects.create(name=f'{tag} service', price=0, duration=60)
+            created_service = True
+
+        staff_user = User.objects.create_user(username=f'{tag}_staff', password=None, role='Staff')
+        staff = Staff.objects.create(user=staff_user, specialization='Contention test')
+        customers = [
+            User.objects.create_user(username=f'{tag}_customer{i}', password=None, role='Customer')
+            for i in range(workers)
+        ]
+
+        # One far-future day per 9 slots so nothing collides with real bookings
+        base_date = timezone.now().date() + timedelta(days=3650)
+        Schedule.objects.bulk_create([
+            Schedule.for_time_slot(
+                f'{9 + i % 9:02d}:00-{10 + i % 9:02d}:00',
+                staff=staff,
+                date=base_date + timedelta(days=i // 9)
+            )
+            for i in range(slot_count)
+        ])
+        # Their cascading delete is counted, so count the insert too
+        record_total('schedules', slot_count)
+        schedule_ids = list(Schedule.objects.filter(staff=staff).values_list('id', flat=True))
+
+        self.stdout.write(f'Racing {workers} processes for {slot_count} slots...')
+
+        try:
+            outcome = self._race(customers, service, schedule_ids)
+            self._verify(schedule_ids, outcome)
+        finally:
+            if not options['keep']:
+                staff_user.delete()
+                User.objects.filter(id__in=[c.id for c in customers]).delete()
+                if created_service:
+                    service.delete()
+
+    def _race(self, customers, service, schedule_ids):
+        # Children must open their own database connections
+        connections.close_all()
+
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+        barrier = context.Barrier(len(customers))
+        results = context.Queue()
+
+        processes = [
+            context.Process(
+                target=_book_slots,
+                args=(barrier, results, customer.id, service.id, schedule_ids, index)
+            )
+            for index, customer in enumerate(customers)
+        ]
+        for process in processes:
+            process.start()
+
+        reports = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        booked = sum(r[0] for r in reports)
+        taken = sum(r[1] for r in reports)
+        errors = sum(r[2] for r in reports)
+        elapsed = max(r[4] for r in reports) - min(r[3] for r in reports)
+
+        return {
+            'booked': booked,
+            'taken': taken,
+            'errors': errors,
+            'elapsed': elapsed,
+        }
+
+    def _verify(self, schedule_ids, outcome):
+        active = Appointment.objects.filter(
+            schedule_id__in=schedule_ids,
+            status__in=ACTIVE_STATUSES
+        )
+        # Longer services also occupy the slots after their start slot
+        occupied = Counter(active.values_list('schedule_id', flat=True))
+        occupied.update(
+            Appointment.additional_schedules.through.objects.filter(
+                appointment__in=active,
+                schedule_id__in=schedule_ids
+            ).values_list('schedule_id', flat=True)
+        )
+        double_booked = sum(1 for count in occupied.values() if count > 1)
+        active_count = active.count()
+        attempts = outcome['booked'] + outcome['taken'] + outcome['errors']
+        elapsed = outcome['elapsed'] or 1e-9
+
+        self.stdout.write(f'  Attempts:          {attempts}')
+        self.stdout.write(f'  Booked:            {outcome["booked"]}')
+        self.stdout.write(f'  Slot taken:        {outcome["taken"]}')
+        self.stdout.write(f'  Database errors:   {outcome["errors"]}')
+        self.stdout.write(f'  Elapsed:           {outcome["elapsed"]:.3f}s')
+        self.stdout.write(f'  Bookings/sec:      {outcome["booked"] / elapsed:.1f}')
+        self.stdout.write(f'  Attempts/sec:      {attempts / elapsed:.1f}')
+
+        if double_booked or active_count != outcome['booked']:
+            raise CommandError(
+                f'{double_booked} slot(s) double booked; '
+                f'{active_count} active appointments for {outcome["booked"]} successful bookings.'
+            )
+
+        self.stdout.write(self.style.SUCCESS('✓ No double bookings'))
@@ -0,0 +1,215 @@
+import json
+import random
+import re
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from backend.accounts.models import User
+from backend.services.models import Service
+from backend.staff.models import Staff
+from backend.schedules.models import Schedule
+from backend.appointments.models import TOTAL_DATE, Appointment, DashboardCounter
+from backend.appointments.booking import ACTIVE_STATUSES
+from backend.appointments.counters import rebuild_counters
+from backend.appointments.reminders import due_reminders
+
+
+TIME_SLOTS = [f'{hour:02d}:00-{hour + 1:02d}:00' for hour in range(9, 18)]
+
+# Tables whose plans are checked; small lookup tables may be scanned
+CHECKED_TABLES = ('appointments', 'schedules', 'dashboard_counters')
+
+
+def _hot_queries(customer, staff, today):
+    """The queries behind dashboards and availability reads, as the views build them."""
+    week_end = today + timedelta(days=7)
+    return [
+        ('customer dashboard: upcoming appointments',
+         Appointment.objects.filter(user=customer, schedule__date__gte=today)
+         .select_related('service', 'staff__user', 'schedule')
+         .order_by('schedule__date', 'schedule__start_time', 'schedule__time_slot')[:5]),
+        ('appointment list: customer by status',
+         Appointment.objects.filter(user=customer, status__in=ACTIVE_STATUSES)
+         .select_related('service', 'staff__user', 'schedule')[:20]),
+        ('staff dashboard: today',
+         Appointment.objects.filter(staff=staff, schedule__date=today)
+         .select_related('user', 'service', 'schedule')
+         .order_by('schedule__start_time', 'schedule__time_slot')),
+        ('staff dashboard: next 7 days',
+         Appointment.objects.filter(
+             staff=staff,
+             schedule__date__gt=today,
+             schedule__date__lte=week_end,
+             status__in=ACTIVE_STATUSES
+         ).select_related('user', 'service', 'schedule')
+         .order_by('schedule__date', 'schedule__start_time', 'schedule__time_slot')[:10]),
+        ('staff dashboard: week schedules',
+         Schedule.objects.filter(staff=staff, date__gte=today, date__lte=week_end)),
+        ('schedule list: free slots of a day',
+         Schedule.objects.filter(availability_status=True, staff_id=staff.id, date=today)
+         .select_related('staff__user')),
+        ('availability index: free slots of a staff member',
+         Schedule.objects.filter(staff_id=staff.id, availability_status=True)
+         .select_related('staff__user')),
+        ('booking bootstrap: free slots over two weeks',
+         Schedule.objects.filter(
+             staff_id__in=[staff.id],
+             date__range=(today, today + timedelta(days=13)),
+             availability_status=True
+         ).values('id', 'staff', 'date', 'time_slot', 'start_time', 'end_time')),
+        ('reminders: due in the next day',
+         due_reminders(timezone.now(), timezone.now() + timedelta(hours=24))),
+        ('dashboard counters: customer',
+         DashboardCounter.objects.filter(
+             Q(scope='customer', owner_id=customer.id, date__gte=today)
+             | Q(scope='customer', owner_id=customer.id, date=TOTAL_DATE)
+         )),
+    ]
+
+
+def _full_scans(plan):
+    """Return the checked tables a query plan reads in full."""
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        # "SCAN t" and "SCAN t USING INDEX i" both visit every row
+        tables = re.findall(r'\bSCAN (\w+)', plan)
+    elif vendor == 'postgresql':
+        tables = re.findall(r'Seq Scan on (\w+)', plan)
+    elif vendor == 'mysql':
+        tables = re.findall(r'"table_name": "(\w+)",\s*"access_type": "ALL"', plan)
+    else:
+        raise CommandError(f'Query plans on {vendor} are not supported.')
+    return sorted({table for table in tables if table in CHECKED_TABLES})
+
+
+def _explain(queryset):
+    if connection.vendor == 'mysql':
+        return json.dumps(json.loads(queryset.explain(format='JSON')), indent=1)
+    return queryset.explain()
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a realistic dataset inside a transaction that is rolled back, '
+        'EXPLAIN the hot dashboard and availability queries, and fail if any '
+        'of them reads the appointments, schedules or counters table in full.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--staff', type=int, default=20, help='Staff members to seed (default: 20)')
+        parser.add_argument('--customers', type=int, default=1000, help='Customers to seed (default: 1000)')
+        parser.add_argument('--days', type=int, default=120, help='Days of slots to seed around today (default: 120)')
+        parser.add_argument('--booked', type=float, default=0.6, help='Share of slots booked (default: 0.6)')
+
+    def handle(self, *args, **options):
+        if options['staff'] < 1 or options['customers'] < 1 or options['days'] < 2:
+            raise CommandError('--staff and --customers must be at least 1, --days at least 2.')
+        if not 0 < options['booked'] <= 1:
+            raise CommandError('--booked must be between 0 and 1.')
+
+        failures = []
+        with transaction.atomic():
+            customer, staff, today = self._seed(options)
+            self._analyze()
+
+            for name, queryset in _hot_queries(customer, staff, today):
+                plan = _explain(queryset)
+                scanned = _full_scans(plan)
+                if scanned:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f'✗ {name}: full scan of {", ".join(scanned)}'))
+                    self.stdout.write(plan)
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'✓ {name}'))
+                    if options['verbosity'] > 1:
+                        self.stdout.write(plan)
+
+            # Leave no seeded rows behind
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot queries fall back to a full scan.')
+        self.stdout.write(self.style.SUCCESS('\n✓ Every hot query uses an index'))
+
+    def _seed(self, options):
+        tag = f'qp_{uuid.uuid4().hex[:8]}'
+        rng = random.Random(0)
+        today = timezone.now().date()
+        first_day = today - timedelta(days=options['days'] // 2)
+
+        self.stdout.write(
+            f"Seeding {options['staff']} staff, {options['customers']} customers and "
+            f"{options['days']} days of slots..."
+        )
+
+        service = Service.objects.create(name=f'{tag} service', price=0, duration=60)
+        User.objects.bulk_create([
+            User(username=f'{tag}_staff{i}', password='!', role='Staff')
+            for i in range(options['staff'])
+        ] + [
+            User(username=f'{tag}_customer{i}', password='!', role='Customer')
+            for i in range(options['customers'])
+        ])
+        users = list(User.objects.filter(username__startswith=f'{tag}_').order_by('id'))
+        staff_users, customers = users[:options['staff']], users[options['staff']:]
+
+        Staff.objects.bulk_create([
+            Staff(user=user, specialization='Query plan check') for user in staff_users
+        ])
+        staff_members = list(Staff.objects.filter(user__in=staff_users))
+
+        Schedule.objects.bulk_create(
+            [
+                Schedule.for_time_slot(time_slot, staff=member, date=first_day + timedelta(days=day))
+                for member in staff_members
+                for day in range(options['days'])
+                for time_slot in TIME_SLOTS
+            ],
+            batch_size=1000
+        )
+        schedules = list(
+            Schedule.objects.filter(staff__in=staff_members).values_list('id', 'staff_id', 'date')
+        )
+
+        booked = rng.sample(schedules, int(len(schedules) * options['booked']))
+        appointments = []
+        for schedule_id, staff_id, date in booked:
+            if date < today:
+                status = rng.choice(('Completed', 'Completed', 'Completed', 'Cancelled'))
+            else:
+                status = rng.choice(ACTIVE_STATUSES)
+            appointments.append(Appointment(
+                user=rng.choice(customers),
+                service=service,
+                staff_id=staff_id,
+                schedule_id=schedule_id,
+                status=status
+            ))
+        Appointment.objects.bulk_create(appointments, batch_size=1000)
+
+        active_ids = [appointment.schedule_id for appointment in appointments if appointment.status in ACTIVE_STATUSES]
+        for start in range(0, len(active_ids), 1000):
+            Schedule.objects.filter(id__in=active_ids[start:start + 1000]).update(availability_status=False)
+
+        # bulk_create() skipped the counter updates
+        rebuild_counters()
+
+        self.stdout.write(f'Seeded {len(schedules)} slots and {len(appointments)} appointments')
+        return customers[0], staff_members[0], today
+
+    def _analyze(self):
+        # Fresh statistics so the planner sees the seeded volume; MySQL's
+        # ANALYZE TABLE would commit the seed, and InnoDB keeps its own
+        vendor = connection.vendor
+        if vendor == 'mysql':
+            return
+        with connection.cursor() as cursor:
+            if vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+            elif vendor == 'postgresql':
+                cursor.execute('ANALYZE ' + ', '.join(CHECKED_TABLES + ('users', 'staff', 'services')))
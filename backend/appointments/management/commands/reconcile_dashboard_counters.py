@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from backend.appointments.counters import expected_counters
+from backend.appointments.models import TOTAL_DATE, DashboardCounter
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the dashboard counters from the services, staff, schedules '
+        'and appointments tables, and report counters that had drifted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drifted counters, without fixing them'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # Hold back concurrent increments while the tables are counted
+            stored = {
+                (counter.scope, counter.owner_id, counter.name, counter.date): counter
+                for counter in DashboardCounter.objects.select_for_update()
+            }
+            expected = expected_counters()
+
+            to_update = []
+            to_create = []
+            to_delete = []
+            drifted = 0
+            for key, counter in stored.items():
+                value = expected.get(key, 0)
+                if counter.value != value:
+                    self._report(key, counter.value, value)
+                    drifted += 1
+                if value == 0:
+                    # Counters that dropped to zero are not kept
+                    to_delete.append(counter.id)
+                elif counter.value != value:
+                    counter.value = value
+                    to_update.append(counter)
+
+            for key, value in expected.items():
+                if key not in stored:
+                    self._report(key, 0, value)
+                    drifted += 1
+                    scope, owner_id, name, date = key
+                    to_create.append(DashboardCounter(
+                        scope=scope, owner_id=owner_id, name=name, date=date, value=value
+                    ))
+
+            if options['dry_run']:
+                self.stdout.write(self.style.WARNING(
+                    f'{drifted} of {len(expected)} counters drifted (dry run, nothing changed)'
+                ))
+                return
+
+            DashboardCounter.objects.filter(id__in=to_delete).delete()
+            DashboardCounter.objects.bulk_update(to_update, ['value'], batch_size=1000)
+            DashboardCounter.objects.bulk_create(to_create, batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Reconciled {len(expected)} counters ({drifted} corrected, '
+            f'{len(to_delete)} empty removed)'
+        ))
+
+    def _report(self, key, stored, expected):
+        scope, owner_id, name, date = key
+        owner = '' if scope == 'global' else f' #{owner_id}'
+        self.stdout.write(
+            f'  {scope}{owner} {name} {"total" if date == TOTAL_DATE else date}: {stored} -> {expected}'
+        )
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.appointments.synthetic import seed_salon
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with a large synthetic salon for staging and load '
+        'tests: users, staff, service assignments, a year of schedules, '
+        'appointments and payments, inserted in batches. The same --seed '
+        'always produces the same data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--staff', type=int, default=1000, help='Staff members (default: 1000)')
+        parser.add_argument('--customers', type=int, default=100000, help='Customers (default: 100000)')
+        parser.add_argument('--services', type=int, default=40, help='Services (default: 40)')
+        parser.add_argument('--days', type=int, default=90, help='Days of slots from today on (default: 90)')
+        parser.add_argument(
+            '--history-days', type=int, default=275,
+            help='Days of slots and past appointments before today (default: 275)'
+        )
+        parser.add_argument('--booked', type=float, default=0.15, help='Share of slots booked (default: 0.15)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+        parser.add_argument(
+            '--tag', default='synthetic',
+            help='Prefix of the generated usernames and service names (default: synthetic)'
+        )
+        parser.add_argument(
+            '--password', default='synthetic',
+            help='Password of every generated user (default: synthetic)'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per INSERT (default: 2000)')
+
+    def handle(self, *args, **options):
+        if options['staff'] < 1 or options['customers'] < 1 or options['services'] < 1:
+            raise CommandError('--staff, --customers and --services must be at least 1.')
+        if options['days'] < 0 or options['history_days'] < 0 or options['days'] + options['history_days'] < 1:
+            raise CommandError('--days and --history-days cannot be negative, and must cover at least one day.')
+        if not 0 <= options['booked'] < 1:
+            raise CommandError('--booked must be at least 0 and below 1.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        started = time.perf_counter()
+        try:
+            salon = seed_salon(
+                staff=options['staff'],
+                customers=options['customers'],
+                services=options['services'],
+                days=options['days'],
+                history_days=options['history_days'],
+                booked=options['booked'],
+                seed=options['seed'],
+                tag=options['tag'],
+                password=options['password'],
+                batch_size=options['batch_size'],
+                log=self.stdout.write
+            )
+        except ValueError as e:
+            raise CommandError(f'{e} Pick another --tag.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Seeded {len(salon['customer_ids'])} customers, {len(salon['staff_ids'])} staff, "
+            f"{len(salon['service_ids'])} services, {salon['schedules']} slots, "
+            f"{salon['appointments']} appointments and {salon['payments']} payments "
+            f"in {time.perf_counter() - started:.0f}s"
+        ))
+        self.stdout.write(f"Log in as {options['tag']}_admin, {options['tag']}_staff0 or {options['tag']}_customer0.")
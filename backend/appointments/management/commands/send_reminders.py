@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.appointments.reminders import send_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        'Email a reminder to every customer with a Pending or Confirmed '
+        'appointment starting within the next hours that has not been '
+        'reminded yet. Run it from cron, e.g. hourly; each appointment is '
+        'reminded once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=settings.REMINDER_WINDOW_HOURS,
+            help=f'Remind appointments starting within this many hours (default: {settings.REMINDER_WINDOW_HOURS})'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.REMINDER_BATCH_SIZE,
+            help=f'Messages sent over one mail connection (default: {settings.REMINDER_BATCH_SIZE})'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Render the reminders without sending them')
+
+    def handle(self, *args, **options):
+        if options['hours'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--hours and --batch-size must be at least 1.')
+
+        started = time.perf_counter()
+        result = send_reminders(
+            hours=options['hours'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run']
+        )
+        elapsed = time.perf_counter() - started
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {result['due']} reminder(s) due within {options['hours']}h (dry run, nothing sent)"
+            ))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Sent {result['sent']} of {result['due']} reminder(s) in {elapsed:.1f}s"
+        ))
+        if result['failed']:
+            raise CommandError(f"{result['failed']} reminder(s) could not be sent; they are retried on the next run.")
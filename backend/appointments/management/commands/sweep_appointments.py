@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.appointments.sweeper import expire_unpaid, sweep_past
+
+
+class Command(BaseCommand):
+    help = (
+        'Move Pending and Confirmed appointments of past days to Completed '
+        '(confirmed or paid) or No-show (unpaid), and optionally cancel unpaid '
+        'bookings that were never paid for, with bulk updates over ranges of '
+        'schedule dates. Run it nightly from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-days', type=int, default=7,
+            help='Days of schedule dates swept per UPDATE (default: 7)'
+        )
+        parser.add_argument(
+            '--expire-unpaid-after', type=int, default=settings.UNPAID_HOLD_HOURS, metavar='HOURS',
+            help='Cancel upcoming unpaid Pending appointments booked more than HOURS ago and release '
+                 f'their slots; 0 keeps them (default: UNPAID_HOLD_HOURS, {settings.UNPAID_HOLD_HOURS})'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_days'] < 1:
+            raise CommandError('--chunk-days must be at least 1.')
+        if options['expire_unpaid_after'] < 0:
+            raise CommandError('--expire-unpaid-after cannot be negative.')
+
+        started = time.perf_counter()
+        try:
+            past = sweep_past(chunk_days=options['chunk_days'])
+            expired = (
+                expire_unpaid(options['expire_unpaid_after'])
+                if options['expire_unpaid_after'] else None
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"Past appointments marked Completed: {past['Completed']}")
+        self.stdout.write(f"Past appointments marked No-show: {past['No-show']}")
+        if expired is not None:
+            self.stdout.write(f"Unpaid appointments cancelled: {expired['cancelled']}")
+            self.stdout.write(f"Slots released: {expired['released']}")
+
+        touched = past['Completed'] + past['No-show'] + (expired['cancelled'] if expired else 0)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Swept {touched} appointment(s) in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_alter_appointment_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['created_at', 'id'], name='appt_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', 'created_at'], name='appt_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['staff', 'created_at'], name='appt_staff_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['service', 'created_at'], name='appt_service_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0005_populate_schedule_times'),
+        ('appointments', '0005_appointment_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='additional_schedules',
+            field=models.ManyToManyField(blank=True, help_text='Further back-to-back slots occupied by services longer than one slot', related_name='continued_appointments', to='schedules.schedule'),
+        ),
+    ]
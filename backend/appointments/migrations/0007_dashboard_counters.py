@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:25
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0006_appointment_additional_schedules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('global', 'Global'), ('staff', 'Staff'), ('customer', 'Customer')], max_length=10)),
+                ('owner_id', models.BigIntegerField(default=0, help_text='Staff or user ID; 0 for global counters')),
+                ('name', models.CharField(max_length=50)),
+                ('date', models.DateField(default=datetime.date(1000, 1, 1), help_text='Schedule day, or 1000-01-01 for an all-time total')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Dashboard counter',
+                'verbose_name_plural': 'Dashboard counters',
+                'db_table': 'dashboard_counters',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dashboardcounter',
+            constraint=models.UniqueConstraint(fields=('scope', 'owner_id', 'name', 'date'), name='dashboard_counter_uniq'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+import datetime
+
+from django.db import migrations
+from django.db.models import Count
+
+
+BATCH_SIZE = 1000
+
+# Date of all-time totals (models.TOTAL_DATE)
+TOTAL_DATE = datetime.date(1000, 1, 1)
+
+
+def populate_counters(apps, schema_editor):
+    # Frozen copy of counters.expected_counters() so later changes there
+    # do not alter what this migration does
+    Appointment = apps.get_model('appointments', 'Appointment')
+    DashboardCounter = apps.get_model('appointments', 'DashboardCounter')
+    Schedule = apps.get_model('schedules', 'Schedule')
+    Service = apps.get_model('services', 'Service')
+    Staff = apps.get_model('staff', 'Staff')
+    
+    counters = {
+        ('global', 0, 'services', TOTAL_DATE): Service.objects.count(),
+        ('global', 0, 'staff', TOTAL_DATE): Staff.objects.count(),
+        ('global', 0, 'appointments', TOTAL_DATE): Appointment.objects.count(),
+        ('global', 0, 'schedules', TOTAL_DATE): Schedule.objects.count(),
+    }
+    
+    for scope, owner in (('staff', 'staff_id'), ('customer', 'user_id')):
+        rows = (
+            Appointment.objects.values_list(owner, 'schedule__date', 'status')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        for owner_id, date, status, count in rows:
+            name = f'appointments:{status}'
+            counters[(scope, owner_id, name, date)] = count
+            total = (scope, owner_id, name, TOTAL_DATE)
+            counters[total] = counters.get(total, 0) + count
+    
+    DashboardCounter.objects.all().delete()
+    DashboardCounter.objects.bulk_create(
+        [
+            DashboardCounter(scope=scope, owner_id=owner_id, name=name, date=date, value=value)
+            for (scope, owner_id, name, date), value in counters.items()
+            if value
+        ],
+        batch_size=BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0007_dashboard_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
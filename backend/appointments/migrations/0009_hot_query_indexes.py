@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0008_populate_dashboard_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['user', 'status', 'schedule'], name='appt_user_status_sched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['staff', 'status', 'schedule'], name='appt_staff_status_sched_idx'),
+        ),
+    ]
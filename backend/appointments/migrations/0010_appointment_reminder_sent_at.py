@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0009_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, help_text='When the reminder email went out; cleared when the appointment is rescheduled', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0010_appointment_reminder_sent_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='appointment',
+            name='status',
+            field=models.CharField(choices=[('Pending', 'Pending'), ('Confirmed', 'Confirmed'), ('Completed', 'Completed'), ('Cancelled', 'Cancelled'), ('No-show', 'No-show')], db_index=True, default='Pending', max_length=20),
+        ),
+    ]
@@ -1,3 +1,5 @@
+from datetime import date
+
 from django.db import models
 from backend.accounts.models import User
 from backend.services.models import Service
@@ -14,14 +16,26 @@ class Appointment(models.Model):
         ('Confirmed', 'Confirmed'),
         ('Completed', 'Completed'),
         ('Cancelled', 'Cancelled'),
+        ('No-show', 'No-show'),
     )
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='appointments')
     service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='appointments')
     staff = models.ForeignKey(Staff, on_delete=models.CASCADE, related_name='appointments')
     schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE, related_name='appointments')
+    additional_schedules = models.ManyToManyField(
+        Schedule,
+        blank=True,
+        related_name='continued_appointments',
+        help_text='Further back-to-back slots occupied by services longer than one slot'
+    )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending', db_index=True)
     notes = models.TextField(blank=True)
+    reminder_sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='When the reminder email went out; cleared when the appointment is rescheduled'
+    )
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -30,6 +44,17 @@ class Appointment(models.Model):
         verbose_name = 'Appointment'
         verbose_name_plural = 'Appointments'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination walks (created_at, id) newest first
+            models.Index(fields=['created_at', 'id'], name='appt_created_id_idx'),
+            models.Index(fields=['status', 'created_at'], name='appt_status_created_idx'),
+            models.Index(fields=['staff', 'created_at'], name='appt_staff_created_idx'),
+            models.Index(fields=['service', 'created_at'], name='appt_service_created_idx'),
+            # Dashboards join to schedules for the date; schedule_id makes the
+            # join an index-only step for a member's appointments by status
+            models.Index(fields=['user', 'status', 'schedule'], name='appt_user_status_sched_idx'),
+            models.Index(fields=['staff', 'status', 'schedule'], name='appt_staff_status_sched_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.service.name} - {self.schedule.date} {self.schedule.time_slot}"
@@ -52,3 +77,46 @@ class Payment(models.Model):
     
     def __str__(self):
         return f"Payment for Appointment #{self.appointment.id} - ${self.amount}"
+
+
+# Date all-time totals are stored under. A real date rather than NULL, so the
+# unique constraint covers totals on every backend (MySQL cannot enforce the
+# conditional constraints a nullable date would need)
+TOTAL_DATE = date(1000, 1, 1)
+
+
+class DashboardCounter(models.Model):
+    """
+    Running count behind a dashboard figure, maintained incrementally.
+
+    Global totals (services, staff, appointments, schedules) are stored with
+    no owner under TOTAL_DATE. Appointment counts are kept per status for each
+    staff member and customer, both as an all-time total (TOTAL_DATE) and per
+    schedule day, so dashboards read a handful of rows instead of
+    aggregating appointment history. See backend.appointments.counters.
+    """
+    SCOPE_CHOICES = (
+        ('global', 'Global'),
+        ('staff', 'Staff'),
+        ('customer', 'Customer'),
+    )
+    
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    owner_id = models.BigIntegerField(default=0, help_text='Staff or user ID; 0 for global counters')
+    name = models.CharField(max_length=50)
+    date = models.DateField(default=TOTAL_DATE, help_text='Schedule day, or 1000-01-01 for an all-time total')
+    value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'dashboard_counters'
+        verbose_name = 'Dashboard counter'
+        verbose_name_plural = 'Dashboard counters'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'owner_id', 'name', 'date'],
+                name='dashboard_counter_uniq'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.scope}:{self.owner_id}:{self.name}:{'total' if self.date == TOTAL_DATE else self.date} = {self.value}"
@@ -0,0 +1,160 @@
+"""
+Reminder emails for upcoming appointments.
+
+A day's reminders are sent in a handful of round trips instead of a few
+per appointment:
+
+- One query selects every active appointment starting in the window that
+  has not been reminded yet, with its customer, service, staff member and
+  slot joined in. It is driven by the index on the schedule date.
+- The template is compiled once and rendered for each appointment.
+- Each batch of messages goes out over a single mail connection, opened
+  once and closed after the batch.
+- One UPDATE per batch records reminder_sent_at on the appointments whose
+  message was accepted, so the next run skips them and a failed message
+  is tried again.
+
+Run one dispatcher at a time (send_reminders from cron); two concurrent
+runs would both send the reminders neither has recorded yet.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .counters import ACTIVE_STATUSES
+from .models import Appointment
+
+
+logger = logging.getLogger('salon.reminders')
+
+TEMPLATE = 'emails/appointment_reminder.txt'
+
+
+def _window(start, end):
+    """Condition that an appointment's slot starts in [start, end)."""
+    if start.date() == end.date():
+        return Q(schedule__date=start.date(), schedule__start_time__gte=start.time(),
+                 schedule__start_time__lt=end.time())
+    return (
+        Q(schedule__date=start.date(), schedule__start_time__gte=start.time())
+        | Q(schedule__date__gt=start.date(), schedule__date__lt=end.date())
+        | Q(schedule__date=end.date(), schedule__start_time__lt=end.time())
+    )
+
+
+def due_reminders(start, end):
+    """
+    Active appointments starting in a window that have not been reminded.
+
+    Args:
+        start: Aware datetime the window opens at
+        end: Aware datetime the window closes at (exclusive)
+
+    Returns:
+        Appointment queryset ordered by start, with related rows joined
+    """
+    start, end = timezone.localtime(start), timezone.localtime(end)
+    return (
+        Appointment.objects
+        .filter(
+            _window(start, end),
+            # Lets the database narrow by the schedule date index first
+            schedule__date__range=(start.date(), end.date()),
+            status__in=ACTIVE_STATUSES,
+            reminder_sent_at__isnull=True
+        )
+        .exclude(user__email='')
+        .select_related('user', 'service', 'staff__user', 'schedule')
+        .order_by('schedule__date', 'schedule__start_time', 'id')
+    )
+
+
+def build_reminder(template, appointment):
+    """
+    Render the reminder email of an appointment.
+
+    Args:
+        template: Compiled reminder template
+        appointment: Appointment with its related rows loaded
+
+    Returns:
+        Unsent EmailMessage
+    """
+    schedule = appointment.schedule
+    body = template.render({
+        'appointment': appointment,
+        'customer': appointment.user,
+        'service': appointment.service,
+        'staff': appointment.staff,
+        'schedule': schedule,
+        'site_name': settings.SITE_NAME,
+        'site_url': settings.SITE_URL,
+    })
+    return EmailMessage(
+        subject=f'Reminder: {appointment.service.name} on {schedule.date:%a %d %b} at {schedule.time_slot}',
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[appointment.user.email]
+    )
+
+
+def send_reminders(start=None, hours=None, batch_size=None, dry_run=False):
+    """
+    Email every customer whose appointment starts within the next hours.
+
+    Args:
+        start: Aware datetime the window opens at (default: now)
+        hours: Length of the window (default: REMINDER_WINDOW_HOURS)
+        batch_size: Messages sent per mail connection (default: REMINDER_BATCH_SIZE)
+        dry_run: Select and render the reminders without sending them
+
+    Returns:
+        Dict with the number of reminders 'due', 'sent' and 'failed'
+    """
+    start = start or timezone.now()
+    end = start + timedelta(hours=hours or settings.REMINDER_WINDOW_HOURS)
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+
+    appointments = list(due_reminders(start, end))
+    template = get_template(TEMPLATE)
+    sent = failed = 0
+
+    for offset in range(0, len(appointments), batch_size):
+        batch = appointments[offset:offset + batch_size]
+        messages = [build_reminder(template, appointment) for appointment in batch]
+        if dry_run:
+            continue
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception:
+            # Later batches would fail the same way
+            logger.exception('Could not connect to the mail server; %s reminder(s) left for the next run',
+                             len(appointments) - offset)
+            failed += len(appointments) - offset
+            break
+
+        delivered = []
+        try:
+            for appointment, message in zip(batch, messages):
+                try:
+                    connection.send_messages([message])
+                except Exception:
+                    logger.exception('Reminder for appointment #%s could not be sent', appointment.id)
+                    failed += 1
+                else:
+                    delivered.append(appointment.id)
+        finally:
+            connection.close()
+
+        # Not save(): leaves updated_at, and with it the API validators, alone
+        Appointment.objects.filter(id__in=delivered).update(reminder_sent_at=timezone.now())
+        sent += len(delivered)
+
+    return {'due': len(appointments), 'sent': sent, 'failed': failed}
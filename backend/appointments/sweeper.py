@@ -0,0 +1,137 @@
+"""
+Set-based status sweeps for appointments whose time has passed.
+
+Appointments otherwise stay Pending or Confirmed after their day, which
+keeps them in the active counts the dashboards show and in every query
+for active appointments. The sweep moves them on with a few UPDATE
+statements per range of schedule dates instead of a save() per row:
+
+- Confirmed appointments, and Pending ones that were paid, become
+  Completed.
+- Pending appointments nobody paid for become No-show.
+
+Optionally, unpaid Pending appointments that were booked long enough ago
+(UNPAID_HOLD_HOURS) are cancelled before their day and their slots
+released, so abandoned checkouts do not block slots others could book.
+
+Each UPDATE runs in a transaction together with a grouped count of the
+rows it changes, and the dashboard counters are moved by those counts
+(queryset.update() sends no signals). If another request changed one of
+the rows in between, the transaction is rolled back and the range is
+swept again.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .booking import release_vacated_slots
+from .counters import ACTIVE_STATUSES, record_status_changes
+from .models import Appointment
+
+
+# How past active appointments end up
+PAST_OUTCOMES = (
+    ('Completed', Q(status='Confirmed') | Q(status='Pending', payment__isnull=False)),
+    ('No-show', Q(status='Pending', payment__isnull=True)),
+)
+
+# Attempts at a range whose rows keep changing under the sweep
+MAX_ATTEMPTS = 3
+
+
+class _RowsChanged(Exception):
+    """Rows matched by a sweep changed between counting and updating them."""
+
+
+def _transition(appointments, status):
+    """
+    Give every appointment of a queryset a new status in one UPDATE.
+
+    Args:
+        appointments: Appointment queryset
+        status: New status
+
+    Returns:
+        Number of appointments updated
+    """
+    for _ in range(MAX_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                groups = list(
+                    appointments.values_list('staff_id', 'user_id', 'schedule__date', 'status')
+                    .annotate(count=Count('id'))
+                    .order_by()
+                )
+                expected = sum(group[-1] for group in groups)
+                if not expected:
+                    return 0
+                # updated_at too, so cached lists and validators notice
+                updated = appointments.update(status=status, updated_at=timezone.now())
+                if updated != expected:
+                    raise _RowsChanged()
+                record_status_changes(groups, status)
+                return updated
+        except _RowsChanged:
+            continue
+    raise RuntimeError(f'Appointments kept changing while being marked {status}; run the sweep again.')
+
+
+def sweep_past(today=None, chunk_days=7):
+    """
+    Move active appointments of days before today to their final status.
+
+    Args:
+        today: Date up to which (exclusive) appointments are swept
+            (default: today)
+        chunk_days: Days of schedule dates each UPDATE covers
+
+    Returns:
+        Dict of final status -> appointments moved to it
+    """
+    today = today or timezone.localdate()
+    touched = {status: 0 for status, _ in PAST_OUTCOMES}
+
+    first = (
+        Appointment.objects.filter(status__in=ACTIVE_STATUSES, schedule__date__lt=today)
+        .aggregate(first=Min('schedule__date'))['first']
+    )
+    while first is not None and first < today:
+        end = min(first + timedelta(days=chunk_days), today)
+        in_range = Appointment.objects.filter(schedule__date__gte=first, schedule__date__lt=end)
+        for status, condition in PAST_OUTCOMES:
+            touched[status] += _transition(in_range.filter(condition), status)
+        first = end
+    return touched
+
+
+def expire_unpaid(hours, now=None, batch_size=500):
+    """
+    Cancel unpaid Pending appointments booked more than hours ago and
+    release their slots.
+
+    Args:
+        hours: Age after which an unpaid booking expires
+        now: Current time (default: now)
+        batch_size: Appointments cancelled per transaction
+
+    Returns:
+        Dict with the number of 'cancelled' appointments and 'released' slots
+    """
+    now = now or timezone.now()
+    holds = Appointment.objects.filter(
+        status='Pending',
+        created_at__lt=now - timedelta(hours=hours),
+        schedule__date__gte=timezone.localdate(now),
+        payment__isnull=True
+    )
+
+    touched = {'cancelled': 0, 'released': 0}
+    while True:
+        with transaction.atomic():
+            ids = list(holds.order_by('created_at', 'id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return touched
+            touched['cancelled'] += _transition(holds.filter(id__in=ids), 'Cancelled')
+            touched['released'] += release_vacated_slots(ids)
@@ -0,0 +1,346 @@
+"""
+Synthetic salon data for benchmarks and staging.
+
+seed_salon() creates customers, services, staff, their service
+assignments, a span of hourly schedule slots around today, appointments
+in those slots (completed or cancelled in the past, pending or confirmed
+ahead) and payments for them, all with batched INSERTs in dependency
+order. Slots are generated, booked and paid a few staff members at a
+time, each batch in one transaction, so memory stays flat however large
+the salon is. The same seed always produces the same salon.
+"""
+import functools
+import math
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from backend.accounts.models import User
+from backend.services.models import Service
+from backend.services.catalog import bump_catalog_version
+from backend.staff.models import Staff, StaffService
+from backend.schedules.models import Schedule
+from backend.schedules.availability import invalidate_staff_availability
+from backend.schedules.validators import time_slot_bounds
+from .counters import ACTIVE_STATUSES, rebuild_counters
+from .models import Appointment, Payment
+
+
+TIME_SLOTS = [f'{hour:02d}:00-{hour + 1:02d}:00' for hour in range(9, 18)]
+SLOT_BOUNDS = [(time_slot, *time_slot_bounds(time_slot)) for time_slot in TIME_SLOTS]
+SLOT_MINUTES = 60
+
+SERVICE_DURATIONS = (30, 45, 60, 60, 90, 120)
+
+PAYMENT_METHODS = ('Cash', 'Card', 'Card', 'Mobile Money')
+PREPAID_SHARE = 0.3
+
+STAFF_PER_CHUNK = 20
+
+Through = Appointment.additional_schedules.through
+
+
+def _batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def seed_salon(staff=10, customers=200, services=10, days=30, history_days=60, booked=0.5,
+               seed=0, tag='synthetic', password='synthetic', batch_size=1000, log=None):
+    """
+    Create a synthetic salon in the current database.
+
+    Args:
+        staff: Staff members to create
+        customers: Customers to create
+        services: Services to create
+        days: Days of slots from today on
+        history_days: Days of slots (and past appointments) before today
+        booked: Share of slots that get an appointment
+        seed: Random seed; the same seed produces the same salon
+        tag: Prefix of usernames and service names, which must not be in use
+        password: Password of every created user
+        batch_size: Rows per INSERT statement
+        log: Optional callable receiving progress messages
+
+    Returns:
+        Dict with admin_id, customer_ids, staff_ids and service_ids, plus
+        the number of schedules, appointments and payments created
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    today = timezone.now().date()
+    first_day = today - timedelta(days=history_days)
+    day_count = history_days + days
+    password = make_password(password)
+
+    if User.objects.filter(username__startswith=f'{tag}_').exists():
+        raise ValueError(f'Users tagged "{tag}" already exist.')
+
+    log(f'Creating {customers} customers and {staff} staff users...')
+    User.objects.bulk_create(
+        [User(username=f'{tag}_admin', password=password, role='Admin', is_staff=True)]
+        + [
+            User(username=f'{tag}_staff{i}', password=password, role='Staff', first_name=f'Stylist {i}')
+            for i in range(staff)
+        ]
+        + [
+            User(username=f'{tag}_customer{i}', email=f'{tag}_customer{i}@example.com', password=password, role='Customer')
+            for i in range(customers)
+        ],
+        batch_size=batch_size
+    )
+    users = dict(User.objects.filter(username__startswith=f'{tag}_').values_list('username', 'id'))
+    customer_ids = [users[f'{tag}_customer{i}'] for i in range(customers)]
+
+    log(f'Creating {services} services...')
+    Service.objects.bulk_create([
+        Service(
+            name=f'{tag} service {i}',
+            description='Synthetic service',
+            price=Decimal(rng.randrange(20, 200)),
+            duration=rng.choice(SERVICE_DURATIONS)
+        )
+        for i in range(services)
+    ])
+    services_by_id = {
+        service_id: (duration, price)
+        for service_id, duration, price in Service.objects.filter(
+            name__startswith=f'{tag} service '
+        ).values_list('id', 'duration', 'price')
+    }
+    service_ids = sorted(services_by_id)
+
+    Staff.objects.bulk_create(
+        [
+            Staff(user_id=users[f'{tag}_staff{i}'], specialization=f'{tag} stylist')
+            for i in range(staff)
+        ],
+        batch_size=batch_size
+    )
+    staff_ids = list(
+        Staff.objects.filter(user_id__in=[users[f'{tag}_staff{i}'] for i in range(staff)])
+        .order_by('id').values_list('id', flat=True)
+    )
+
+    assignments = {
+        staff_id: rng.sample(service_ids, min(len(service_ids), rng.randint(3, 6)))
+        for staff_id in staff_ids
+    }
+    StaffService.objects.bulk_create(
+        [
+            StaffService(staff_id=staff_id, service_id=service_id)
+            for staff_id, assigned in assignments.items()
+            for service_id in assigned
+        ],
+        batch_size=batch_size
+    )
+
+    log(f'Creating {day_count} days of slots and their appointments...')
+    now = timezone.now()
+    writers = {
+        'schedules': TableWriter(
+            Schedule,
+            ('staff', 'date', 'time_slot', 'start_time', 'end_time', 'availability_status',
+             'created_at', 'updated_at'),
+            batch_size
+        ),
+        'appointments': TableWriter(
+            Appointment,
+            ('user', 'service', 'staff', 'schedule', 'status', 'notes', 'created_at', 'updated_at'),
+            batch_size
+        ),
+        'additional_schedules': TableWriter(Through, ('appointment', 'schedule'), batch_size),
+        'payments': TableWriter(
+            Payment,
+            ('appointment', 'amount', 'payment_date', 'payment_method', 'transaction_id'),
+            batch_size
+        ),
+    }
+    totals = {'schedules': 0, 'appointments': 0, 'payments': 0}
+    for chunk in _batched(staff_ids, STAFF_PER_CHUNK):
+        with transaction.atomic():
+            counts = _seed_staff_chunk(
+                writers, chunk, assignments, services_by_id, customer_ids, first_day, day_count,
+                today, now, booked, rng
+            )
+        for key, value in counts.items():
+            totals[key] += value
+        log(
+            f'  {totals["schedules"]} slots, {totals["appointments"]} appointments, '
+            f'{totals["payments"]} payments'
+        )
+
+    for writer in writers.values():
+        writer.reset_sequence()
+
+    # Nothing went through save(), so neither the incremental counter
+    # updates nor the cache invalidation ran
+    rebuild_counters(batch_size=batch_size)
+    bump_catalog_version()
+    for staff_id in staff_ids:
+        invalidate_staff_availability(staff_id)
+
+    return {
+        'admin_id': users[f'{tag}_admin'],
+        'customer_ids': customer_ids,
+        'staff_ids': staff_ids,
+        'service_ids': service_ids,
+        **totals,
+    }
+
+
+class TableWriter:
+    """
+    Insert rows of plain values into a model's table.
+
+    bulk_create() spends most of its time building model instances and
+    preparing every value on its own. Seeded rows repeat a few hundred
+    dates, nine slot times and one timestamp, so the writer prepares each
+    distinct value for the database once and sends rows as multi-row
+    INSERTs. It hands out the primary keys itself, continuing after the
+    table's highest one, so rows can reference each other without reading
+    ids back; nothing else may insert into the table meanwhile.
+    """
+
+    PREPARED_TYPES = ('DateField', 'TimeField', 'DateTimeField', 'DecimalField')
+
+    def __init__(self, model, field_names, batch_size):
+        self.model = model
+        self.fields = [model._meta.pk] + [model._meta.get_field(name) for name in field_names]
+        self.next_id = (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+        self.rows_per_insert = max(1, connection.ops.bulk_batch_size(self.fields, range(batch_size)))
+        self.preparers = [
+            functools.lru_cache(maxsize=None)(functools.partial(self._prepare, field))
+            if field.get_internal_type() in self.PREPARED_TYPES else None
+            for field in self.fields
+        ]
+
+    @staticmethod
+    def _prepare(field, value):
+        return field.get_db_prep_save(value, connection)
+
+    def reserve(self, count):
+        """Return the first of count consecutive primary keys for new rows."""
+        first = self.next_id
+        self.next_id += count
+        return first
+
+    def _sql(self, row_count):
+        quote = connection.ops.quote_name
+        row = '({})'.format(', '.join(['%s'] * len(self.fields)))
+        return 'INSERT INTO {} ({}) VALUES {}'.format(
+            quote(self.model._meta.db_table),
+            ', '.join(quote(field.column) for field in self.fields),
+            ', '.join([row] * row_count)
+        )
+
+    def write(self, rows):
+        """
+        Insert rows.
+
+        Args:
+            rows: Tuples of values in field order, primary key first
+        """
+        full_sql = self._sql(self.rows_per_insert)
+        with connection.cursor() as cursor:
+            for batch in _batched(rows, self.rows_per_insert):
+                params = [
+                    prepare(value) if prepare else value
+                    for row in batch
+                    for prepare, value in zip(self.preparers, row)
+                ]
+                cursor.execute(full_sql if len(batch) == self.rows_per_insert else self._sql(len(batch)), params)
+
+    def reset_sequence(self):
+        """Move the table's id sequence past the inserted rows (PostgreSQL)."""
+        statements = connection.ops.sequence_reset_sql(no_style(), [self.model])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def _seed_staff_chunk(writers, staff_ids, assignments, services, customer_ids, first_day, day_count,
+                      today, now, booked, rng):
+    # Slots get their ids up front, in staff, day and time order
+    dates = [first_day + timedelta(days=day) for day in range(day_count)]
+    first_slot_id = writers['schedules'].reserve(len(staff_ids) * day_count * len(SLOT_BOUNDS))
+    slots = [
+        (staff_id, date, slot)
+        for staff_id in staff_ids
+        for date in dates
+        for slot in SLOT_BOUNDS
+    ]
+
+    # Walk each day in time order; a booking takes as many back-to-back
+    # slots as its service needs
+    appointments = []
+    additional = []
+    taken = set()
+    index = 0
+    while index < len(slots):
+        staff_id, date, _ = slots[index]
+        if rng.random() >= booked:
+            index += 1
+            continue
+
+        service_id = rng.choice(assignments[staff_id])
+        needed = math.ceil(services[service_id][0] / SLOT_MINUTES)
+        run = [
+            first_slot_id + position
+            for position in range(index, min(index + needed, len(slots)))
+            if slots[position][0] == staff_id and slots[position][1] == date
+        ]
+        if len(run) < needed:
+            index += 1
+            continue
+
+        if date < today:
+            status = 'Cancelled' if rng.random() < 0.15 else 'Completed'
+        else:
+            status = rng.choice(ACTIVE_STATUSES)
+
+        appointment_id = writers['appointments'].reserve(1)
+        appointments.append((appointment_id, rng.choice(customer_ids), service_id, staff_id, run[0], status))
+        additional.extend((appointment_id, schedule_id) for schedule_id in run[1:])
+        if status != 'Cancelled':
+            # Slots of cancelled appointments were released again
+            taken.update(run)
+        index += needed
+
+    writers['schedules'].write([
+        (first_slot_id + position, staff_id, date, time_slot, start_time, end_time,
+         first_slot_id + position not in taken, now, now)
+        for position, (staff_id, date, (time_slot, start_time, end_time)) in enumerate(slots)
+    ])
+    writers['appointments'].write([
+        (appointment_id, user_id, service_id, staff_id, schedule_id, status, '', now, now)
+        for appointment_id, user_id, service_id, staff_id, schedule_id, status in appointments
+    ])
+    writers['additional_schedules'].write([
+        (writers['additional_schedules'].reserve(1), appointment_id, schedule_id)
+        for appointment_id, schedule_id in additional
+    ])
+
+    # Completed appointments were paid, and some customers paid ahead
+    payments = []
+    for appointment_id, _, service_id, _, _, status in appointments:
+        if status == 'Completed' or (status == 'Confirmed' and rng.random() < PREPAID_SHARE):
+            method = rng.choice(PAYMENT_METHODS)
+            payments.append((
+                writers['payments'].reserve(1),
+                appointment_id,
+                services[service_id][1],
+                now,
+                method,
+                '' if method == 'Cash' else f'SYN-{appointment_id}'
+            ))
+    writers['payments'].write(payments)
+
+    return {'schedules': len(slots), 'appointments': len(appointments), 'payments': len(payments)}
@@ -0,0 +1,520 @@
+import datetime
+import random
+import threading
+import unittest
+from collections import Counter
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from backend.accounts.models import User
+from backend.jobs.models import Job
+from backend.jobs.queue import run_batch
+from backend.schedules.availability import availability_index
+from backend.schedules.models import Schedule
+from backend.services.models import Service
+from backend.staff.models import Staff
+
+from .booking import book_appointment, book_appointments, cancel_appointment, reschedule_appointment
+from .counters import BULK_APPLY_THRESHOLD, expected_counters, rebuild_counters, staff_counts
+from .dashboards import (
+    LOCAL_VERSION_KEY,
+    _build_customer_dashboard,
+    _build_staff_dashboard,
+    get_customer_dashboard,
+    get_staff_dashboard
+)
+from .management.commands import benchmark_api, check_query_plans
+from .models import TOTAL_DATE, Appointment, DashboardCounter, Payment
+from .reminders import due_reminders, send_reminders
+from .sweeper import expire_unpaid, sweep_past
+from .synthetic import TableWriter, seed_salon
+
+
+class BookingFixtures:
+    """A customer, a stylist with a day of hourly slots and a one-hour service."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user('customer', password='pw')
+        staff_user = User.objects.create_user('stylist', password='pw', role='Staff')
+        cls.staff = Staff.objects.create(user=staff_user, specialization='Hair')
+        cls.service = Service.objects.create(name='Cut', price=30, duration=60)
+        cls.day = datetime.date.today() + datetime.timedelta(days=1)
+        cls.slots = [
+            Schedule.objects.create(staff=cls.staff, date=cls.day, time_slot=f'{hour}:00-{hour + 1}:00')
+            for hour in range(9, 17)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        availability_index.clear()
+
+    def book(self, schedule, service=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return book_appointment(self.customer, service or self.service, self.staff, schedule)
+
+
+class BookingTests(BookingFixtures, TestCase):
+    """Slots are claimed with one conditional update, or not at all."""
+
+    def test_a_booked_slot_cannot_be_booked_again(self):
+        self.book(self.slots[0])
+        with self.assertRaisesMessage(ValidationError, 'This time slot is not available.'):
+            self.book(self.slots[0])
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_rescheduling_moves_the_claim(self):
+        appointment = self.book(self.slots[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            reschedule_appointment(appointment, self.staff, self.slots[3])
+        self.slots[0].refresh_from_db()
+        self.slots[3].refresh_from_db()
+        self.assertTrue(self.slots[0].availability_status)
+        self.assertFalse(self.slots[3].availability_status)
+
+    def test_rescheduling_onto_a_taken_slot_changes_nothing(self):
+        appointment = self.book(self.slots[0])
+        self.book(self.slots[1])
+        with self.assertRaises(ValidationError):
+            reschedule_appointment(appointment, self.staff, self.slots[1])
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.schedule_id, self.slots[0].id)
+        self.slots[0].refresh_from_db()
+        self.assertFalse(self.slots[0].availability_status)
+
+
+class DashboardCacheTests(BookingFixtures, TestCase):
+    """Dashboards cached per member, with stamps read from the database."""
+
+    def test_own_bookings_refresh_the_dashboards(self):
+        today = timezone.localdate()
+        self.assertEqual(get_customer_dashboard(self.customer, today)['upcoming_count'], 0)
+        self.assertEqual(len(get_staff_dashboard(self.staff, today)['upcoming_appointments']), 0)
+
+        self.book(self.slots[0])
+
+        self.assertEqual(get_customer_dashboard(self.customer, today)['upcoming_count'], 1)
+        self.assertEqual(len(get_staff_dashboard(self.staff, today)['upcoming_appointments']), 1)
+
+    def test_changes_from_other_workers_show_up_after_the_stamp_expires(self):
+        today = timezone.localdate()
+        appointment = self.book(self.slots[0])
+        self.assertEqual(len(get_staff_dashboard(self.staff, today)['upcoming_appointments']), 1)
+
+        # Another worker cancels; only the table changes in this process
+        Appointment.objects.filter(id=appointment.id).update(
+            status='Cancelled', updated_at=timezone.now() + datetime.timedelta(seconds=1)
+        )
+        cache.delete(LOCAL_VERSION_KEY.format(scope='staff', owner_id=self.staff.id))
+
+        self.assertEqual(len(get_staff_dashboard(self.staff, today)['upcoming_appointments']), 0)
+
+    def test_repeat_loads_are_cached(self):
+        today = timezone.localdate()
+        get_customer_dashboard(self.customer, today)
+        with self.assertNumQueries(0):
+            get_customer_dashboard(self.customer, today)
+
+
+class CancellationTests(BookingFixtures, TestCase):
+    """Cancelled appointments hand their slots back through a job."""
+
+    def cancel(self, appointment):
+        with self.captureOnCommitCallbacks(execute=True):
+            cancel_appointment(appointment)
+
+    @override_settings(JOBS_RUN_INLINE=True)
+    def test_slots_are_released_inline_without_a_worker(self):
+        appointment = self.book(self.slots[0])
+        self.cancel(appointment)
+        self.slots[0].refresh_from_db()
+        self.assertTrue(self.slots[0].availability_status)
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_RUN_INLINE=False)
+    def test_slots_are_released_by_the_worker(self):
+        appointment = self.book(self.slots[0])
+        self.cancel(appointment)
+        self.slots[0].refresh_from_db()
+        self.assertFalse(self.slots[0].availability_status)
+
+        self.assertEqual(run_batch(), (1, 0))
+        self.slots[0].refresh_from_db()
+        self.assertTrue(self.slots[0].availability_status)
+
+
+class DashboardCounterTests(BookingFixtures, TestCase):
+    """Counters kept in step with the appointments they count."""
+
+    def setUp(self):
+        super().setUp()
+        # Fixtures were created inside the test transaction, so no commit
+        # ever applied their deltas
+        rebuild_counters()
+
+    def counters(self):
+        return {
+            (row.scope, row.owner_id, row.name, row.date): row.value
+            for row in DashboardCounter.objects.exclude(value=0)
+        }
+
+    def test_single_bookings_and_cancellations(self):
+        appointment = self.book(self.slots[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            cancel_appointment(appointment)
+        self.assertEqual(self.counters(), expected_counters())
+        self.assertEqual(staff_counts(self.staff.id, self.day)['total'], 1)
+
+    def test_batch_bookings_take_the_bulk_path(self):
+        # Two daily counters per appointment on its own day
+        days = [self.day + datetime.timedelta(days=offset) for offset in range(1, BULK_APPLY_THRESHOLD)]
+        slots = [Schedule.objects.create(staff=self.staff, date=day, time_slot='10:00-11:00') for day in days]
+        rebuild_counters()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book_appointments(self.customer, [(self.service, self.staff, slot, '') for slot in slots])
+        self.assertEqual(self.counters(), expected_counters())
+
+    def test_totals_are_unique(self):
+        DashboardCounter.objects.create(scope='global', owner_id=0, name='tests', date=TOTAL_DATE)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DashboardCounter.objects.create(scope='global', owner_id=0, name='tests', date=TOTAL_DATE)
+
+
+class BookingRaceTests(TransactionTestCase):
+    """Customers racing for overlapping runs of slots from separate connections."""
+
+    WORKERS = 4
+
+    def setUp(self):
+        cache.clear()
+        availability_index.clear()
+        staff_user = User.objects.create_user('stylist', password='pw', role='Staff')
+        self.staff = Staff.objects.create(user=staff_user, specialization='Hair')
+        # Two slots per booking, so neighbouring starts overlap
+        self.service = Service.objects.create(name='Colour', price=80, duration=120)
+        day = datetime.date.today() + datetime.timedelta(days=1)
+        self.slots = [
+            Schedule.objects.create(staff=self.staff, date=day, time_slot=f'{hour}:00-{hour + 1}:00')
+            for hour in range(9, 17)
+        ]
+        self.customers = [
+            User.objects.create_user(f'customer{index}', password='pw') for index in range(self.WORKERS)
+        ]
+
+    def race(self):
+        barrier = threading.Barrier(self.WORKERS)
+        booked = []
+
+        def worker(index):
+            slots = list(self.slots[:-1])
+            random.Random(index).shuffle(slots)
+            try:
+                barrier.wait()
+                for schedule in slots:
+                    try:
+                        booked.append(book_appointment(self.customers[index], self.service, self.staff, schedule))
+                    except (ValidationError, DatabaseError):
+                        # Taken, or a lock the database gave up waiting for
+                        pass
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(self.WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return booked
+
+    def test_no_slot_is_booked_twice(self):
+        booked = self.race()
+
+        active = Appointment.objects.filter(status__in=('Pending', 'Confirmed'))
+        self.assertEqual(active.count(), len(booked))
+        self.assertGreater(len(booked), 0)
+
+        occupied = Counter(active.values_list('schedule_id', flat=True))
+        occupied.update(
+            Schedule.objects.filter(continued_appointments__in=active).values_list('id', flat=True)
+        )
+        self.assertEqual([schedule_id for schedule_id, count in occupied.items() if count > 1], [])
+
+        self.assertEqual(len(occupied), 2 * len(booked))
+        self.assertFalse(Schedule.objects.filter(id__in=occupied, availability_status=True).exists())
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Plans are checked on SQLite; run check_query_plans elsewhere')
+class QueryPlanTests(TestCase):
+    """The hot dashboard and availability queries stay on their indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        command = check_query_plans.Command(stdout=StringIO())
+        cls.customer, cls.staff, cls.today = command._seed(
+            {'staff': 3, 'customers': 40, 'days': 20, 'booked': 0.6}
+        )
+        command._analyze()
+        cls.plans = {
+            name: check_query_plans._explain(queryset)
+            for name, queryset in check_query_plans._hot_queries(cls.customer, cls.staff, cls.today)
+        }
+
+    def test_no_hot_query_scans_a_large_table(self):
+        for name, plan in self.plans.items():
+            with self.subTest(name):
+                self.assertEqual(check_query_plans._full_scans(plan), [], plan)
+
+    def test_composite_indexes_are_used(self):
+        for name, index in (
+            ('appointment list: customer by status', 'appt_user_status_sched_idx'),
+            ('staff dashboard: next 7 days', 'appt_staff_status_sched_idx'),
+            ('staff dashboard: week schedules', 'schedule_staff_date_start_idx'),
+            ('booking bootstrap: free slots over two weeks', 'schedule_staff_date_start_idx'),
+        ):
+            with self.subTest(name):
+                self.assertIn(index, self.plans[name])
+
+    def test_availability_version_uses_its_index(self):
+        newest = Schedule.objects.filter(staff_id=self.staff.id).order_by('-updated_at').values('updated_at')[:1]
+        self.assertIn('schedule_staff_updated_idx', newest.explain())
+
+    def test_dashboards_take_a_fixed_number_of_queries(self):
+        with self.assertNumQueries(2):
+            _build_customer_dashboard(self.customer, self.today)
+        with self.assertNumQueries(4):
+            _build_staff_dashboard(self.staff, self.today)
+
+
+class SyntheticSalonTests(TestCase):
+    """The synthetic salon the benchmarks run on."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salon = seed_salon(staff=3, customers=20, services=5, days=4, history_days=4, booked=0.6, tag='one')
+
+    def test_booked_slots_match_their_appointments(self):
+        self.assertEqual(Schedule.objects.count(), self.salon['schedules'])
+        self.assertEqual(Appointment.objects.count(), self.salon['appointments'])
+        self.assertGreater(self.salon['appointments'], 0)
+
+        active = Appointment.objects.exclude(status='Cancelled').select_related('service')
+        taken = Counter(active.values_list('schedule_id', flat=True))
+        taken.update(
+            Appointment.additional_schedules.through.objects.filter(appointment__in=active)
+            .values_list('schedule_id', flat=True)
+        )
+        self.assertEqual(max(taken.values()), 1)
+        unavailable = Schedule.objects.filter(availability_status=False).values_list('id', flat=True)
+        self.assertEqual(set(taken), set(unavailable))
+        for appointment in active:
+            self.assertEqual(
+                1 + appointment.additional_schedules.count(), -(-appointment.service.duration // 60)
+            )
+
+    def test_counters_are_rebuilt(self):
+        stored = {
+            (counter.scope, counter.owner_id, counter.name, counter.date): counter.value
+            for counter in DashboardCounter.objects.all()
+        }
+        self.assertEqual(stored, expected_counters())
+
+    def test_the_same_seed_produces_the_same_salon(self):
+        def shape(tag):
+            return list(
+                Appointment.objects.filter(user__username__startswith=f'{tag}_')
+                .order_by('id').values_list('status', 'schedule__date', 'schedule__time_slot')
+            )
+
+        again = seed_salon(staff=3, customers=20, services=5, days=4, history_days=4, booked=0.6, tag='two')
+        self.assertEqual(again['appointments'], self.salon['appointments'])
+        self.assertEqual(shape('two'), shape('one'))
+
+    def test_tags_cannot_be_reused(self):
+        with self.assertRaises(ValueError):
+            seed_salon(staff=1, customers=1, services=1, days=1, history_days=0, tag='one')
+
+
+class BenchmarkReportTests(TestCase):
+    """Percentiles and baseline comparison of benchmark_api."""
+
+    def results(self, p95, queries):
+        return {
+            'meta': {'commit': 'abc', 'parameters': {}},
+            'scenarios': {
+                'services list': {'p50_ms': 1.0, 'p95_ms': p95, 'p99_ms': p95, 'queries_per_request': queries},
+            },
+        }
+
+    def test_summary_uses_nearest_rank_percentiles(self):
+        samples = [(float(ms), 2, 500 if ms == 100 else 200) for ms in range(1, 101)]
+        summary = benchmark_api._summarize(samples, elapsed=2.0)
+        self.assertEqual((summary['p50_ms'], summary['p95_ms'], summary['p99_ms']), (50.0, 95.0, 99.0))
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['queries_per_request'], 2.0)
+        self.assertEqual(summary['throughput_rps'], 50.0)
+        self.assertEqual(benchmark_api._summarize([], 0)['p95_ms'], 0.0)
+
+    def test_comparison_fails_on_slower_or_chattier_scenarios(self):
+        command = benchmark_api.Command(stdout=StringIO())
+        command._compare(self.results(10.0, 3), self.results(11.0, 3), tolerance=0.2)
+        with self.assertRaises(CommandError):
+            command._compare(self.results(10.0, 3), self.results(13.0, 3), tolerance=0.2)
+        with self.assertRaises(CommandError):
+            command._compare(self.results(10.0, 3), self.results(10.0, 4), tolerance=0.2)
+
+
+class SeedSalonCommandTests(TestCase):
+    """The seed_salon management command and its batched inserts."""
+
+    def test_seeds_a_small_salon(self):
+        out = StringIO()
+        call_command(
+            'seed_salon', staff=2, customers=5, services=3, days=2, history_days=1, batch_size=7, stdout=out
+        )
+        self.assertIn('✓ Seeded 5 customers, 2 staff, 3 services, 54 slots', out.getvalue())
+        self.assertEqual(Schedule.objects.count(), 54)
+        self.assertTrue(User.objects.get(username='synthetic_customer0').check_password('synthetic'))
+
+        with self.assertRaisesMessage(CommandError, 'Pick another --tag.'):
+            call_command('seed_salon', staff=1, customers=1, services=1, days=1, history_days=0, stdout=out)
+
+    def test_options_are_validated(self):
+        for options in ({'staff': 0}, {'days': 0, 'history_days': 0}, {'booked': 1.0}, {'batch_size': 0}):
+            with self.subTest(options), self.assertRaises(CommandError):
+                call_command('seed_salon', stdout=StringIO(), **options)
+        self.assertFalse(User.objects.exists())
+
+    def test_table_writer_continues_after_existing_rows(self):
+        service = Service.objects.create(name='Cut', price=30, duration=60)
+        writer = TableWriter(
+            Service, ('name', 'description', 'price', 'duration', 'is_active', 'created_at', 'updated_at'),
+            batch_size=2
+        )
+        first = writer.reserve(5)
+        self.assertEqual(first, service.id + 1)
+        now = timezone.now()
+        writer.write([(first + i, f'Service {i}', '', 10 + i, 30, True, now, now) for i in range(5)])
+        self.assertEqual(
+            list(Service.objects.filter(id__gt=service.id).order_by('id').values_list('id', 'price')),
+            [(first + i, 10 + i) for i in range(5)]
+        )
+
+
+class ReminderTests(BookingFixtures, TestCase):
+    """Batched reminder emails, each appointment reminded once."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.customer.email = 'customer@example.com'
+        cls.customer.save()
+
+    def at(self, day, hour):
+        return timezone.make_aware(datetime.datetime.combine(day, datetime.time(hour)))
+
+    def test_due_reminders_cover_the_window(self):
+        early, inside, cancelled, reminded = (self.book(self.slots[i]) for i in (0, 2, 3, 4))
+        cancelled.status = 'Cancelled'
+        cancelled.save()
+        Appointment.objects.filter(id=reminded.id).update(reminder_sent_at=timezone.now())
+
+        due = due_reminders(self.at(self.day, 10), self.at(self.day, 14))
+        self.assertEqual(list(due), [inside])
+        # Windows that cross midnight take the evening before into account
+        overnight = due_reminders(self.at(self.day - datetime.timedelta(days=1), 20), self.at(self.day, 10))
+        self.assertEqual(list(overnight), [early])
+
+    def test_reminders_are_sent_once(self):
+        for slot in self.slots[:3]:
+            self.book(slot)
+        start = self.at(self.day, 8)
+
+        # One SELECT, then one UPDATE per batch
+        with self.assertNumQueries(3):
+            result = send_reminders(start=start, hours=12, batch_size=2)
+        self.assertEqual(result, {'due': 3, 'sent': 3, 'failed': 0})
+        self.assertEqual([message.to for message in mail.outbox], [['customer@example.com']] * 3)
+        self.assertIn('Reminder: Cut on', mail.outbox[0].subject)
+
+        self.assertEqual(send_reminders(start=start, hours=12), {'due': 0, 'sent': 0, 'failed': 0})
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_failed_messages_are_retried_on_the_next_run(self):
+        self.book(self.slots[0])
+        start = self.at(self.day, 8)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError):
+            with self.assertLogs('salon.reminders', 'ERROR'):
+                self.assertEqual(send_reminders(start=start, hours=12), {'due': 1, 'sent': 0, 'failed': 1})
+        self.assertEqual(send_reminders(start=start, hours=12)['sent'], 1)
+
+    def test_command_dry_run_sends_nothing(self):
+        self.book(self.slots[0])
+        out = StringIO()
+        call_command('send_reminders', hours=48, dry_run=True, stdout=out)
+        self.assertIn('✓ 1 reminder(s) due within 48h (dry run, nothing sent)', out.getvalue())
+        self.assertEqual(mail.outbox, [])
+        with self.assertRaises(CommandError):
+            call_command('send_reminders', hours=0, stdout=out)
+
+
+class SweepTests(BookingFixtures, TestCase):
+    """Bulk status sweeps of past and abandoned appointments."""
+
+    def setUp(self):
+        super().setUp()
+        self.confirmed, self.paid, self.unpaid = (self.book(slot) for slot in self.slots[:3])
+        Appointment.objects.filter(id=self.confirmed.id).update(status='Confirmed')
+        Payment.objects.create(appointment=self.paid, amount=30)
+        # Counts the fixtures and the confirmation update() above
+        rebuild_counters()
+
+    def statuses(self):
+        return dict(Appointment.objects.values_list('id', 'status'))
+
+    def counters(self):
+        return {
+            (row.scope, row.owner_id, row.name, row.date): row.value
+            for row in DashboardCounter.objects.exclude(value=0)
+        }
+
+    def test_past_appointments_get_their_final_status(self):
+        self.assertEqual(sweep_past(today=self.day), {'Completed': 0, 'No-show': 0})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            touched = sweep_past(today=self.day + datetime.timedelta(days=1), chunk_days=1)
+        self.assertEqual(touched, {'Completed': 2, 'No-show': 1})
+        self.assertEqual(self.statuses(), {
+            self.confirmed.id: 'Completed', self.paid.id: 'Completed', self.unpaid.id: 'No-show',
+        })
+        self.assertEqual(self.counters(), expected_counters())
+
+    def test_unpaid_bookings_expire_and_release_their_slots(self):
+        Appointment.objects.update(created_at=timezone.now() - datetime.timedelta(hours=48))
+        self.assertEqual(expire_unpaid(hours=72), {'cancelled': 0, 'released': 0})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            touched = expire_unpaid(hours=24, batch_size=1)
+        self.assertEqual(touched, {'cancelled': 1, 'released': 1})
+        self.assertEqual(self.statuses()[self.unpaid.id], 'Cancelled')
+        self.assertEqual(self.statuses()[self.paid.id], 'Pending')
+        self.assertTrue(Schedule.objects.get(id=self.slots[2].id).availability_status)
+        self.assertEqual(self.counters(), expected_counters())
+
+    def test_command_reports_what_it_swept(self):
+        out = StringIO()
+        call_command('sweep_appointments', expire_unpaid_after=0, stdout=out)
+        self.assertIn('✓ Swept 0 appointment(s)', out.getvalue())
+        self.assertNotIn('Slots released', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('sweep_appointments', chunk_days=0, stdout=out)
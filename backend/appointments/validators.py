@@ -69,7 +69,7 @@ def validate_reschedule_eligibility(appointment):
     Raises:
         ValidationError: If appointment cannot be rescheduled
     """
-    if appointment.status in ['Cancelled', 'Completed']:
+    if appointment.status in ['Cancelled', 'Completed', 'No-show']:
         raise ValidationError(f'Cannot reschedule {appointment.status.lower()} appointments.')
 
 
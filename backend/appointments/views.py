@@ -2,16 +2,14 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.exceptions import ValidationError
+from django.http import Http404
 from .models import Appointment, Payment
-from backend.services.models import Service
+from backend.services.catalog import get_active_services, get_service_or_404
 from backend.staff.models import Staff
-from backend.schedules.models import Schedule
+from backend.schedules.rules import resolve_schedule
 from backend.accounts.decorators import staff_or_admin_required
-from .validators import (
-    validate_schedule_availability,
-    validate_no_double_booking,
-    validate_reschedule_eligibility
-)
+from backend.api.metrics import BOOKED, FAILED, NOT_FOUND, SLOT_TAKEN, record_booking
+from .booking import book_appointment, cancel_appointment, reschedule_appointment, update_appointment_status
 
 
 @login_required
@@ -50,35 +48,36 @@ def appointment_create(request):
         schedule_id = request.POST.get('schedule_id')
         notes = request.POST.get('notes', '')
         
-        service = get_object_or_404(Service, id=service_id)
+        service = get_service_or_404(service_id)
         staff = get_object_or_404(Staff, id=staff_id)
-        schedule = get_object_or_404(Schedule, id=schedule_id)
+        schedule = resolve_schedule(staff.id, schedule_id)
+        if schedule is None:
+            record_booking('web', NOT_FOUND)
+            raise Http404('Schedule not found.')
         
-        # Validate schedule availability
+        # Claim the slot and create the appointment atomically
         try:
-            validate_schedule_availability(schedule)
-            validate_no_double_booking(schedule)
+            appointment = book_appointment(
+                user=request.user,
+                service=service,
+                staff=staff,
+                schedule=schedule,
+                notes=notes
+            )
         except ValidationError as e:
+            record_booking('web', SLOT_TAKEN)
             messages.error(request, str(e))
             return redirect('appointment_create')
+        except Exception:
+            # Counted like the API's failures, then left to the 500 handler
+            record_booking('web', FAILED)
+            raise
         
-        # Create appointment
-        appointment = Appointment.objects.create(
-            user=request.user,
-            service=service,
-            staff=staff,
-            schedule=schedule,
-            notes=notes
-        )
-        
-        # Mark schedule as unavailable
-        schedule.availability_status = False
-        schedule.save()
-        
+        record_booking('web', BOOKED)
         messages.success(request, 'Appointment booked successfully!')
         return redirect('appointment_detail', appointment_id=appointment.id)
     
-    services = Service.objects.filter(is_active=True)
+    services = get_active_services()
     return render(request, 'booking.html', {'services': services})
 
 
@@ -114,12 +113,7 @@ def appointment_cancel(request, appointment_id):
         messages.warning(request, 'This appointment is already cancelled.')
         return redirect('appointment_detail', appointment_id=appointment_id)
     
-    appointment.status = 'Cancelled'
-    appointment.save()
-    
-    # Make schedule available again
-    appointment.schedule.availability_status = True
-    appointment.schedule.save()
+    cancel_appointment(appointment)
     
     messages.success(request, 'Appointment cancelled successfully!')
     return redirect('appointment_list')
@@ -133,8 +127,7 @@ def appointment_update_status(request, appointment_id):
     
     if request.method == 'POST':
         new_status = request.POST.get('status')
-        appointment.status = new_status
-        appointment.save()
+        update_appointment_status(appointment, new_status)
         
         messages.success(request, 'Appointment status updated successfully!')
         return redirect('appointment_detail', appointment_id=appointment_id)
@@ -185,7 +178,7 @@ def appointment_reschedule(request, appointment_id):
         messages.error(request, 'You do not have permission to reschedule this appointment.')
         return redirect('appointment_list')
     
-    if appointment.status in ['Cancelled', 'Completed']:
+    if appointment.status in ['Cancelled', 'Completed', 'No-show']:
         messages.error(request, f'Cannot reschedule {appointment.status.lower()} appointments.')
         return redirect('appointment_detail', appointment_id=appointment_id)
     
@@ -194,30 +187,17 @@ def appointment_reschedule(request, appointment_id):
         schedule_id = request.POST.get('schedule_id')
         
         staff = get_object_or_404(Staff, id=staff_id)
-        new_schedule = get_object_or_404(Schedule, id=schedule_id)
+        new_schedule = resolve_schedule(staff.id, schedule_id)
+        if new_schedule is None:
+            raise Http404('Schedule not found.')
         
-        # Validate using validators
+        # Claim the new slot before releasing the old one
         try:
-            validate_schedule_availability(new_schedule)
-            validate_no_double_booking(new_schedule, exclude_appointment_id=appointment.id)
+            reschedule_appointment(appointment, staff, new_schedule)
         except ValidationError as e:
             messages.error(request, str(e))
             return redirect('appointment_reschedule', appointment_id=appointment_id)
         
-        # Make old schedule available
-        old_schedule = appointment.schedule
-        old_schedule.availability_status = True
-        old_schedule.save()
-        
-        # Update appointment
-        appointment.staff = staff
-        appointment.schedule = new_schedule
-        appointment.save()
-        
-        # Mark new schedule as unavailable
-        new_schedule.availability_status = False
-        new_schedule.save()
-        
         messages.success(request, 'Appointment rescheduled successfully!')
         return redirect('appointment_detail', appointment_id=appointment.id)
     
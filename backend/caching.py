@@ -0,0 +1,27 @@
+"""
+Whether the default cache is shared between worker processes.
+
+Version stamps kept in the cache (the service catalog version, availability
+generations) only invalidate other workers' copies when every worker reads
+the same cache. The local memory cache the settings default to, and the
+dummy cache, live inside one process, so code that relies on a cached stamp
+checks cache_is_shared() and falls back to something derived from the
+database when it is not.
+"""
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+# Backends whose entries other processes cannot see
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def cache_is_shared():
+    """
+    Return whether every worker process reads the same default cache.
+
+    Returns:
+        False for the local memory and dummy backends, True otherwise
+    """
+    return not isinstance(caches['default'], PROCESS_LOCAL_BACKENDS)
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'run_at', 'created_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'last_error')
+    ordering = ('run_at', 'id')
+    actions = ('retry_jobs',)
+
+    @admin.action(description='Retry selected jobs now')
+    def retry_jobs(self, request, queryset):
+        from .queue import retry
+        retried = retry(queryset)
+        self.message_user(request, f'{retried} job(s) queued again.')
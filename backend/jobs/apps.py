@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'backend.jobs'
+
+    def ready(self):
+        # Every app registers its handlers in a jobs module
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('jobs')
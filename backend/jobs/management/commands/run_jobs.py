@@ -0,0 +1,62 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from backend.jobs.queue import requeue_stale, run_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Run queued background jobs (slot releases after cancellations and '
+        'other follow-on work of requests). Claims due jobs in batches and '
+        'polls for new ones until stopped; run one or more of these next to '
+        'the web workers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.JOBS_BATCH_SIZE,
+            help=f'Jobs claimed at a time (default: {settings.JOBS_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.JOBS_POLL_INTERVAL,
+            help=f'Seconds to wait when no job is due (default: {settings.JOBS_POLL_INTERVAL:g})'
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due instead of polling')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        self.stopping = False
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self._stop)
+
+        succeeded = failed = 0
+        while not self.stopping:
+            # Long-running process: drop connections the database timed out
+            close_old_connections()
+            done, errors = run_batch(options['batch_size'])
+            succeeded += done
+            failed += errors
+            if done + errors:
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Ran {done + errors} job(s), {errors} failed')
+                continue
+
+            released = requeue_stale()
+            if released:
+                self.stdout.write(self.style.WARNING(f'Released {released} job(s) of workers that stopped'))
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Ran {succeeded + failed} job(s), {failed} failed'))
+
+    def _stop(self, signum, frame):
+        # Finish the current batch, then exit
+        self.stopping = True
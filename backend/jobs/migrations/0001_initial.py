@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:59
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Registered handler that runs the job', max_length=100)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('Queued', 'Queued'), ('Running', 'Running'), ('Failed', 'Failed')], default='Queued', max_length=20)),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the job may run')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=5)),
+                ('locked_by', models.CharField(blank=True, help_text='Worker batch that claimed the job', max_length=64)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Job',
+                'verbose_name_plural': 'Jobs',
+                'db_table': 'jobs',
+                'ordering': ['run_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'), models.Index(fields=['locked_by'], name='job_locked_by_idx')],
+            },
+        ),
+    ]
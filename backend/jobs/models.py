@@ -0,0 +1,42 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Model representing a unit of background work waiting for the worker.
+
+    Rows are deleted once their handler succeeds, so the table only holds
+    queued, running and failed jobs. See backend.jobs.queue.
+    """
+    STATUS_CHOICES = (
+        ('Queued', 'Queued'),
+        ('Running', 'Running'),
+        ('Failed', 'Failed'),
+    )
+
+    name = models.CharField(max_length=100, help_text='Registered handler that runs the job')
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Queued')
+    run_at = models.DateTimeField(default=timezone.now, help_text='Earliest time the job may run')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    locked_by = models.CharField(max_length=64, blank=True, help_text='Worker batch that claimed the job')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'jobs'
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        ordering = ['run_at', 'id']
+        indexes = [
+            # Workers take the due queued jobs in run_at order and look
+            # for running jobs whose lock expired
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+            models.Index(fields=['locked_by'], name='job_locked_by_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
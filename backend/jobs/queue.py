@@ -0,0 +1,245 @@
+"""
+Background jobs stored in the project's own database.
+
+Request handlers commit the row change the user asked for and enqueue()
+the follow-on work in the same transaction, so a job exists exactly when
+its change was committed and no broker has to be deployed. The run_jobs
+management command works through the queue:
+
+- Jobs are claimed in batches: one SELECT picks the oldest due jobs
+  (skipping rows another worker has locked, where the database supports
+  SKIP LOCKED) and one conditional UPDATE marks them as running under a
+  token unique to the batch. Only jobs still queued are claimed, so
+  concurrent workers never run the same job.
+- Each handler runs in a transaction together with the deletion of its
+  job row. A handler that raises is rolled back and the job is queued
+  again with an exponential delay, until max_attempts is reached and it
+  is marked Failed for someone to look at (and retry from the admin).
+- Jobs whose worker died are queued again once their lock is older than
+  JOBS_LOCK_TIMEOUT, so handlers must be safe to run twice.
+
+Apps register handlers in a jobs module (e.g. backend/appointments/jobs.py),
+which the jobs app imports on startup:
+
+    @job('appointments.release_slots')
+    def release_cancelled_slots(appointment_id):
+        ...
+
+With JOBS_RUN_INLINE (the default) jobs also run in the process that
+enqueued them, right after the transaction commits, so a deployment
+without a worker still gets its jobs done. A job that fails inline waits
+for a worker to retry it.
+"""
+import logging
+import os
+import socket
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger('salon.jobs')
+
+QUEUED = 'Queued'
+RUNNING = 'Running'
+FAILED = 'Failed'
+
+# Longest delay between two attempts of a failing job
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+_handlers = {}
+
+
+class _LockLost(Exception):
+    """The job was reclaimed by another worker while its handler ran."""
+
+
+def job(name):
+    """
+    Register a function as the handler of a job name.
+
+    The handler is called with the job's payload as keyword arguments.
+
+    Args:
+        name: Job name, conventionally '<app>.<action>'
+    """
+    def register(handler):
+        if _handlers.setdefault(name, handler) is not handler:
+            raise ValueError(f'A handler is already registered for job {name!r}.')
+        return handler
+    return register
+
+
+def enqueue(name, run_at=None, max_attempts=None, **payload):
+    """
+    Queue a job; it only becomes visible to workers when the surrounding
+    transaction commits.
+
+    Args:
+        name: Registered job name
+        run_at: Earliest time the job may run (default: now)
+        max_attempts: Attempts before the job is marked Failed
+            (default: JOBS_MAX_ATTEMPTS)
+        **payload: JSON-serializable arguments for the handler
+
+    Returns:
+        The created Job
+
+    Raises:
+        ValueError: If no handler is registered for the name
+    """
+    if name not in _handlers:
+        raise ValueError(f'No handler is registered for job {name!r}.')
+
+    queued = Job.objects.create(
+        name=name,
+        payload=payload,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS
+    )
+    if settings.JOBS_RUN_INLINE:
+        transaction.on_commit(lambda: run_batch(ids=[queued.id]))
+    return queued
+
+
+def claim(limit, ids=None):
+    """
+    Mark up to limit due jobs as running and return them, oldest first.
+
+    Args:
+        limit: Most jobs to claim
+        ids: Optional job IDs to restrict the claim to
+
+    Returns:
+        List of claimed Job instances
+    """
+    token = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}'[-64:]
+    now = timezone.now()
+
+    with transaction.atomic():
+        due = Job.objects.filter(status=QUEUED, run_at__lte=now).order_by('run_at', 'id')
+        if ids is not None:
+            due = due.filter(id__in=ids)
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        due_ids = list(due.values_list('id', flat=True)[:limit])
+        if not due_ids:
+            return []
+
+        # Still queued: another worker may have claimed some meanwhile
+        Job.objects.filter(id__in=due_ids, status=QUEUED).update(
+            status=RUNNING,
+            locked_by=token,
+            locked_at=now,
+            attempts=F('attempts') + 1
+        )
+
+    return list(Job.objects.filter(locked_by=token).order_by('run_at', 'id'))
+
+
+def run(claimed):
+    """
+    Run a claimed job and delete it, or schedule its next attempt.
+
+    Args:
+        claimed: Job instance returned by claim()
+
+    Returns:
+        True if the handler succeeded
+    """
+    try:
+        handler = _handlers.get(claimed.name)
+        if handler is None:
+            raise LookupError(f'No handler is registered for job {claimed.name!r}.')
+
+        with transaction.atomic():
+            handler(**claimed.payload)
+            deleted, _ = Job.objects.filter(id=claimed.id, locked_by=claimed.locked_by).delete()
+            if not deleted:
+                raise _LockLost()
+    except _LockLost:
+        # Rolled back; the worker that reclaimed the job runs it
+        logger.warning('Job %s #%s outlived its lock and was rolled back', claimed.name, claimed.id)
+        return False
+    except Exception:
+        logger.exception('Job %s #%s failed (attempt %s of %s)',
+                         claimed.name, claimed.id, claimed.attempts, claimed.max_attempts)
+        _schedule_retry(claimed, traceback.format_exc())
+        return False
+    return True
+
+
+def run_batch(limit=None, ids=None):
+    """
+    Claim a batch of due jobs and run them one by one.
+
+    Args:
+        limit: Most jobs to claim (default: JOBS_BATCH_SIZE)
+        ids: Optional job IDs to restrict the batch to
+
+    Returns:
+        Tuple of (jobs succeeded, jobs failed)
+    """
+    batch = claim(limit or settings.JOBS_BATCH_SIZE, ids=ids)
+    succeeded = sum(1 for claimed in batch if run(claimed))
+    return succeeded, len(batch) - succeeded
+
+
+def _schedule_retry(claimed, error):
+    if claimed.attempts >= claimed.max_attempts:
+        changes = {'status': FAILED}
+    else:
+        delay = timedelta(seconds=settings.JOBS_RETRY_DELAY * 2 ** (claimed.attempts - 1))
+        changes = {'status': QUEUED, 'run_at': timezone.now() + min(delay, MAX_RETRY_DELAY)}
+
+    Job.objects.filter(id=claimed.id, locked_by=claimed.locked_by).update(
+        locked_by='',
+        locked_at=None,
+        last_error=error[-5000:],
+        **changes
+    )
+
+
+def requeue_stale():
+    """
+    Release jobs whose worker stopped before finishing them.
+
+    Jobs locked for longer than JOBS_LOCK_TIMEOUT are queued again, or
+    marked Failed if that was their last attempt.
+
+    Returns:
+        Number of jobs released
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    stale = Job.objects.filter(status=RUNNING, locked_at__lt=cutoff)
+    released = {'locked_by': '', 'locked_at': None, 'last_error': 'The worker running the job stopped responding.'}
+
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(status=FAILED, **released)
+    requeued = stale.update(status=QUEUED, run_at=timezone.now(), **released)
+    return failed + requeued
+
+
+def retry(jobs):
+    """
+    Queue jobs again right away with a fresh set of attempts.
+
+    Args:
+        jobs: Job queryset; running jobs are left alone
+
+    Returns:
+        Number of jobs queued
+    """
+    return jobs.exclude(status=RUNNING).update(
+        status=QUEUED,
+        run_at=timezone.now(),
+        attempts=0,
+        locked_by='',
+        locked_at=None
+    )
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import FAILED, QUEUED, claim, enqueue, job, requeue_stale, retry, run_batch
+
+
+calls = []
+
+
+@job('tests.record')
+def record(value, fail=False):
+    calls.append(value)
+    if fail:
+        raise RuntimeError('failed on purpose')
+
+
+@override_settings(JOBS_RUN_INLINE=False, JOBS_RETRY_DELAY=30, JOBS_MAX_ATTEMPTS=2)
+class JobQueueTests(TestCase):
+    """The database-backed job queue."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_unknown_jobs_are_refused(self):
+        with self.assertRaises(ValueError):
+            enqueue('tests.missing')
+
+    def test_worker_runs_and_deletes_jobs(self):
+        enqueue('tests.record', value=1)
+        enqueue('tests.record', value=2)
+        self.assertEqual(run_batch(), (2, 0))
+        self.assertEqual(calls, [1, 2])
+        self.assertFalse(Job.objects.exists())
+
+    def test_jobs_run_inline_after_commit(self):
+        with override_settings(JOBS_RUN_INLINE=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                enqueue('tests.record', value=1)
+                self.assertEqual(calls, [])
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+
+    def test_future_jobs_wait(self):
+        enqueue('tests.record', run_at=timezone.now() + timedelta(minutes=5), value=1)
+        self.assertEqual(run_batch(), (0, 0))
+
+    def test_claimed_jobs_are_not_claimed_twice(self):
+        enqueue('tests.record', value=1)
+        self.assertEqual(len(claim(10)), 1)
+        self.assertEqual(claim(10), [])
+
+    def test_failures_are_retried_then_marked_failed(self):
+        queued = enqueue('tests.record', value=1, fail=True)
+        with self.assertLogs('salon.jobs', 'ERROR'):
+            self.assertEqual(run_batch(), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, QUEUED)
+        self.assertGreater(queued.run_at, timezone.now())
+        self.assertIn('failed on purpose', queued.last_error)
+
+        Job.objects.filter(id=queued.id).update(run_at=timezone.now())
+        with self.assertLogs('salon.jobs', 'ERROR'):
+            run_batch()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, FAILED)
+
+        self.assertEqual(retry(Job.objects.all()), 1)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (QUEUED, 0))
+
+    def test_stale_locks_are_requeued(self):
+        queued = enqueue('tests.record', value=1)
+        claim(10)
+        Job.objects.filter(id=queued.id).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale(), 1)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.locked_by), (QUEUED, ''))
@@ -1,10 +1,45 @@
 from django.contrib import admin
-from .models import Schedule
+from .models import Schedule, AvailabilityRule, AvailabilityException
+from .availability import invalidate_staff_availability
+
+
+class _InvalidatesAvailabilityAdmin(admin.ModelAdmin):
+    """Drop cached availability of the affected staff members on every change."""
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_staff_availability(obj.staff_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_staff_availability(obj.staff_id)
+
+    def delete_queryset(self, request, queryset):
+        staff_ids = set(queryset.values_list('staff_id', flat=True))
+        super().delete_queryset(request, queryset)
+        for staff_id in staff_ids:
+            invalidate_staff_availability(staff_id)
 
 
 @admin.register(Schedule)
-class ScheduleAdmin(admin.ModelAdmin):
+class ScheduleAdmin(_InvalidatesAvailabilityAdmin):
     list_display = ('staff', 'date', 'time_slot', 'availability_status', 'created_at')
     list_filter = ('availability_status', 'date', 'created_at')
     search_fields = ('staff__user__username',)
     ordering = ('date', 'time_slot')
+
+
+@admin.register(AvailabilityRule)
+class AvailabilityRuleAdmin(_InvalidatesAvailabilityAdmin):
+    list_display = ('staff', 'weekday', 'time_slot', 'valid_from', 'valid_until')
+    list_filter = ('weekday',)
+    search_fields = ('staff__user__username',)
+    ordering = ('staff', 'weekday', 'time_slot')
+
+
+@admin.register(AvailabilityException)
+class AvailabilityExceptionAdmin(_InvalidatesAvailabilityAdmin):
+    list_display = ('staff', 'date', 'time_slot', 'reason')
+    list_filter = ('date',)
+    search_fields = ('staff__user__username', 'reason')
+    ordering = ('date', 'time_slot')
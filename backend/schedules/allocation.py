@@ -0,0 +1,161 @@
+"""
+Contiguous slot allocation for services longer than one slot.
+
+A booking of N minutes occupies a run of free slots on one day in which
+each slot starts where the previous one ends and the run spans at least N
+minutes. fitting_starts() answers "which start times fit this service"
+over a day's slots in one pass; allocate_runs() picks the run for each
+booking with one query over the affected days.
+"""
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from .models import Schedule
+from .rules import materialize_slots, virtual_schedules
+
+
+def _minutes(value):
+    """Minutes since midnight of a time or ISO time string, or None."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        hours, minutes = value.split(':')[:2]
+        return int(hours) * 60 + int(minutes)
+    return value.hour * 60 + value.minute
+
+
+def _bounds(slot):
+    """Return ((staff, date), start, end) of a Schedule or a schedule dict."""
+    if isinstance(slot, dict):
+        staff = slot['staff']['id'] if isinstance(slot['staff'], dict) else slot['staff']
+        return (staff, str(slot['date'])), _minutes(slot['start_time']), _minutes(slot['end_time'])
+    return (slot.staff_id, str(slot.date)), _minutes(slot.start_time), _minutes(slot.end_time)
+
+
+def fitting_starts(slots, duration):
+    """
+    Filter free slots down to those a booking of a given length can start at.
+
+    Args:
+        slots: Free slots (Schedule instances or schedule dicts) ordered by
+            staff, date and start time
+        duration: Booking length in minutes
+
+    Returns:
+        List of slots from which a run of back-to-back free slots covers
+        the duration, in input order
+    """
+    # Split the day(s) into runs of back-to-back slots
+    runs = []
+    previous = None
+    for slot in slots:
+        day, start, end = _bounds(slot)
+        if start is None or end is None:
+            previous = None
+            continue
+        if previous and previous[0] == day and previous[2] == start:
+            runs[-1].append((start, end, slot))
+        else:
+            runs.append([(start, end, slot)])
+        previous = (day, start, end)
+
+    fitting = []
+    for run in runs:
+        # The slot that completes the run only moves forward with the start
+        last = 0
+        for first, (start, _, slot) in enumerate(run):
+            last = max(last, first)
+            while last < len(run) and run[last][1] - start < duration:
+                last += 1
+            if last == len(run):
+                break
+            fitting.append(slot)
+
+    return fitting
+
+
+def allocate_runs(requests):
+    """
+    Pick the slots each booking will occupy.
+
+    Args:
+        requests: List of (schedule, duration, held_ids) tuples: the slot the
+            booking starts at, its length in minutes, and IDs of slots the
+            booking already holds (when rescheduling), which count as free
+
+    Returns:
+        List of Schedule lists, one per request, each starting with the
+        requested schedule. Rule-derived slots in a run get their rows created.
+
+    Raises:
+        ValidationError: If a booking does not fit in the free time after its start
+    """
+    runs = [[schedule] for schedule, _, _ in requests]
+
+    pending = []
+    for index, (schedule, duration, held_ids) in enumerate(requests):
+        start, end = _minutes(schedule.start_time), _minutes(schedule.end_time)
+        # Slots with an unparsed label are booked on their own, as before
+        if start is not None and end - start < duration:
+            pending.append((index, schedule, duration))
+
+    if not pending:
+        return runs
+
+    # Every later slot on the affected days, in one query
+    day_filter = Q()
+    held = set()
+    for index, schedule, _ in pending:
+        day_filter |= Q(staff_id=schedule.staff_id, date=schedule.date, start_time__gte=schedule.end_time)
+        held.update(requests[index][2])
+
+    candidates = {}
+    free = Q(availability_status=True)
+    if held:
+        free |= Q(id__in=held)
+    for slot in Schedule.objects.filter(day_filter).filter(free).select_related('staff__user'):
+        candidates.setdefault((slot.staff_id, slot.date), []).append(slot)
+
+    dates = [schedule.date for _, schedule, _ in pending]
+    staff_ids = {schedule.staff_id for _, schedule, _ in pending}
+    for slot in virtual_schedules(staff_ids, min(dates), max(dates)):
+        candidates.setdefault((slot.staff_id, slot.date), []).append(slot)
+
+    to_materialize = set()
+    for index, schedule, duration in pending:
+        day = sorted(
+            (slot for slot in candidates.get((schedule.staff_id, schedule.date), ())
+             if slot.start_time is not None and slot.start_time >= schedule.end_time),
+            key=lambda slot: slot.start_time
+        )
+
+        covered = _minutes(schedule.end_time) - _minutes(schedule.start_time)
+        expected = schedule.end_time
+        for slot in day:
+            if covered >= duration or slot.start_time != expected:
+                break
+            runs[index].append(slot)
+            covered += _minutes(slot.end_time) - _minutes(slot.start_time)
+            expected = slot.end_time
+
+        if covered < duration:
+            raise ValidationError(
+                f'Not enough consecutive free time after {schedule.date} {schedule.time_slot} '
+                f'for a {duration}-minute service.'
+            )
+
+        to_materialize.update(
+            (slot.staff_id, slot.date, slot.time_slot) for slot in runs[index] if slot.id is None
+        )
+
+    if to_materialize:
+        created = materialize_slots(to_materialize)
+        if len(created) != len(to_materialize):
+            # A rule or exception changed since the slots were expanded
+            raise ValidationError('One or more time slots are not available.')
+        runs = [
+            [created[(slot.staff_id, slot.date, slot.time_slot)] if slot.id is None else slot for slot in run]
+            for run in runs
+        ]
+
+    return runs
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SchedulesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.schedules'
+
+    def ready(self):
+        from .holds import warn_unless_shared
+        warn_unless_shared()
@@ -0,0 +1,449 @@
+"""
+In-memory index of free schedule slots per staff member and day.
+
+Availability reads on the booking page are served from a process-local map
+of staff -> date -> time slot instead of querying and re-serializing the
+schedules table on every request. Booking, cancelling and rescheduling
+update the map in place after the transaction commits, and bump a per-staff
+generation number in the shared cache so other worker processes drop their
+copy and reload it on the next read.
+
+Each generation also leaves a short-lived event in the cache describing what
+changed, which the availability stream relays to connected booking pages.
+
+Generations only reach other workers through a shared cache. With a
+process-local cache (the LocMemCache default) a bump made by one worker is
+invisible to the rest, so the version is instead read from the schedule,
+rule and exception tables (row counts and newest change times) and kept
+for LOCAL_VERSION_TTL seconds. Index entries and ETags then follow the
+database, and a change made through another worker shows up within that
+time.
+"""
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+
+from backend.caching import cache_is_shared
+from .models import AvailabilityException, AvailabilityRule, Schedule
+from .rules import rule_horizon, virtual_schedules
+
+
+GENERATION_KEY = 'availability:generation:{staff_id}'
+EVENT_KEY = 'availability:event:{staff_id}:{generation}'
+LOCAL_VERSION_KEY = 'availability:local-version:{staff_id}'
+
+# Seconds a worker without a shared cache reuses the version it read from
+# the database
+LOCAL_VERSION_TTL = 2
+
+# Generation shared by every staff member, moved by any change
+ALL_STAFF = 'all'
+
+
+def _generation_key(staff_id):
+    return GENERATION_KEY.format(staff_id=staff_id)
+
+
+def _current_generation(staff_id):
+    # A missing generation (cold or evicted cache) is re-seeded from the
+    # clock so it can never collide with one handed out before
+    key = _generation_key(staff_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, int(time.time() * 1000), None)
+        generation = cache.get(key, 0)
+    return generation
+
+
+async def _acurrent_generation(staff_id):
+    key = _generation_key(staff_id)
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, int(time.time() * 1000), None)
+        generation = await cache.aget(key, 0)
+    return generation
+
+
+def _incr(staff_id):
+    key = _generation_key(staff_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        _current_generation(staff_id)
+        return cache.incr(key)
+
+
+def _local_version_key(staff_id):
+    return LOCAL_VERSION_KEY.format(staff_id=staff_id)
+
+
+def _bump_generation(staff_id):
+    if not cache_is_shared():
+        # Other workers notice the change in the tables within LOCAL_VERSION_TTL
+        cache.delete_many([_local_version_key(ALL_STAFF), _local_version_key(staff_id)])
+    _incr(ALL_STAFF)
+    return _incr(staff_id)
+
+
+def _event_key(staff_id, generation):
+    return EVENT_KEY.format(staff_id=staff_id, generation=generation)
+
+
+def _record_event(staff_id, generation, event):
+    timeout = getattr(settings, 'AVAILABILITY_EVENT_TTL', 300)
+    cache.set(_event_key(staff_id, generation), event, timeout)
+
+
+def _database_version(staff_id):
+    # Bookings, releases and edits move updated_at (created_at for
+    # exceptions, which are only added and removed); deletions move the counts
+    parts = []
+    for model, changed in (
+        (Schedule, 'updated_at'),
+        (AvailabilityRule, 'updated_at'),
+        (AvailabilityException, 'created_at'),
+    ):
+        rows = model.objects.all() if staff_id == ALL_STAFF else model.objects.filter(staff_id=staff_id)
+        stats = rows.aggregate(count=Count('id'), newest=Max(changed))
+        newest = stats['newest']
+        parts.append(f"{stats['count']}.{int(newest.timestamp() * 1000000) if newest else 0}")
+    return 'db-' + '-'.join(parts)
+
+
+def _version(staff_id):
+    if cache_is_shared():
+        return _current_generation(staff_id)
+    key = _local_version_key(staff_id)
+    version = cache.get(key)
+    if version is None:
+        version = _database_version(staff_id)
+        cache.set(key, version, LOCAL_VERSION_TTL)
+    return version
+
+
+async def _aversion(staff_id):
+    if cache_is_shared():
+        return await _acurrent_generation(staff_id)
+    key = _local_version_key(staff_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = await sync_to_async(_database_version)(staff_id)
+        await cache.aset(key, version, LOCAL_VERSION_TTL)
+    return version
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def _slot_order(slots):
+    def key(time_slot):
+        start_time = slots[time_slot]['start_time']
+        # Chronological, with unparsed legacy labels last
+        return (start_time is None, start_time or '', time_slot)
+    return sorted(slots, key=key)
+
+
+class _StaffEntry:
+    """Free slots of one staff member, grouped by ISO date and time slot."""
+
+    __slots__ = ('generation', 'loaded_at', 'staff_data', 'days', 'flat')
+
+    def __init__(self, generation, staff_data, days):
+        self.generation = generation
+        self.loaded_at = time.monotonic()
+        self.staff_data = staff_data
+        self.days = days
+        self.flat = None
+
+    def rows(self, date=None):
+        if date is not None:
+            slots = self.days.get(date, {})
+            return [slots[time_slot] for time_slot in _slot_order(slots)]
+
+        if self.flat is None:
+            flat = []
+            for day in sorted(self.days):
+                slots = self.days[day]
+                flat.extend(slots[time_slot] for time_slot in _slot_order(slots))
+            self.flat = flat
+        return self.flat
+
+
+class AvailabilityIndex:
+    """
+    Process-local availability index.
+
+    Entries are loaded lazily per staff member with a few queries, kept
+    until their TTL expires or the shared generation number moves, and are
+    mutated copy-on-write so readers never need a lock.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'AVAILABILITY_INDEX_TTL', 300)
+
+    def slots(self, staff_id, date=None, version=None):
+        """
+        Return the free slots of a staff member.
+
+        Args:
+            staff_id: Staff primary key
+            date: Optional ISO date string to restrict the result to one day
+            version: The staff member's availability_version(), if the
+                caller already read it
+
+        Returns:
+            List of schedule dicts shaped like ScheduleSerializer output,
+            ordered by date and time slot
+        """
+        entry = self._entries.get(staff_id)
+        generation = _version(staff_id) if version is None else version
+
+        if (
+            entry is None
+            or entry.generation != generation
+            or time.monotonic() - entry.loaded_at > self.ttl
+        ):
+            entry = self._load(staff_id, generation)
+
+        return entry.rows(date)
+
+    async def aslots(self, staff_id, date=None, version=None):
+        """
+        Async version of slots().
+
+        A current entry is answered on the event loop; loading one runs the
+        queries in a worker thread.
+        """
+        entry = self._entries.get(staff_id)
+        generation = await _aversion(staff_id) if version is None else version
+
+        if (
+            entry is None
+            or entry.generation != generation
+            or time.monotonic() - entry.loaded_at > self.ttl
+        ):
+            entry = await sync_to_async(self._load)(staff_id, generation)
+
+        return entry.rows(date)
+
+    def claim(self, schedule):
+        """Remove a booked schedule from the index."""
+        self._apply(schedule, available=False)
+
+    def release(self, schedule):
+        """Put a released schedule back into the index."""
+        self._apply(schedule, available=True)
+
+    def invalidate(self, staff_id):
+        """Drop the index entry of a staff member in every process."""
+        with self._lock:
+            self._entries.pop(staff_id, None)
+        generation = _bump_generation(staff_id)
+        _record_event(staff_id, generation, {'type': 'refresh'})
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _load(self, staff_id, generation):
+        from backend.api.serializers import StaffSerializer
+        from backend.staff.models import Staff
+
+        schedules = list(
+            Schedule.objects.filter(staff_id=staff_id, availability_status=True)
+            .select_related('staff__user')
+        )
+
+        if schedules:
+            staff_data = StaffSerializer(schedules[0].staff).data
+        else:
+            staff = Staff.objects.select_related('user').filter(id=staff_id).first()
+            staff_data = StaffSerializer(staff).data if staff else None
+
+        # Recurring-rule slots that have no Schedule row yet carry no id
+        start_date, end_date = rule_horizon()
+        virtual = virtual_schedules([staff_id], start_date, end_date)
+
+        days = {}
+        for schedule in virtual + schedules:
+            date = str(schedule.date)
+            days.setdefault(date, {})[schedule.time_slot] = {
+                'id': schedule.id,
+                'staff': staff_data,
+                'date': date,
+                'time_slot': schedule.time_slot,
+                'start_time': _isoformat(schedule.start_time),
+                'end_time': _isoformat(schedule.end_time),
+                'availability_status': True,
+            }
+
+        entry = _StaffEntry(generation, staff_data, days)
+        with self._lock:
+            self._entries[staff_id] = entry
+        return entry
+
+    def _apply(self, schedule, available):
+        staff_id = schedule.staff_id
+        generation = _bump_generation(staff_id)
+        _record_event(staff_id, generation, {
+            'type': 'released' if available else 'claimed',
+            'schedule_id': schedule.id,
+            'date': str(schedule.date),
+            'time_slot': schedule.time_slot,
+        })
+
+        with self._lock:
+            entry = self._entries.get(staff_id)
+            if entry is None:
+                return
+
+            # Entries keyed by a database version are reloaded on the next read
+            if not cache_is_shared():
+                self._entries.pop(staff_id, None)
+                return
+
+            # Another process changed this staff member since we loaded it
+            if generation != entry.generation + 1 or entry.staff_data is None:
+                self._entries.pop(staff_id, None)
+                return
+
+            date = str(schedule.date)
+            days = dict(entry.days)
+            slots = dict(days.get(date, {}))
+
+            if available:
+                slots[schedule.time_slot] = {
+                    'id': schedule.id,
+                    'staff': entry.staff_data,
+                    'date': date,
+                    'time_slot': schedule.time_slot,
+                    'start_time': _isoformat(schedule.start_time),
+                    'end_time': _isoformat(schedule.end_time),
+                    'availability_status': True,
+                }
+            else:
+                slots.pop(schedule.time_slot, None)
+
+            if slots:
+                days[date] = slots
+            else:
+                days.pop(date, None)
+
+            updated = _StaffEntry(generation, entry.staff_data, days)
+            updated.loaded_at = entry.loaded_at
+            self._entries[staff_id] = updated
+
+
+availability_index = AvailabilityIndex()
+
+
+def availability_version(staff_id=None):
+    """
+    Return a counter that moves whenever availability changes.
+
+    Args:
+        staff_id: Staff primary key, or None for the counter shared by all staff
+
+    Returns:
+        Integer generation number, or a version string read from the
+        database when the cache is not shared between workers
+    """
+    return _version(ALL_STAFF if staff_id is None else staff_id)
+
+
+async def aavailability_version(staff_id=None):
+    """Async version of availability_version()."""
+    return await _aversion(ALL_STAFF if staff_id is None else staff_id)
+
+
+async def aget_availability_events(staff_id, since, limit=100):
+    """
+    Return what changed in a staff member's availability after a generation.
+
+    Args:
+        staff_id: Staff primary key
+        since: Last generation the caller has seen, or None to only read
+            the current generation
+        limit: Most events to fetch; a caller further behind gets a refresh
+
+    Returns:
+        Tuple of (current generation, list of (generation, event) pairs).
+        Events that expired or were never recorded come back as refresh events.
+    """
+    current = await _acurrent_generation(staff_id)
+
+    if since is None or current == since:
+        return current, []
+    if current < since:
+        # The caller's generation came from before the counter was re-seeded
+        return current, [(current, {'type': 'refresh'})]
+    if current - since > limit:
+        return current, [(current, {'type': 'refresh'})]
+
+    generations = range(since + 1, current + 1)
+    found = await cache.aget_many([_event_key(staff_id, generation) for generation in generations])
+    return current, [
+        (generation, found.get(_event_key(staff_id, generation), {'type': 'refresh'}))
+        for generation in generations
+    ]
+
+
+def get_available_slots(staff_id, date=None, version=None):
+    """
+    Look up free slots for a staff member without touching the database.
+
+    Args:
+        staff_id: Staff primary key
+        date: Optional ISO date string (YYYY-MM-DD)
+        version: The staff member's availability_version(), if already read
+
+    Returns:
+        List of schedule dicts ordered by date and time slot
+    """
+    return availability_index.slots(staff_id, date, version)
+
+
+async def aget_available_slots(staff_id, date=None, version=None):
+    """Async version of get_available_slots()."""
+    return await availability_index.aslots(staff_id, date, version)
+
+
+def mark_slot_booked(schedule):
+    """
+    Record that a schedule was booked, once the current transaction commits.
+
+    Args:
+        schedule: Schedule instance that is no longer available
+    """
+    transaction.on_commit(lambda: availability_index.claim(schedule))
+
+
+def mark_slot_released(schedule):
+    """
+    Record that a schedule became free again, once the current transaction commits.
+
+    Args:
+        schedule: Schedule instance that is available again
+    """
+    transaction.on_commit(lambda: availability_index.release(schedule))
+
+
+def invalidate_staff_availability(staff_id):
+    """
+    Force every process to reload a staff member's slots on the next read.
+
+    Args:
+        staff_id: Staff primary key
+    """
+    transaction.on_commit(lambda: availability_index.invalidate(staff_id))
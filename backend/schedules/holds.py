@@ -0,0 +1,223 @@
+"""
+Short-lived holds on slots a customer has picked but not booked yet.
+
+Choosing a time on the booking page holds that slot for SLOT_HOLD_TTL
+seconds. While the hold lasts, availability listings leave the slot out
+for everyone else and booking it as someone else fails before the booking
+transaction claims anything, so two customers racing for one slot find out
+when they pick it instead of after a failed booking.
+
+Holds live in the cache, one entry per staff member mapping
+(date, time_slot) to the holder and the time the hold runs out. Reads
+ignore holds past their time, writes drop them, and the entry itself times
+out with its newest hold, so expired holds never need a sweep. Writes to an
+entry are serialized by a short lock taken with cache.add(). Holds only
+reach other worker processes through a shared cache (CACHE_BACKEND): with
+a process-local cache a hold protects the slot only from requests served
+by the same worker, so the schedules app warns at startup when DEBUG is
+off and the cache is not shared.
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from backend.caching import cache_is_shared
+
+
+logger = logging.getLogger('salon.holds')
+
+
+HOLDS_KEY = 'slot-holds:{staff_id}'
+LOCK_KEY = 'slot-holds:lock:{staff_id}'
+USER_KEY = 'slot-holds:user:{user_id}'
+
+# Seconds a crashed writer can keep an entry locked, and seconds a writer
+# waits for the lock before giving up
+LOCK_TIMEOUT = 5
+LOCK_WAIT = 1.0
+
+HELD_MESSAGE = 'This time slot is being held by another customer. Please choose another time.'
+
+
+class _Busy(Exception):
+    """The hold entry of a staff member stayed locked."""
+
+
+def _ttl():
+    return getattr(settings, 'SLOT_HOLD_TTL', 120)
+
+
+def warn_unless_shared():
+    """Log a warning when holds cannot reach other worker processes."""
+    if settings.DEBUG or cache_is_shared():
+        return
+    logger.warning(
+        'Slot holds are kept in a process-local cache, so they only protect a slot '
+        'from requests served by the same worker process. Set CACHE_BACKEND to a '
+        'shared cache when running more than one worker.'
+    )
+
+
+def _holds_key(staff_id):
+    return HOLDS_KEY.format(staff_id=staff_id)
+
+
+def _user_key(user_id):
+    return USER_KEY.format(user_id=user_id)
+
+
+def _live(entry, now):
+    return {slot: hold for slot, hold in (entry or {}).items() if hold[1] > now}
+
+
+@contextmanager
+def _locked(staff_id):
+    key = LOCK_KEY.format(staff_id=staff_id)
+    deadline = time.monotonic() + LOCK_WAIT
+    while not cache.add(key, 1, LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            raise _Busy()
+        time.sleep(0.005)
+    try:
+        yield
+    finally:
+        cache.delete(key)
+
+
+def _drop(staff_id, user_id):
+    """Remove a customer's holds from a staff member's entry."""
+    with _locked(staff_id):
+        key = _holds_key(staff_id)
+        now = time.time()
+        holds = {slot: hold for slot, hold in _live(cache.get(key), now).items() if hold[0] != user_id}
+        if holds:
+            cache.set(key, holds, int(max(hold[1] for hold in holds.values()) - now) + 1)
+        else:
+            cache.delete(key)
+
+
+def hold_slot(user_id, staff_id, date, time_slot):
+    """
+    Hold a slot for a customer, or extend the customer's hold on it.
+
+    A customer holds one slot at a time; holding another releases the
+    previous one.
+
+    Args:
+        user_id: Customer placing the hold
+        staff_id: Staff primary key
+        date: Date or ISO date string of the slot
+        time_slot: Time slot label
+
+    Returns:
+        Unix timestamp the hold runs out at
+
+    Raises:
+        ValidationError: If someone else holds the slot
+    """
+    slot = (str(date), time_slot)
+    previous = cache.get(_user_key(user_id))
+    key = _holds_key(staff_id)
+
+    try:
+        with _locked(staff_id):
+            now = time.time()
+            holds = _live(cache.get(key), now)
+            holder = holds.get(slot)
+            if holder and holder[0] != user_id:
+                raise ValidationError(HELD_MESSAGE)
+
+            expires_at = now + _ttl()
+            holds = {other: hold for other, hold in holds.items() if hold[0] != user_id}
+            holds[slot] = (user_id, expires_at)
+            # Every hold lasts the same TTL, so this one is the last to run out
+            cache.set(key, holds, _ttl())
+    except _Busy:
+        raise ValidationError('This time slot cannot be held right now. Please try again.')
+
+    if previous and previous[0] != staff_id:
+        try:
+            _drop(previous[0], user_id)
+        except _Busy:
+            pass  # Runs out on its own
+    cache.set(_user_key(user_id), (staff_id, slot), _ttl())
+    return expires_at
+
+
+def release_hold(user_id):
+    """
+    Release the slot a customer holds, if any.
+
+    Args:
+        user_id: Customer whose hold is released
+    """
+    previous = cache.get(_user_key(user_id))
+    if not previous:
+        return
+    try:
+        _drop(previous[0], user_id)
+    except _Busy:
+        return  # Runs out on its own
+    cache.delete(_user_key(user_id))
+
+
+def _collect(found, keys, now):
+    return {
+        (keys[key], *slot): hold[0]
+        for key, entry in found.items()
+        for slot, hold in _live(entry, now).items()
+    }
+
+
+def active_holds(staff_ids):
+    """
+    Return the slots currently held for a set of staff members.
+
+    Args:
+        staff_ids: Iterable of staff primary keys
+
+    Returns:
+        Dict of (staff_id, ISO date, time_slot) -> holding user's id
+    """
+    keys = {_holds_key(staff_id): staff_id for staff_id in staff_ids}
+    return _collect(cache.get_many(list(keys)), keys, time.time())
+
+
+async def aactive_holds(staff_ids):
+    """Async version of active_holds()."""
+    keys = {_holds_key(staff_id): staff_id for staff_id in staff_ids}
+    return _collect(await cache.aget_many(list(keys)), keys, time.time())
+
+
+def held_by_others(holds, user_id):
+    """
+    Pick the held slots a customer cannot book.
+
+    Args:
+        holds: Result of active_holds()
+        user_id: Customer asking, or None for anonymous visitors
+
+    Returns:
+        Frozenset of (staff_id, ISO date, time_slot) tuples
+    """
+    return frozenset(slot for slot, holder in holds.items() if holder != user_id)
+
+
+def ensure_not_held(user_id, schedules):
+    """
+    Refuse slots that another customer holds.
+
+    Args:
+        user_id: Customer booking the slots
+        schedules: Schedule instances about to be claimed
+
+    Raises:
+        ValidationError: If any of the slots is held by someone else
+    """
+    held = held_by_others(active_holds({schedule.staff_id for schedule in schedules}), user_id)
+    if any((schedule.staff_id, str(schedule.date), schedule.time_slot) in held for schedule in schedules):
+        raise ValidationError(HELD_MESSAGE)
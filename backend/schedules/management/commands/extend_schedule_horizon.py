@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from backend.staff.models import Staff
+from backend.schedules.generation import DEFAULT_TIME_SLOTS, generate_schedules
+from backend.schedules.validators import validate_time_slot
+
+
+class Command(BaseCommand):
+    help = (
+        'Keep a rolling N-day schedule horizon for all available staff. '
+        'Safe to run repeatedly (e.g. nightly from cron); existing slots are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Number of days ahead to keep scheduled (default: 30)')
+        parser.add_argument(
+            '--time-slots',
+            nargs='+',
+            default=DEFAULT_TIME_SLOTS,
+            help='Time slots to create each day (default: hourly 09:00-18:00)'
+        )
+        parser.add_argument('--staff', type=int, nargs='+', help='Only these staff IDs (default: all available staff)')
+        parser.add_argument('--chunk-size', type=int, default=50, help='Staff members processed per batch (default: 50)')
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if days < 1:
+            raise CommandError('--days must be at least 1.')
+
+        for time_slot in options['time_slots']:
+            try:
+                validate_time_slot(time_slot)
+            except ValidationError as e:
+                raise CommandError(f'Invalid time slot {time_slot!r}: {e.messages[0]}')
+
+        start_date = timezone.now().date()
+        end_date = start_date + timedelta(days=days - 1)
+
+        staff = Staff.objects.filter(is_available=True)
+        if options['staff']:
+            staff = staff.filter(id__in=options['staff'])
+        staff_ids = list(staff.order_by('id').values_list('id', flat=True))
+
+        chunk_size = max(options['chunk_size'], 1)
+        created_count = 0
+
+        for offset in range(0, len(staff_ids), chunk_size):
+            created_count += generate_schedules(
+                staff_ids[offset:offset + chunk_size],
+                start_date,
+                end_date,
+                options['time_slots']
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Schedule horizon {start_date} to {end_date} for {len(staff_ids)} staff members'
+        ))
+        self.stdout.write(self.style.SUCCESS(f'  - Created: {created_count} slots'))
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('staff', '0002_alter_staff_is_available'),
+        ('schedules', '0002_alter_schedule_availability_status_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilityRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('time_slot', models.CharField(help_text='e.g., 10:00-11:00', max_length=50)),
+                ('valid_from', models.DateField(blank=True, help_text='First date the rule applies (optional)', null=True)),
+                ('valid_until', models.DateField(blank=True, help_text='Last date the rule applies (optional)', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('staff', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_rules', to='staff.staff')),
+            ],
+            options={
+                'verbose_name': 'Availability Rule',
+                'verbose_name_plural': 'Availability Rules',
+                'db_table': 'availability_rules',
+                'ordering': ['staff', 'weekday', 'time_slot'],
+                'unique_together': {('staff', 'weekday', 'time_slot')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AvailabilityException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True)),
+                ('time_slot', models.CharField(blank=True, help_text='Leave blank to block the whole day', max_length=50)),
+                ('reason', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('staff', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_exceptions', to='staff.staff')),
+            ],
+            options={
+                'verbose_name': 'Availability Exception',
+                'verbose_name_plural': 'Availability Exceptions',
+                'db_table': 'availability_exceptions',
+                'ordering': ['date', 'time_slot'],
+                'unique_together': {('staff', 'date', 'time_slot')},
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:13
+
+import backend.schedules.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0003_availability_rules'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='schedule',
+            options={'ordering': ['date', 'start_time', 'time_slot'], 'verbose_name': 'Schedule', 'verbose_name_plural': 'Schedules'},
+        ),
+        migrations.AddField(
+            model_name='schedule',
+            name='end_time',
+            field=models.TimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='schedule',
+            name='start_time',
+            field=models.TimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='availabilityrule',
+            name='time_slot',
+            field=models.CharField(help_text='e.g., 10:00-11:00', max_length=50, validators=[backend.schedules.validators.validate_time_slot]),
+        ),
+        migrations.AlterField(
+            model_name='schedule',
+            name='time_slot',
+            field=models.CharField(help_text='e.g., 10:00-11:00', max_length=50, validators=[backend.schedules.validators.validate_time_slot]),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['staff', 'date', 'start_time'], name='schedule_staff_date_start_idx'),
+        ),
+    ]
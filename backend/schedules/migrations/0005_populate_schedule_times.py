@@ -0,0 +1,52 @@
+import re
+from datetime import time
+
+from django.db import migrations
+
+
+TIME_SLOT_PATTERN = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*$')
+
+BATCH_SIZE = 1000
+
+
+def _bounds(time_slot):
+    # Frozen copy of validators.time_slot_bounds so later changes there
+    # do not alter what this migration does
+    match = TIME_SLOT_PATTERN.match(time_slot or '')
+    if not match:
+        return None, None
+    start_hour, start_minute, end_hour, end_minute = (int(part) for part in match.groups())
+    try:
+        start, end = time(start_hour, start_minute), time(end_hour, end_minute)
+    except ValueError:
+        return None, None
+    if end <= start:
+        return None, None
+    return start, end
+
+
+def populate_times(apps, schema_editor):
+    Schedule = apps.get_model('schedules', 'Schedule')
+    
+    batch = []
+    for schedule in Schedule.objects.only('id', 'time_slot').iterator(chunk_size=BATCH_SIZE):
+        schedule.start_time, schedule.end_time = _bounds(schedule.time_slot)
+        if schedule.start_time is not None:
+            batch.append(schedule)
+        if len(batch) >= BATCH_SIZE:
+            Schedule.objects.bulk_update(batch, ['start_time', 'end_time'])
+            batch = []
+    
+    if batch:
+        Schedule.objects.bulk_update(batch, ['start_time', 'end_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0004_schedule_start_end_times'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_times, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0005_populate_schedule_times'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['staff', 'availability_status', 'date', 'start_time'], name='schedule_staff_free_date_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='availabilityexception',
+            index=models.Index(fields=['staff', 'created_at'], name='avail_exc_staff_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='availabilityrule',
+            index=models.Index(fields=['staff', 'updated_at'], name='avail_rule_staff_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['staff', 'updated_at'], name='schedule_staff_updated_idx'),
+        ),
+    ]
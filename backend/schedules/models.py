@@ -1,5 +1,23 @@
 from django.db import models
 from backend.staff.models import Staff
+from .validators import validate_time_slot, time_slot_bounds
+
+
+class ScheduleQuerySet(models.QuerySet):
+    """Time range lookups served by the (staff, date, start_time) index."""
+    
+    def within(self, time_from=None, time_to=None):
+        """Slots that start at or after time_from and end by time_to."""
+        queryset = self
+        if time_from is not None:
+            queryset = queryset.filter(start_time__gte=time_from)
+        if time_to is not None:
+            queryset = queryset.filter(end_time__lte=time_to)
+        return queryset
+    
+    def overlapping(self, start_time, end_time):
+        """Slots that share any part of the [start_time, end_time) interval."""
+        return self.filter(start_time__lt=end_time, end_time__gt=start_time)
 
 
 class Schedule(models.Model):
@@ -9,17 +27,108 @@ class Schedule(models.Model):
     """
     staff = models.ForeignKey(Staff, on_delete=models.CASCADE, related_name='schedules')
     date = models.DateField(db_index=True)
-    time_slot = models.CharField(max_length=50, help_text='e.g., 10:00-11:00')
+    time_slot = models.CharField(max_length=50, validators=[validate_time_slot], help_text='e.g., 10:00-11:00')
+    start_time = models.TimeField(null=True, blank=True, editable=False)
+    end_time = models.TimeField(null=True, blank=True, editable=False)
     availability_status = models.BooleanField(default=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ScheduleQuerySet.as_manager()
+    
     class Meta:
         db_table = 'schedules'
         verbose_name = 'Schedule'
         verbose_name_plural = 'Schedules'
         unique_together = ('staff', 'date', 'time_slot')
-        ordering = ['date', 'time_slot']
+        ordering = ['date', 'start_time', 'time_slot']
+        indexes = [
+            models.Index(fields=['staff', 'date', 'start_time'], name='schedule_staff_date_start_idx'),
+            # Free slots of a staff member over a date range (schedule list, availability index)
+            models.Index(
+                fields=['staff', 'availability_status', 'date', 'start_time'],
+                name='schedule_staff_free_date_idx'
+            ),
+            # Newest change per staff member (availability version without a shared cache)
+            models.Index(fields=['staff', 'updated_at'], name='schedule_staff_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.staff.user.username} - {self.date} {self.time_slot}"
+    
+    def save(self, *args, **kwargs):
+        # start_time/end_time are always derived from the label
+        self.start_time, self.end_time = time_slot_bounds(self.time_slot)
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def for_time_slot(cls, time_slot, **kwargs):
+        """
+        Build an unsaved schedule with its start and end times filled in.
+        Use this for bulk_create(), which bypasses save().
+        """
+        start_time, end_time = time_slot_bounds(time_slot)
+        return cls(time_slot=time_slot, start_time=start_time, end_time=end_time, **kwargs)
+
+
+class AvailabilityRule(models.Model):
+    """
+    Weekly recurring availability of a staff member.
+    Rules are expanded into bookable slots on the fly; a Schedule row is
+    only created once one of their slots is booked or overridden.
+    """
+    WEEKDAY_CHOICES = (
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    )
+    
+    staff = models.ForeignKey(Staff, on_delete=models.CASCADE, related_name='availability_rules')
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    time_slot = models.CharField(max_length=50, validators=[validate_time_slot], help_text='e.g., 10:00-11:00')
+    valid_from = models.DateField(null=True, blank=True, help_text='First date the rule applies (optional)')
+    valid_until = models.DateField(null=True, blank=True, help_text='Last date the rule applies (optional)')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'availability_rules'
+        verbose_name = 'Availability Rule'
+        verbose_name_plural = 'Availability Rules'
+        unique_together = ('staff', 'weekday', 'time_slot')
+        ordering = ['staff', 'weekday', 'time_slot']
+        indexes = [
+            models.Index(fields=['staff', 'updated_at'], name='avail_rule_staff_updated_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.staff.user.username} - {self.get_weekday_display()} {self.time_slot}"
+
+
+class AvailabilityException(models.Model):
+    """
+    A date on which a staff member's recurring availability does not apply,
+    e.g. a holiday or sick day. A blank time slot blocks the whole day.
+    """
+    staff = models.ForeignKey(Staff, on_delete=models.CASCADE, related_name='availability_exceptions')
+    date = models.DateField(db_index=True)
+    time_slot = models.CharField(max_length=50, blank=True, help_text='Leave blank to block the whole day')
+    reason = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'availability_exceptions'
+        verbose_name = 'Availability Exception'
+        verbose_name_plural = 'Availability Exceptions'
+        unique_together = ('staff', 'date', 'time_slot')
+        ordering = ['date', 'time_slot']
+        indexes = [
+            models.Index(fields=['staff', 'created_at'], name='avail_exc_staff_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.staff.user.username} - {self.date} {self.time_slot or 'all day'}"
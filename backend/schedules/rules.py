@@ -0,0 +1,195 @@
+"""
+Expansion of recurring availability rules into bookable slots.
+
+Weekly AvailabilityRule rows, minus AvailabilityException rows, describe
+when a staff member can be booked without storing a Schedule row per slot.
+Slots are expanded lazily for availability queries; materialize_slots()
+creates the Schedule row for a slot only when it is about to be booked.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from backend.appointments.counters import record_total
+
+from .models import Schedule, AvailabilityRule, AvailabilityException
+
+
+SLOT_KEY_SEPARATOR = '|'
+
+
+def rule_horizon():
+    """Return the (start, end) dates over which rules are expanded for listings."""
+    today = timezone.now().date()
+    days = getattr(settings, 'AVAILABILITY_RULE_HORIZON_DAYS', 60)
+    return today, today + timedelta(days=days - 1)
+
+
+def expand_rules(staff_ids, start_date, end_date):
+    """
+    Expand recurring rules into slots, minus exceptions.
+
+    Args:
+        staff_ids: Iterable of Staff primary keys, or None for every staff member
+        start_date: First date to expand (inclusive)
+        end_date: Last date to expand (inclusive)
+
+    Returns:
+        Dict of (staff_id, date, time_slot) -> AvailabilityRule, ordered by
+        date and time slot
+    """
+    if start_date > end_date:
+        return {}
+
+    rules = AvailabilityRule.objects.select_related('staff__user').filter(
+        Q(valid_from__isnull=True) | Q(valid_from__lte=end_date),
+        Q(valid_until__isnull=True) | Q(valid_until__gte=start_date)
+    )
+    exceptions = AvailabilityException.objects.filter(date__range=(start_date, end_date))
+
+    if staff_ids is not None:
+        staff_ids = list(staff_ids)
+        rules = rules.filter(staff_id__in=staff_ids)
+        exceptions = exceptions.filter(staff_id__in=staff_ids)
+
+    rules_by_weekday = {}
+    for rule in rules:
+        rules_by_weekday.setdefault(rule.weekday, []).append(rule)
+
+    if not rules_by_weekday:
+        return {}
+
+    blocked = set(exceptions.values_list('staff_id', 'date', 'time_slot'))
+
+    slots = {}
+    date = start_date
+    while date <= end_date:
+        for rule in rules_by_weekday.get(date.weekday(), ()):
+            if rule.valid_from and date < rule.valid_from:
+                continue
+            if rule.valid_until and date > rule.valid_until:
+                continue
+            if (rule.staff_id, date, '') in blocked or (rule.staff_id, date, rule.time_slot) in blocked:
+                continue
+            slots[(rule.staff_id, date, rule.time_slot)] = rule
+        date += timedelta(days=1)
+
+    return dict(sorted(slots.items(), key=lambda item: (item[0][1], item[0][2])))
+
+
+def virtual_schedules(staff_ids, start_date, end_date):
+    """
+    Return rule-derived slots that have no Schedule row yet.
+
+    Args:
+        staff_ids: Iterable of Staff primary keys, or None for every staff member
+        start_date: First date (inclusive)
+        end_date: Last date (inclusive)
+
+    Returns:
+        List of unsaved Schedule instances (id is None) with staff loaded
+    """
+    expanded = expand_rules(staff_ids, start_date, end_date)
+    if not expanded:
+        return []
+
+    rule_staff_ids = {staff_id for staff_id, _, _ in expanded}
+    materialized = set(
+        Schedule.objects.filter(
+            staff_id__in=rule_staff_ids,
+            date__range=(start_date, end_date)
+        ).values_list('staff_id', 'date', 'time_slot')
+    )
+
+    return [
+        Schedule.for_time_slot(time_slot, staff=rule.staff, date=date, availability_status=True)
+        for (staff_id, date, time_slot), rule in expanded.items()
+        if (staff_id, date, time_slot) not in materialized
+    ]
+
+
+def _fetch_schedules(keys):
+    slot_filter = Q()
+    for staff_id, date, time_slot in keys:
+        slot_filter |= Q(staff_id=staff_id, date=date, time_slot=time_slot)
+
+    return {
+        (schedule.staff_id, schedule.date, schedule.time_slot): schedule
+        for schedule in Schedule.objects.select_related('staff__user').filter(slot_filter)
+    }
+
+
+def materialize_slots(keys):
+    """
+    Return Schedule rows for slots, creating rows for rule-derived slots.
+
+    Args:
+        keys: Iterable of (staff_id, date, time_slot) tuples
+
+    Returns:
+        Dict of key -> Schedule (with staff and user loaded). Keys that are
+        neither stored nor covered by a rule are absent.
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+
+    schedules = _fetch_schedules(keys)
+    missing = keys - schedules.keys()
+
+    if missing:
+        dates = [date for _, date, _ in missing]
+        covered = expand_rules({staff_id for staff_id, _, _ in missing}, min(dates), max(dates))
+        new_keys = [key for key in missing if key in covered]
+
+        if new_keys:
+            Schedule.objects.bulk_create(
+                [
+                    Schedule.for_time_slot(time_slot, staff_id=staff_id, date=date)
+                    for staff_id, date, time_slot in new_keys
+                ],
+                ignore_conflicts=True
+            )
+            created = _fetch_schedules(new_keys)
+            # bulk_create() sends no signals for the dashboard counters
+            record_total('schedules', len(created))
+            schedules.update(created)
+
+    return schedules
+
+
+def slot_key(date, time_slot):
+    """Return the form value identifying a slot that has no Schedule row yet."""
+    return f'{date}{SLOT_KEY_SEPARATOR}{time_slot}'
+
+
+def resolve_schedule(staff_id, value):
+    """
+    Resolve a submitted slot choice to a Schedule row.
+
+    Args:
+        staff_id: Staff primary key the slot belongs to
+        value: A Schedule ID, or a "YYYY-MM-DD|HH:MM-HH:MM" slot key for a
+            rule-derived slot
+
+    Returns:
+        Schedule instance, or None if the slot does not exist
+    """
+    value = (value or '').strip()
+
+    if value.isdigit():
+        return Schedule.objects.filter(id=value).first()
+
+    date, _, time_slot = value.partition(SLOT_KEY_SEPARATOR)
+    try:
+        date = parse_date(date) if date else None
+    except ValueError:
+        date = None
+    if date is None or not time_slot or not str(staff_id).isdigit():
+        return None
+
+    key = (int(staff_id), date, time_slot)
+    return materialize_slots([key]).get(key)
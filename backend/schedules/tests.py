@@ -0,0 +1,345 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+
+from backend.accounts.models import User
+from backend.staff.models import Staff
+
+from .availability import (
+    _bump_generation,
+    availability_index,
+    availability_version,
+    get_available_slots,
+    mark_slot_booked,
+    mark_slot_released
+)
+from .allocation import allocate_runs, fitting_starts
+from .generation import generate_schedules
+from .holds import active_holds, ensure_not_held, hold_slot, release_hold, warn_unless_shared
+from .models import AvailabilityException, AvailabilityRule, Schedule
+from .rules import expand_rules, materialize_slots, virtual_schedules
+from .validators import parse_time_slot, time_slot_bounds
+
+
+class AvailabilityVersionTests(TestCase):
+    """Availability versions read from the database (LocMemCache)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('stylist', password='pw', role='Staff')
+        cls.staff = Staff.objects.create(user=user, specialization='Hair')
+        cls.day = datetime.date.today() + datetime.timedelta(days=1)
+        cls.schedule = Schedule.objects.create(staff=cls.staff, date=cls.day, time_slot='10:00-11:00')
+
+    def setUp(self):
+        cache.clear()
+        availability_index.clear()
+
+    def test_version_is_kept_briefly(self):
+        with self.assertNumQueries(3):
+            version = availability_version(self.staff.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(availability_version(self.staff.id), version)
+
+    def test_own_changes_move_the_version(self):
+        version = availability_version(self.staff.id)
+        all_staff = availability_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule.availability_status = False
+            self.schedule.save()
+            mark_slot_booked(self.schedule)
+        self.assertNotEqual(availability_version(self.staff.id), version)
+        self.assertNotEqual(availability_version(), all_staff)
+
+    def test_slots_reuse_the_callers_version(self):
+        version = availability_version(self.staff.id)
+        get_available_slots(self.staff.id, version=version)
+        cache.clear()
+        with self.assertNumQueries(0):
+            slots = get_available_slots(self.staff.id, version=version)
+        self.assertEqual([slot['time_slot'] for slot in slots], ['10:00-11:00'])
+
+
+class SlotHoldTests(TestCase):
+    """Holds on slots picked during checkout."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.first, cls.second = (User.objects.create_user(name, password='pw') for name in ('first', 'second'))
+        user = User.objects.create_user('stylist', password='pw', role='Staff')
+        cls.staff = Staff.objects.create(user=user, specialization='Hair')
+        cls.day = datetime.date.today() + datetime.timedelta(days=1)
+        cls.schedule = Schedule.objects.create(staff=cls.staff, date=cls.day, time_slot='10:00-11:00')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_held_slots_are_refused_to_others(self):
+        hold_slot(self.first.id, self.staff.id, self.day, '10:00-11:00')
+        self.assertEqual(active_holds([self.staff.id]), {(self.staff.id, str(self.day), '10:00-11:00'): self.first.id})
+        with self.assertRaises(ValidationError):
+            hold_slot(self.second.id, self.staff.id, self.day, '10:00-11:00')
+        with self.assertRaises(ValidationError):
+            ensure_not_held(self.second.id, [self.schedule])
+        ensure_not_held(self.first.id, [self.schedule])
+
+    def test_a_new_hold_replaces_the_previous_one(self):
+        hold_slot(self.first.id, self.staff.id, self.day, '10:00-11:00')
+        hold_slot(self.first.id, self.staff.id, self.day, '11:00-12:00')
+        self.assertEqual(list(active_holds([self.staff.id])), [(self.staff.id, str(self.day), '11:00-12:00')])
+
+    def test_released_and_expired_holds_free_the_slot(self):
+        hold_slot(self.first.id, self.staff.id, self.day, '10:00-11:00')
+        release_hold(self.first.id)
+        self.assertEqual(active_holds([self.staff.id]), {})
+
+        with override_settings(SLOT_HOLD_TTL=-1):
+            hold_slot(self.first.id, self.staff.id, self.day, '10:00-11:00')
+        hold_slot(self.second.id, self.staff.id, self.day, '10:00-11:00')
+
+    @override_settings(DEBUG=False)
+    def test_process_local_cache_is_warned_about(self):
+        with self.assertLogs('salon.holds', 'WARNING'):
+            warn_unless_shared()
+
+    @override_settings(DEBUG=True)
+    def test_no_warning_under_debug(self):
+        with self.assertNoLogs('salon.holds'):
+            warn_unless_shared()
+
+
+@mock.patch('backend.schedules.availability.cache_is_shared', return_value=True)
+class AvailabilityIndexTests(TestCase):
+    """The in-memory index of free slots, as kept with a shared cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('stylist', password='pw', role='Staff')
+        cls.staff = Staff.objects.create(user=user, specialization='Hair')
+        cls.day = datetime.date.today() + datetime.timedelta(days=1)
+        cls.slots = [
+            Schedule.objects.create(staff=cls.staff, date=cls.day, time_slot=f'{hour}:00-{hour + 1}:00')
+            for hour in (9, 10, 11)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        availability_index.clear()
+
+    def time_slots(self, date=None):
+        return [slot['time_slot'] for slot in get_available_slots(self.staff.id, date)]
+
+    def test_reads_after_the_first_skip_the_database(self, shared):
+        self.assertEqual(self.time_slots(), ['9:00-10:00', '10:00-11:00', '11:00-12:00'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.time_slots(self.day.isoformat()), ['9:00-10:00', '10:00-11:00', '11:00-12:00'])
+            self.assertEqual(self.time_slots('2000-01-01'), [])
+
+    def test_claims_and_releases_update_the_entry_in_place(self, shared):
+        self.time_slots()
+        schedule = self.slots[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            Schedule.objects.filter(id=schedule.id).update(availability_status=False)
+            mark_slot_booked(schedule)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.time_slots(), ['9:00-10:00', '11:00-12:00'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Schedule.objects.filter(id=schedule.id).update(availability_status=True)
+            mark_slot_released(schedule)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.time_slots(), ['9:00-10:00', '10:00-11:00', '11:00-12:00'])
+
+    def test_changes_from_other_processes_reload_the_entry(self, shared):
+        self.time_slots()
+        Schedule.objects.filter(id=self.slots[0].id).update(availability_status=False)
+        # Another worker bumped the generation
+        _bump_generation(self.staff.id)
+        self.assertEqual(self.time_slots(), ['10:00-11:00', '11:00-12:00'])
+
+
+class ScheduleGenerationTests(TestCase):
+    """Set-based slot generation and the rolling horizon command."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = [
+            Staff.objects.create(
+                user=User.objects.create_user(f'stylist{index}', password='pw', role='Staff'),
+                specialization='Hair'
+            )
+            for index in range(2)
+        ]
+        cls.today = datetime.date.today()
+
+    def test_creates_every_missing_slot_in_a_few_queries(self):
+        end = self.today + datetime.timedelta(days=2)
+        # One existence check and one INSERT, inside a savepoint
+        with self.assertNumQueries(4):
+            created = generate_schedules([staff.id for staff in self.staff], self.today, end, ['09:00-10:00', '10:00-11:00'])
+        self.assertEqual(created, 12)
+        self.assertEqual(Schedule.objects.count(), 12)
+        self.assertEqual(Schedule.objects.filter(start_time=datetime.time(9)).count(), 6)
+
+    def test_existing_slots_are_skipped(self):
+        Schedule.objects.create(staff=self.staff[0], date=self.today, time_slot='09:00-10:00')
+        created = generate_schedules([self.staff[0].id], self.today, self.today, ['09:00-10:00', '10:00-11:00'])
+        self.assertEqual(created, 1)
+        self.assertEqual(generate_schedules([self.staff[0].id], self.today, self.today, ['09:00-10:00']), 0)
+
+    def test_horizon_command(self):
+        out = StringIO()
+        call_command('extend_schedule_horizon', days=3, time_slots=['09:00-10:00'], stdout=out)
+        self.assertIn('Created: 6 slots', out.getvalue())
+        call_command('extend_schedule_horizon', days=3, time_slots=['09:00-10:00'], stdout=out)
+        self.assertEqual(Schedule.objects.count(), 6)
+
+    def test_horizon_command_validates_time_slots(self):
+        with self.assertRaises(CommandError):
+            call_command('extend_schedule_horizon', time_slots=['nine to ten'], stdout=StringIO())
+
+
+class AvailabilityRuleTests(TestCase):
+    """Weekly rules expanded into slots, minus exceptions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('stylist', password='pw', role='Staff')
+        cls.staff = Staff.objects.create(user=user, specialization='Hair')
+        # A Monday two weeks out, so every date below is in the future
+        today = datetime.date.today()
+        cls.monday = today + datetime.timedelta(days=14 - today.weekday())
+        for time_slot in ('09:00-10:00', '10:00-11:00'):
+            AvailabilityRule.objects.create(staff=cls.staff, weekday=0, time_slot=time_slot)
+        AvailabilityRule.objects.create(
+            staff=cls.staff, weekday=1, time_slot='09:00-10:00', valid_until=cls.monday
+        )
+
+    def setUp(self):
+        cache.clear()
+        availability_index.clear()
+
+    def expand(self, days=14):
+        return list(expand_rules([self.staff.id], self.monday, self.monday + datetime.timedelta(days=days - 1)))
+
+    def test_rules_repeat_weekly_within_their_validity(self):
+        next_monday = self.monday + datetime.timedelta(days=7)
+        self.assertEqual(self.expand(), [
+            (self.staff.id, self.monday, '09:00-10:00'),
+            (self.staff.id, self.monday, '10:00-11:00'),
+            (self.staff.id, next_monday, '09:00-10:00'),
+            (self.staff.id, next_monday, '10:00-11:00'),
+        ])
+
+    def test_exceptions_block_a_slot_or_a_day(self):
+        AvailabilityException.objects.create(staff=self.staff, date=self.monday, time_slot='09:00-10:00')
+        self.assertEqual(self.expand(days=1), [(self.staff.id, self.monday, '10:00-11:00')])
+        AvailabilityException.objects.create(staff=self.staff, date=self.monday)
+        self.assertEqual(self.expand(days=1), [])
+
+    def test_stored_slots_replace_their_rule_slot(self):
+        Schedule.objects.create(staff=self.staff, date=self.monday, time_slot='09:00-10:00', availability_status=False)
+        virtual = virtual_schedules([self.staff.id], self.monday, self.monday)
+        self.assertEqual([(slot.id, slot.time_slot) for slot in virtual], [(None, '10:00-11:00')])
+
+    def test_slots_are_materialized_when_booked(self):
+        key = (self.staff.id, self.monday, '10:00-11:00')
+        missing = (self.staff.id, self.monday, '15:00-16:00')
+        schedules = materialize_slots([key, missing])
+        self.assertEqual(list(schedules), [key])
+        self.assertEqual(Schedule.objects.get().start_time, datetime.time(10))
+        self.assertEqual(materialize_slots([key])[key].id, schedules[key].id)
+
+    def test_rule_slots_are_listed_as_available(self):
+        slots = get_available_slots(self.staff.id, self.monday.isoformat())
+        self.assertEqual([(slot['id'], slot['time_slot']) for slot in slots], [(None, '09:00-10:00'), (None, '10:00-11:00')])
+
+
+class TimeSlotTests(TestCase):
+    """Time slot labels parsed into start and end columns."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('stylist', password='pw', role='Staff')
+        cls.staff = Staff.objects.create(user=user, specialization='Hair')
+        cls.day = datetime.date.today() + datetime.timedelta(days=1)
+        for time_slot in ('9:00-10:00', '10:30-11:30', '13:00-14:00'):
+            Schedule.objects.create(staff=cls.staff, date=cls.day, time_slot=time_slot)
+
+    def test_labels_are_parsed(self):
+        self.assertEqual(parse_time_slot(' 9:30 - 10:15 '), (datetime.time(9, 30), datetime.time(10, 15)))
+        for label in ('10:00', '25:00-26:00', '11:00-10:00', 'ten-eleven'):
+            with self.subTest(label), self.assertRaises(ValidationError):
+                parse_time_slot(label)
+        self.assertEqual(time_slot_bounds('legacy'), (None, None))
+
+    def test_saving_fills_start_and_end(self):
+        schedule = Schedule.objects.get(time_slot='10:30-11:30')
+        self.assertEqual((schedule.start_time, schedule.end_time), (datetime.time(10, 30), datetime.time(11, 30)))
+
+    def test_range_lookups(self):
+        slots = Schedule.objects.filter(staff=self.staff, date=self.day)
+        self.assertEqual(
+            list(slots.within(time_from=datetime.time(10), time_to=datetime.time(14)).values_list('time_slot', flat=True)),
+            ['10:30-11:30', '13:00-14:00']
+        )
+        self.assertEqual(
+            list(slots.overlapping(datetime.time(9, 30), datetime.time(11)).values_list('time_slot', flat=True)),
+            ['9:00-10:00', '10:30-11:30']
+        )
+
+
+class RunAllocationTests(TestCase):
+    """Back-to-back slots for services longer than one slot."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('stylist', password='pw', role='Staff')
+        cls.staff = Staff.objects.create(user=user, specialization='Hair')
+        cls.day = datetime.date.today() + datetime.timedelta(days=1)
+        # 09-10, 10-11, 11-12, then a gap, then 13-14
+        cls.slots = {
+            hour: Schedule.objects.create(staff=cls.staff, date=cls.day, time_slot=f'{hour}:00-{hour + 1}:00')
+            for hour in (9, 10, 11, 13)
+        }
+
+    def setUp(self):
+        cache.clear()
+        availability_index.clear()
+
+    def starts(self, duration):
+        free = Schedule.objects.filter(availability_status=True)
+        return [slot.start_time.hour for slot in fitting_starts(list(free), duration)]
+
+    def test_fitting_starts(self):
+        starts = self.starts
+        self.assertEqual(starts(60), [9, 10, 11, 13])
+        self.assertEqual(starts(120), [9, 10])
+        self.assertEqual(starts(180), [9])
+        self.assertEqual(starts(240), [])
+
+    def test_fitting_starts_on_index_rows(self):
+        rows = get_available_slots(self.staff.id)
+        self.assertEqual([row['time_slot'] for row in fitting_starts(rows, 120)], ['9:00-10:00', '10:00-11:00'])
+
+    def test_runs_cover_the_duration(self):
+        [run] = allocate_runs([(self.slots[9], 150, ())])
+        self.assertEqual(run, [self.slots[9], self.slots[10], self.slots[11]])
+
+    def test_runs_stop_at_gaps_and_booked_slots(self):
+        with self.assertRaises(ValidationError):
+            allocate_runs([(self.slots[11], 120, ())])
+        Schedule.objects.filter(id=self.slots[10].id).update(availability_status=False)
+        with self.assertRaises(ValidationError):
+            allocate_runs([(self.slots[9], 120, ())])
+
+    def test_held_slots_count_as_free(self):
+        Schedule.objects.filter(id=self.slots[10].id).update(availability_status=False)
+        [run] = allocate_runs([(self.slots[9], 120, {self.slots[10].id})])
+        self.assertEqual(run, [self.slots[9], self.slots[10]])
@@ -0,0 +1,60 @@
+"""
+Parsing and validation of "HH:MM-HH:MM" time slot labels.
+"""
+import re
+from datetime import time
+
+from django.core.exceptions import ValidationError
+
+
+TIME_SLOT_PATTERN = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*$')
+
+
+def parse_time_slot(time_slot):
+    """
+    Split a time slot label into its start and end times.
+    
+    Args:
+        time_slot: Label such as "10:00-11:00"
+        
+    Returns:
+        Tuple of (start, end) datetime.time values
+        
+    Raises:
+        ValidationError: If the label is malformed or does not end after it starts
+    """
+    match = TIME_SLOT_PATTERN.match(time_slot or '')
+    if not match:
+        raise ValidationError('Time slot must look like HH:MM-HH:MM.')
+    
+    start_hour, start_minute, end_hour, end_minute = (int(part) for part in match.groups())
+    try:
+        start = time(start_hour, start_minute)
+        end = time(end_hour, end_minute)
+    except ValueError:
+        raise ValidationError('Time slot contains an invalid time.')
+    
+    if end <= start:
+        raise ValidationError('Time slot must end after it starts.')
+    
+    return start, end
+
+
+def validate_time_slot(time_slot):
+    """
+    Field validator for time slot labels.
+    
+    Raises:
+        ValidationError: If the label cannot be parsed
+    """
+    parse_time_slot(time_slot)
+
+
+def time_slot_bounds(time_slot):
+    """
+    Return (start, end) times of a label, or (None, None) if it cannot be parsed.
+    """
+    try:
+        return parse_time_slot(time_slot)
+    except ValidationError:
+        return None, None
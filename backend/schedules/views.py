@@ -1,9 +1,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime
 from .models import Schedule
+from .availability import invalidate_staff_availability
+from .generation import DEFAULT_TIME_SLOTS, generate_schedules
+from .validators import parse_time_slot
 from backend.staff.models import Staff
 from backend.accounts.decorators import admin_required
 
@@ -44,9 +48,15 @@ def schedule_create(request):
         
         staff = get_object_or_404(Staff, id=staff_id)
         
-        # Check if schedule already exists
-        if Schedule.objects.filter(staff=staff, date=date, time_slot=time_slot).exists():
-            messages.error(request, 'This schedule already exists.')
+        try:
+            start_time, end_time = parse_time_slot(time_slot)
+        except ValidationError as e:
+            messages.error(request, e.messages[0])
+            return redirect('schedule_create')
+        
+        # Check if the slot already exists or overlaps another one
+        if Schedule.objects.filter(staff=staff, date=date).overlapping(start_time, end_time).exists():
+            messages.error(request, 'This schedule overlaps an existing one.')
             return redirect('schedule_create')
         
         Schedule.objects.create(
@@ -54,23 +64,16 @@ def schedule_create(request):
             date=date,
             time_slot=time_slot
         )
+        invalidate_staff_availability(staff.id)
         
         messages.success(request, 'Schedule created successfully!')
         return redirect('schedule_list')
     
     staff_members = Staff.objects.filter(is_available=True)
     
-    # Generate time slots (9 AM to 6 PM, 1-hour intervals)
-    time_slots = []
-    start_hour = 9
-    end_hour = 18
-    for hour in range(start_hour, end_hour):
-        time_slot = f"{hour:02d}:00-{hour+1:02d}:00"
-        time_slots.append(time_slot)
-    
     return render(request, 'schedule_form.html', {
         'staff_members': staff_members,
-        'time_slots': time_slots
+        'time_slots': DEFAULT_TIME_SLOTS
     })
 
 
@@ -89,40 +92,17 @@ def schedule_bulk_create(request):
         start = datetime.strptime(start_date, '%Y-%m-%d').date()
         end = datetime.strptime(end_date, '%Y-%m-%d').date()
         
-        # Generate schedules for the date range
-        current_date = start
-        created_count = 0
-        
-        while current_date <= end:
-            for time_slot in time_slots:
-                if not Schedule.objects.filter(
-                    staff=staff,
-                    date=current_date,
-                    time_slot=time_slot
-                ).exists():
-                    Schedule.objects.create(
-                        staff=staff,
-                        date=current_date,
-                        time_slot=time_slot
-                    )
-                    created_count += 1
-            
-            current_date += timedelta(days=1)
+        # Generate schedules for the date range, skipping existing slots
+        created_count = generate_schedules([staff.id], start, end, time_slots)
         
         messages.success(request, f'{created_count} schedules created successfully!')
         return redirect('schedule_list')
     
     staff_members = Staff.objects.filter(is_available=True)
     
-    # Generate time slots
-    time_slots = []
-    for hour in range(9, 18):
-        time_slot = f"{hour:02d}:00-{hour+1:02d}:00"
-        time_slots.append(time_slot)
-    
     return render(request, 'schedule_bulk_form.html', {
         'staff_members': staff_members,
-        'time_slots': time_slots
+        'time_slots': DEFAULT_TIME_SLOTS
     })
 
 
@@ -136,6 +116,8 @@ def schedule_delete(request, schedule_id):
         messages.error(request, 'Cannot delete a schedule with existing appointments.')
         return redirect('schedule_list')
     
+    staff_id = schedule.staff_id
     schedule.delete()
+    invalidate_staff_availability(staff_id)
     messages.success(request, 'Schedule deleted successfully!')
     return redirect('schedule_list')
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Service
+from .catalog import bump_catalog_version
 
 
 @admin.register(Service)
@@ -8,3 +9,15 @@ class ServiceAdmin(admin.ModelAdmin):
     list_filter = ('is_active', 'created_at')
     search_fields = ('name', 'description')
     ordering = ('name',)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_catalog_version()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_catalog_version()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bump_catalog_version()
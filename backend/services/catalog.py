@@ -0,0 +1,166 @@
+"""
+Versioned cache of the service catalog.
+
+Every catalog entry is cached under a key that embeds a version stamp. Any
+write to a service bumps the stamp, which orphans all previously cached
+entries at once, so between edits catalog reads cost a cache lookup and no
+database queries. The a-prefixed functions are the same reads for async
+views, using the async cache and ORM APIs.
+
+A bump only reaches other worker processes through a shared cache. With a
+process-local cache (the LocMemCache default) the version is instead
+derived from the services table, the newest updated_at and the row count,
+and kept for LOCAL_VERSION_TTL seconds, so an edit made through another
+worker shows up within that time instead of after the cache timeout.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import Http404
+
+from backend.caching import cache_is_shared
+from .models import Service
+
+
+VERSION_KEY = 'services:catalog:version'
+LOCAL_VERSION_KEY = 'services:catalog:local-version'
+
+# Seconds a worker without a shared cache reuses the version it read from
+# the database
+LOCAL_VERSION_TTL = 2
+
+
+def _timeout():
+    return getattr(settings, 'SERVICE_CATALOG_CACHE_TIMEOUT', 3600)
+
+
+def _database_version(stats):
+    newest = stats['newest']
+    return f"db-{stats['count']}-{int(newest.timestamp() * 1000000) if newest else 0}"
+
+
+def get_catalog_version():
+    """
+    Return the current catalog version stamp.
+
+    A missing stamp (cold or evicted cache) is re-seeded from the clock so
+    it can never collide with a stamp used before. Without a shared cache
+    the stamp is read from the services table instead.
+    """
+    if not cache_is_shared():
+        version = cache.get(LOCAL_VERSION_KEY)
+        if version is None:
+            version = _database_version(Service.objects.aggregate(count=Count('id'), newest=Max('updated_at')))
+            cache.set(LOCAL_VERSION_KEY, version, LOCAL_VERSION_TTL)
+        return version
+
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def aget_catalog_version():
+    """Async version of get_catalog_version()."""
+    if not cache_is_shared():
+        version = await cache.aget(LOCAL_VERSION_KEY)
+        if version is None:
+            version = _database_version(
+                await Service.objects.aaggregate(count=Count('id'), newest=Max('updated_at'))
+            )
+            await cache.aset(LOCAL_VERSION_KEY, version, LOCAL_VERSION_TTL)
+        return version
+
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, int(time.time() * 1000), None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog entry, once the current transaction commits."""
+    transaction.on_commit(_bump)
+
+
+def _bump():
+    if not cache_is_shared():
+        # Other workers notice the edit in the table within LOCAL_VERSION_TTL
+        cache.delete(LOCAL_VERSION_KEY)
+        return
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        get_catalog_version()
+        cache.incr(VERSION_KEY)
+
+
+def _key(version, name):
+    return f'services:catalog:{version}:{name}'
+
+
+def get_active_services():
+    """
+    Return all active services in catalog order.
+
+    Returns:
+        List of Service instances
+    """
+    key = _key(get_catalog_version(), 'active')
+    services = cache.get(key)
+    if services is None:
+        services = list(Service.objects.filter(is_active=True))
+        cache.set(key, services, _timeout())
+    return services
+
+
+async def aget_active_services():
+    """Async version of get_active_services()."""
+    key = _key(await aget_catalog_version(), 'active')
+    services = await cache.aget(key)
+    if services is None:
+        services = [service async for service in Service.objects.filter(is_active=True)]
+        await cache.aset(key, services, _timeout())
+    return services
+
+
+def get_service(service_id):
+    """
+    Return a single service (active or not) by primary key.
+
+    Args:
+        service_id: Service primary key
+
+    Returns:
+        Service instance, or None if it does not exist
+    """
+    key = _key(get_catalog_version(), f'service:{service_id}')
+    service = cache.get(key)
+    if service is None:
+        service = Service.objects.filter(id=service_id).first()
+        if service is not None:
+            cache.set(key, service, _timeout())
+    return service
+
+
+async def aget_service(service_id):
+    """Async version of get_service()."""
+    key = _key(await aget_catalog_version(), f'service:{service_id}')
+    service = await cache.aget(key)
+    if service is None:
+        service = await Service.objects.filter(id=service_id).afirst()
+        if service is not None:
+            await cache.aset(key, service, _timeout())
+    return service
+
+
+def get_service_or_404(service_id):
+    """Like get_service(), but raise Http404 when the service does not exist."""
+    service = get_service(service_id)
+    if service is None:
+        raise Http404('No Service matches the given query.')
+    return service
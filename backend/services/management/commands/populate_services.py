@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from backend.services.models import Service
+from backend.services.catalog import bump_catalog_version
 
 
 class Command(BaseCommand):
@@ -144,6 +145,8 @@ class Command(BaseCommand):
                 updated_count += 1
                 self.stdout.write(self.style.WARNING(f'↻ Updated: {service.name}'))
 
+        bump_catalog_version()
+
         self.stdout.write(self.style.SUCCESS(f'\n✓ Successfully processed {created_count + updated_count} services'))
         self.stdout.write(self.style.SUCCESS(f'  - Created: {created_count}'))
         self.stdout.write(self.style.SUCCESS(f'  - Updated: {updated_count}'))
@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase
+
+from .catalog import (
+    LOCAL_VERSION_KEY,
+    bump_catalog_version,
+    get_active_services,
+    get_catalog_version,
+    get_service,
+    get_service_or_404
+)
+from .models import Service
+
+
+class CatalogCacheTests(TestCase):
+    """The version-stamped service catalog cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cut = Service.objects.create(name='Cut', price=30, duration=60)
+        cls.retired = Service.objects.create(name='Perm', price=90, duration=120, is_active=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_repeat_reads_are_served_from_the_cache(self):
+        self.assertEqual(get_active_services(), [self.cut])
+        self.assertEqual(get_service(self.retired.id), self.retired)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_active_services(), [self.cut])
+            self.assertEqual(get_service(self.retired.id), self.retired)
+
+    def test_missing_services(self):
+        self.assertIsNone(get_service(0))
+        with self.assertRaises(Http404):
+            get_service_or_404(0)
+
+    def test_own_edits_bump_the_version(self):
+        get_active_services()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.retired.is_active = True
+            self.retired.save()
+            bump_catalog_version()
+        self.assertEqual(get_active_services(), [self.cut, self.retired])
+
+    def test_edits_from_other_workers_show_up_after_the_local_version_expires(self):
+        version = get_catalog_version()
+        Service.objects.create(name='Shave', price=15, duration=30)
+        self.assertEqual(get_catalog_version(), version)
+        cache.delete(LOCAL_VERSION_KEY)
+        self.assertNotEqual(get_catalog_version(), version)
+
+    @mock.patch('backend.services.catalog.cache_is_shared', return_value=True)
+    def test_shared_cache_versions_are_bumped(self, shared):
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_catalog_version()
+        self.assertEqual(get_catalog_version(), version + 1)
@@ -3,19 +3,20 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.exceptions import ValidationError
 from .models import Service
+from .catalog import bump_catalog_version, get_active_services, get_service_or_404
 from backend.accounts.decorators import admin_required
 from backend.appointments.validators import validate_price, validate_duration
 
 
 def service_list(request):
     """Display all active services."""
-    services = Service.objects.filter(is_active=True)
+    services = get_active_services()
     return render(request, 'services.html', {'services': services})
 
 
 def service_detail(request, service_id):
     """Display service details."""
-    service = get_object_or_404(Service, id=service_id)
+    service = get_service_or_404(service_id)
     return render(request, 'service_detail.html', {'service': service})
 
 
@@ -40,6 +41,7 @@ def service_create(request):
                 price=price,
                 duration=duration
             )
+            bump_catalog_version()
             
             messages.success(request, 'Service created successfully!')
             return redirect('service_list')
@@ -71,6 +73,7 @@ def service_update(request, service_id):
             service.duration = duration
             service.is_active = request.POST.get('is_active') == 'on'
             service.save()
+            bump_catalog_version()
             
             messages.success(request, 'Service updated successfully!')
             return redirect('service_list')
@@ -89,6 +92,7 @@ def service_delete(request, service_id):
     service = get_object_or_404(Service, id=service_id)
     service.is_active = False
     service.save()
+    bump_catalog_version()
     
     messages.success(request, 'Service deleted successfully!')
     return redirect('service_list')
@@ -1,5 +1,7 @@
 from django.contrib import admin
 from .models import Staff, StaffService
+from backend.schedules.availability import invalidate_staff_availability
+from backend.appointments.dashboards import invalidate_staff_profile
 
 
 @admin.register(Staff)
@@ -8,6 +10,22 @@ class StaffAdmin(admin.ModelAdmin):
     list_filter = ('is_available', 'created_at')
     search_fields = ('user__username', 'user__email', 'specialization')
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Cached availability and dashboards embed the staff member's details
+        invalidate_staff_availability(obj.id)
+        invalidate_staff_profile(obj.user_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_staff_profile(obj.user_id)
+
+    def delete_queryset(self, request, queryset):
+        user_ids = list(queryset.values_list('user_id', flat=True))
+        super().delete_queryset(request, queryset)
+        for user_id in user_ids:
+            invalidate_staff_profile(user_id)
+
 
 @admin.register(StaffService)
 class StaffServiceAdmin(admin.ModelAdmin):
@@ -3,19 +3,23 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from .models import Staff, StaffService
 from backend.services.models import Service
+from backend.services.catalog import get_active_services
 from backend.accounts.decorators import admin_required
 
 
 def staff_list(request):
     """Display all available staff members."""
-    staff_members = Staff.objects.filter(is_available=True)
+    # The template lists each member's services
+    staff_members = Staff.objects.filter(is_available=True).select_related('user').prefetch_related(
+        'staff_services__service'
+    )
     return render(request, 'staff_list.html', {'staff_members': staff_members})
 
 
 def staff_detail(request, staff_id):
     """Display staff member details and their services."""
-    staff = get_object_or_404(Staff, id=staff_id)
-    services = staff.staff_services.all()
+    staff = get_object_or_404(Staff.objects.select_related('user'), id=staff_id)
+    services = staff.staff_services.select_related('service')
     return render(request, 'staff_detail.html', {
         'staff': staff,
         'services': services
@@ -68,7 +72,7 @@ def assign_service(request, staff_id):
         messages.success(request, 'Service assigned successfully!')
         return redirect('staff_detail', staff_id=staff_id)
     
-    services = Service.objects.filter(is_active=True)
+    services = get_active_services()
     assigned_services = staff.staff_services.values_list('service_id', flat=True)
     
     return render(request, 'assign_service.html', {
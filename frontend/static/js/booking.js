@@ -15,6 +15,100 @@ document.addEventListener('DOMContentLoaded', function() {
         schedule: null
     };
     
+    // Staff and free start times for the selected service, loaded in one request
+    let bootstrap = null;
+    
+    async function loadBootstrap(serviceId) {
+        const response = await fetch(`/api/booking/bootstrap/?service_id=${serviceId}`);
+        
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        
+        return response.json();
+    }
+    
+    // Hold the picked time for a couple of minutes so nobody else can book it
+    // while this customer checks out. The hold is renewed while the time stays
+    // selected, and runs out on its own once the page is left.
+    let heldSlot = null;
+    let renewTimer = null;
+    
+    function csrfToken() {
+        const input = document.querySelector('[name=csrfmiddlewaretoken]');
+        return input ? input.value : '';
+    }
+    
+    async function holdSlot(staffId, date, timeSlot) {
+        clearTimeout(renewTimer);
+        const response = await fetch('/api/schedules/hold/', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'X-CSRFToken': csrfToken() },
+            body: JSON.stringify({ staff_id: staffId, date: date, time_slot: timeSlot })
+        });
+        
+        if (response.status === 409) {
+            return false;
+        }
+        if (response.ok) {
+            const hold = await response.json();
+            heldSlot = { staffId, date, timeSlot };
+            // Renewed halfway through, well before it runs out
+            renewTimer = setTimeout(renewHold, hold.expires_in * 500);
+        }
+        // Other failures leave it to the booking request to check the slot
+        return true;
+    }
+    
+    async function renewHold() {
+        if (!heldSlot) {
+            return;
+        }
+        const option = scheduleSelect.options[scheduleSelect.selectedIndex];
+        let available = true;
+        try {
+            available = await holdSlot(heldSlot.staffId, heldSlot.date, heldSlot.timeSlot);
+        } catch (error) {
+            console.error('Error renewing hold:', error);
+            renewTimer = setTimeout(renewHold, 5000);
+            return;
+        }
+        if (!available) {
+            dropHeldOption(option);
+        }
+    }
+    
+    // Someone else is checking out with this time
+    function dropHeldOption(option) {
+        if (!option || !option.isConnected) {
+            return;
+        }
+        const wasSelected = option.selected;
+        option.remove();
+        if (wasSelected) {
+            scheduleSelect.value = '';
+            scheduleSelect.dispatchEvent(new Event('change'));
+        }
+        
+        const heldMsg = document.createElement('div');
+        heldMsg.className = 'alert alert-warning mt-2';
+        heldMsg.innerHTML = '<i class="fas fa-user-clock"></i> Another customer is booking this time right now. Please choose another time.';
+        scheduleSelect.parentElement.appendChild(heldMsg);
+        setTimeout(() => heldMsg.remove(), 7000);
+    }
+    
+    function releaseHold() {
+        clearTimeout(renewTimer);
+        if (!heldSlot) {
+            return;
+        }
+        heldSlot = null;
+        fetch('/api/schedules/hold/', {
+            method: 'DELETE',
+            headers: { 'X-CSRFToken': csrfToken() }
+        }).catch(error => console.error('Error releasing hold:', error));
+    }
+    
     // Check if service ID is passed in URL and auto-select it
     function getURLParameter(name) {
         const urlParams = new URLSearchParams(window.location.search);
@@ -40,6 +134,7 @@ document.addEventListener('DOMContentLoaded', function() {
     if (serviceSelect) {
         serviceSelect.addEventListener('change', async function() {
             const serviceId = this.value;
+            releaseHold();
             
             if (!serviceId) {
                 staffSelect.innerHTML = '<option value="">Select staff</option>';
@@ -70,15 +165,10 @@ document.addEventListener('DOMContentLoaded', function() {
             staffLoader.style.display = 'block';
             staffSelect.style.display = 'none';
             
-            // Load staff for selected service
+            // Load staff and their free times for the selected service
             try {
-                const response = await fetch(`/api/staff/?service_id=${serviceId}`);
-                
-                if (!response.ok) {
-                    throw new Error(`HTTP error! status: ${response.status}`);
-                }
-                
-                const staff = await response.json();
+                bootstrap = await loadBootstrap(serviceId);
+                const staff = bootstrap.staff;
                 
                 staffSelect.innerHTML = '<option value="">Select a staff member...</option>';
                 
@@ -97,8 +187,8 @@ document.addEventListener('DOMContentLoaded', function() {
                         const option = document.createElement('option');
                         option.value = member.id;
                         option.dataset.specialization = member.specialization;
-                        option.dataset.name = member.user.first_name || member.user.username;
-                        option.textContent = `${member.user.first_name || member.user.username} - ${member.specialization}`;
+                        option.dataset.name = member.name;
+                        option.textContent = `${member.name} - ${member.specialization}`;
                         staffSelect.appendChild(option);
                     });
                     staffSelect.disabled = false;
@@ -121,15 +211,73 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
+    // Live availability: drop slots other customers book while this page is open
+    let availabilityStream = null;
+    let watchedStaffId = null;
+    
+    function watchAvailability(staffId) {
+        if (availabilityStream) {
+            availabilityStream.close();
+            availabilityStream = null;
+        }
+        watchedStaffId = staffId;
+        if (!staffId || !window.EventSource) {
+            return;
+        }
+        
+        availabilityStream = new EventSource(`/api/schedules/stream/?staff_id=${staffId}`);
+        
+        availabilityStream.addEventListener('claimed', function(event) {
+            const slot = JSON.parse(event.data);
+            const option = Array.from(scheduleSelect.options).find(
+                opt => opt.dataset.date === slot.date && opt.dataset.time === slot.time_slot
+            );
+            if (!option) {
+                return;
+            }
+            
+            if (option.selected) {
+                scheduleSelect.value = '';
+                scheduleSelect.dispatchEvent(new Event('change'));
+                
+                const takenMsg = document.createElement('div');
+                takenMsg.className = 'alert alert-warning mt-2';
+                takenMsg.innerHTML = '<i class="fas fa-user-clock"></i> The time you picked was just booked by someone else. Please choose another time.';
+                scheduleSelect.parentElement.appendChild(takenMsg);
+                setTimeout(() => takenMsg.remove(), 7000);
+            }
+            option.remove();
+        });
+        
+        // Freed slots can change which start times fit, so reload the list
+        // unless the customer has already picked a time
+        async function reloadIfUnpicked() {
+            if (scheduleSelect.value || staffSelect.value !== staffId || !selectedData.service) {
+                return;
+            }
+            try {
+                bootstrap = await loadBootstrap(selectedData.service.id);
+            } catch (error) {
+                console.error('Error refreshing availability:', error);
+                return;
+            }
+            staffSelect.dispatchEvent(new Event('change'));
+        }
+        availabilityStream.addEventListener('released', reloadIfUnpicked);
+        availabilityStream.addEventListener('refresh', reloadIfUnpicked);
+    }
+    
     // Load schedules when staff is selected
     if (staffSelect) {
         staffSelect.addEventListener('change', async function() {
             const staffId = this.value;
+            releaseHold();
             
             if (!staffId) {
                 scheduleSelect.innerHTML = '<option value="">Select date & time</option>';
                 scheduleSelect.disabled = true;
                 selectedData.staff = null;
+                watchAvailability(null);
                 updateSummary();
                 updateSteps(2);
                 submitBtn.disabled = true;
@@ -151,15 +299,11 @@ document.addEventListener('DOMContentLoaded', function() {
             scheduleLoader.style.display = 'block';
             scheduleSelect.style.display = 'none';
             
-            // Load available schedules
+            // Start times with enough back-to-back free time for the service,
+            // already loaded along with the staff list
             try {
-                const response = await fetch(`/api/schedules/?staff_id=${staffId}`);
-                
-                if (!response.ok) {
-                    throw new Error(`HTTP error! status: ${response.status}`);
-                }
-                
-                const schedules = await response.json();
+                const rows = (bootstrap && bootstrap.slots[staffId]) || [];
+                const schedules = rows.map(([id, date, time_slot]) => ({ id, date, time_slot }));
                 
                 scheduleSelect.innerHTML = '<option value="">Select your preferred time...</option>';
                 
@@ -176,7 +320,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 } else {
                     schedules.forEach(schedule => {
                         const option = document.createElement('option');
-                        option.value = schedule.id;
+                        option.value = schedule.id ?? `${schedule.date}|${schedule.time_slot}`;
                         option.dataset.date = schedule.date;
                         option.dataset.time = schedule.time_slot;
                         
@@ -192,6 +336,9 @@ document.addEventListener('DOMContentLoaded', function() {
                         scheduleSelect.appendChild(option);
                     });
                     scheduleSelect.disabled = false;
+                    if (watchedStaffId !== staffId) {
+                        watchAvailability(staffId);
+                    }
                 }
             } catch (error) {
                 console.error('Error loading schedules:', error);
@@ -213,10 +360,11 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Update when schedule is selected
     if (scheduleSelect) {
-        scheduleSelect.addEventListener('change', function() {
+        scheduleSelect.addEventListener('change', async function() {
             const scheduleId = this.value;
             
             if (!scheduleId) {
+                releaseHold();
                 selectedData.schedule = null;
                 updateSteps(3);
                 submitBtn.disabled = true;
@@ -234,6 +382,18 @@ document.addEventListener('DOMContentLoaded', function() {
             updateSteps(4);
             submitBtn.disabled = false;
             updateSummary();
+            
+            let available = true;
+            try {
+                available = await holdSlot(staffSelect.value, selectedOption.dataset.date, selectedOption.dataset.time);
+            } catch (error) {
+                console.error('Error holding time slot:', error);
+            }
+            
+            // The customer may have picked another time in the meantime
+            if (!available) {
+                dropHeldOption(selectedOption);
+            }
         });
     }
     
@@ -0,0 +1,24 @@
+"""
+Gunicorn settings picked up automatically from the project root.
+
+When PROMETHEUS_MULTIPROC_DIR is set, every worker writes its metrics to
+files in that directory and /metrics aggregates them (backend/api/metrics.py).
+The hooks below keep the directory in step with the worker processes.
+"""
+import os
+from pathlib import Path
+
+
+def on_starting(server):
+    # Samples left by a previous run would be added to this one's
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        for path in Path(directory).glob('*.db'):
+            path.unlink()
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -2,6 +2,14 @@
 ASGI config for salon_booking_system project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server so long-lived responses such as the availability
+stream do not each hold a worker, e.g.:
+
+    gunicorn salon_booking_system.asgi:application -k uvicorn.workers.UvicornWorker
+
+Served this way, the public read endpoints switch to their async views
+(API_ASYNC_VIEWS), so slow clients and cache or database waits do not pin
+a thread each.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
@@ -12,5 +20,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'salon_booking_system.settings')
+os.environ.setdefault('API_ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
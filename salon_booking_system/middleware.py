@@ -0,0 +1,246 @@
+"""
+Per-request SQL instrumentation and request metrics.
+
+On a sampled share of requests, a database execute wrapper counts
+queries, times them and groups them by fingerprint (the SQL with its
+placeholders, IN lists collapsed). The totals go out in a log line and
+in Server-Timing / X-SQL-Queries response headers, and a fingerprint that
+repeats within one request (the signature of an N+1 loop) is logged as a
+warning naming the view.
+
+Outside sampled requests the wrapper costs one context variable lookup
+per query, and sampled ones add a clock read and a dict update, so it can
+stay enabled in production with a low SQL_INSTRUMENTATION_SAMPLE_RATE.
+
+MetricsMiddleware feeds the request latency and throughput metrics of
+backend.api.metrics on every request.
+
+WhiteNoiseMiddleware is WhiteNoise's static file middleware made async
+capable, so under ASGI requests that are not for static files reach the
+async views without a hop through a worker thread.
+"""
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from backend.api.metrics import REQUEST_LATENCY, REQUESTS
+
+
+logger = logging.getLogger('salon.sql')
+
+IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+
+
+def fingerprint(sql):
+    """
+    Reduce a query to its shape, so the same query with different values matches.
+
+    Args:
+        sql: SQL as passed to the cursor, with %s placeholders
+
+    Returns:
+        Fingerprint string
+    """
+    return IN_LIST.sub('(%s, ...)', sql)
+
+
+class QueryRecorder:
+    """Queries of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = {}
+
+    def add(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        key = fingerprint(sql)
+        self.fingerprints[key] = self.fingerprints.get(key, 0) + 1
+
+    def repeated(self, threshold):
+        """Return (fingerprint, count) pairs run at least threshold times, most first."""
+        return sorted(
+            ((sql, count) for sql, count in self.fingerprints.items() if count >= threshold),
+            key=lambda item: -item[1]
+        )
+
+
+# Recorder of the request being handled; context variables follow the
+# request into the threads sync views run on under ASGI
+_recorder = ContextVar('sql_recorder', default=None)
+
+
+def _record(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.add(sql, time.perf_counter() - started)
+
+
+def _install(connection, **kwargs):
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record query count, SQL time and repeated queries of sampled requests.
+
+    Queries run while a streaming response is being consumed fall outside
+    the request and are not counted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'SQL_INSTRUMENTATION_SAMPLE_RATE', 0.0)
+        self.threshold = getattr(settings, 'SQL_N_PLUS_ONE_THRESHOLD', 5)
+        self.headers = getattr(settings, 'SQL_INSTRUMENTATION_HEADERS', settings.DEBUG)
+
+        if self.sample_rate > 0:
+            # Every connection gets the wrapper once, which is a no-op
+            # outside sampled requests
+            connection_created.connect(_install, dispatch_uid='sql_instrumentation')
+            for connection in connections.all():
+                _install(connection)
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not self._sampled():
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+
+        self._report(request, response, recorder)
+        return response
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+
+        self._report(request, response, recorder)
+        return response
+
+    def _report(self, request, response, recorder):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else request.path
+        repeated = recorder.repeated(self.threshold)
+        sql_ms = recorder.duration * 1000
+
+        logger.info(
+            'sql view=%s method=%s status=%s queries=%d sql_ms=%.1f repeated=%d',
+            view, request.method, response.status_code, recorder.count, sql_ms, len(repeated)
+        )
+        for sql, count in repeated:
+            logger.warning('Possible N+1 in %s: %d x %s', view, count, sql[:300])
+
+        if self.headers:
+            response['X-SQL-Queries'] = str(recorder.count)
+            timing = f'sql;dur={sql_ms:.1f};desc="{recorder.count} queries"'
+            if response.has_header('Server-Timing'):
+                timing = f"{response['Server-Timing']}, {timing}"
+            response['Server-Timing'] = timing
+            if repeated:
+                response['X-SQL-Repeated'] = ', '.join(f'{count}x' for _, count in repeated)
+
+
+class MetricsMiddleware:
+    """
+    Time every request and count it by URL route, method and status.
+
+    Routes are URL patterns ("api/appointments/<int:appointment_id>/"),
+    not paths, so label values stay few. Streaming responses are timed up
+    to their headers.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, time.perf_counter() - started)
+        return response
+
+    def _observe(self, request, response, duration):
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else '<unmatched>'
+        REQUEST_LATENCY.labels(route=route, method=request.method).observe(duration)
+        REQUESTS.labels(route=route, method=request.method, status=str(response.status_code)).inc()
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """WhiteNoise static file serving that also runs in async middleware chains."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            # Looks on disk, so off the event loop
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
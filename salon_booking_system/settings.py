@@ -35,11 +35,15 @@ INSTALLED_APPS = [
     'backend.appointments',
     'backend.schedules',
     'backend.api',
+    'backend.jobs',
 ]
 
 MIDDLEWARE = [
+    # First, so time and queries spent in the other middleware are counted too
+    'salon_booking_system.middleware.MetricsMiddleware',
+    'salon_booking_system.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'salon_booking_system.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -87,6 +91,16 @@ else:
         }
     }
 
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# cache (e.g. Redis or Memcached) when running several worker processes.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -155,3 +169,128 @@ LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/accounts/login/'
 
+# Availability index
+# Seconds a worker keeps a staff member's free slots in memory before reloading.
+# Changes reach other workers through the shared cache; with the local memory
+# default every read checks the schedule tables for changes instead.
+AVAILABILITY_INDEX_TTL = int(os.getenv('AVAILABILITY_INDEX_TTL', '300'))
+
+# Days ahead that recurring availability rules are expanded into bookable slots
+AVAILABILITY_RULE_HORIZON_DAYS = int(os.getenv('AVAILABILITY_RULE_HORIZON_DAYS', '60'))
+
+# Availability stream (/api/schedules/stream/); serve it through asgi.py
+# Seconds slot change events are kept for clients to pick up
+AVAILABILITY_EVENT_TTL = int(os.getenv('AVAILABILITY_EVENT_TTL', '300'))
+# Seconds between checks for new events on each open stream
+AVAILABILITY_STREAM_POLL_INTERVAL = float(os.getenv('AVAILABILITY_STREAM_POLL_INTERVAL', '1.0'))
+# Seconds before a stream is closed; browsers reconnect and resume
+AVAILABILITY_STREAM_MAX_AGE = int(os.getenv('AVAILABILITY_STREAM_MAX_AGE', '300'))
+
+# Slot holds (/api/schedules/hold/, backend/schedules/holds.py)
+# Seconds a time picked on the booking page stays reserved for that customer.
+# Holds live in the cache, so with several worker processes they need a shared
+# CACHE_BACKEND; with DEBUG off a process-local cache is warned about at startup
+SLOT_HOLD_TTL = int(os.getenv('SLOT_HOLD_TTL', '120'))
+
+# Serve the public read endpoints from async views (backend/api/async_views.py).
+# asgi.py turns this on; leave it off under WSGI servers.
+API_ASYNC_VIEWS = os.getenv('API_ASYNC_VIEWS', 'False') == 'True'
+
+# Service catalog cache
+# Entries are invalidated by a version bump on every service edit; the
+# timeout only bounds how long orphaned entries linger in the cache. The bump
+# needs a shared cache to reach other workers; with the local memory default
+# each worker re-reads the catalog version from the database every 2 seconds.
+SERVICE_CATALOG_CACHE_TIMEOUT = int(os.getenv('SERVICE_CATALOG_CACHE_TIMEOUT', '3600'))
+
+# Staff and customer dashboards
+# Cached data is invalidated by the member's appointment and slot changes;
+# the timeout bounds staleness of details that are not tracked (names).
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '600'))
+
+# SQL instrumentation (salon_booking_system/middleware.py)
+# Share of requests whose queries are counted, timed and checked for N+1 loops
+SQL_INSTRUMENTATION_SAMPLE_RATE = float(os.getenv('SQL_INSTRUMENTATION_SAMPLE_RATE', '1.0' if DEBUG else '0.01'))
+# Times one query shape may repeat in a request before it is logged as a possible N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', '5'))
+# Expose query counts to clients in X-SQL-Queries / Server-Timing headers
+SQL_INSTRUMENTATION_HEADERS = os.getenv('SQL_INSTRUMENTATION_HEADERS', str(DEBUG)) == 'True'
+
+# Metrics endpoint (/metrics); scrapers send this as a bearer token when set,
+# and without one the endpoint is only served when DEBUG is on.
+# Under several workers also export PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py).
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Background jobs (backend/jobs/queue.py), worked off by the run_jobs command
+# Also run jobs in the enqueuing process after commit, so a deployment without
+# a worker still releases cancelled slots; set to False when run_jobs is running
+JOBS_RUN_INLINE = os.getenv('JOBS_RUN_INLINE', 'True') == 'True'
+# Jobs a worker claims at a time
+JOBS_BATCH_SIZE = int(os.getenv('JOBS_BATCH_SIZE', '100'))
+# Seconds a worker waits before looking again when no job is due
+JOBS_POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', '1.0'))
+# Attempts before a failing job is marked Failed; the delay before the
+# next attempt starts at JOBS_RETRY_DELAY seconds and doubles each time
+JOBS_MAX_ATTEMPTS = int(os.getenv('JOBS_MAX_ATTEMPTS', '5'))
+JOBS_RETRY_DELAY = int(os.getenv('JOBS_RETRY_DELAY', '30'))
+# Seconds after which a running job is assumed lost with its worker and queued again
+JOBS_LOCK_TIMEOUT = int(os.getenv('JOBS_LOCK_TIMEOUT', '300'))
+
+# Email (appointment reminders); under DEBUG messages are printed to the console
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND',
+    'django.core.mail.backends.console.EmailBackend' if DEBUG else 'django.core.mail.backends.smtp.EmailBackend'
+)
+# Directory django.core.mail.backends.filebased.EmailBackend writes messages to
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False') == 'True'
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER or 'webmaster@localhost')
+SITE_NAME = os.getenv('SITE_NAME', 'Nextdoor Saloon')
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000').rstrip('/')
+
+# Appointment reminders (send_reminders command)
+# Hours ahead whose appointments are reminded on each run
+REMINDER_WINDOW_HOURS = int(os.getenv('REMINDER_WINDOW_HOURS', '24'))
+# Messages sent over one mail connection
+REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', '500'))
+
+# Appointment sweeper (sweep_appointments command)
+# Hours after booking that an unpaid Pending appointment is cancelled and
+# its slots released; 0 keeps unpaid bookings until their day passes
+UNPAID_HOLD_HOURS = int(os.getenv('UNPAID_HOLD_HOURS', '0'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'salon.sql': {
+            'handlers': ['console'],
+            'level': os.getenv('SQL_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        'salon.jobs': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'salon.reminders': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'salon.holds': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
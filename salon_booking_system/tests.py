@@ -0,0 +1,68 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from backend.accounts.models import User
+
+from .middleware import QueryInstrumentationMiddleware, QueryRecorder, fingerprint
+
+
+@override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=1.0, SQL_N_PLUS_ONE_THRESHOLD=3,
+                   SQL_INSTRUMENTATION_HEADERS=True)
+class QueryInstrumentationTests(TestCase):
+    """Per-request query counting and N+1 detection."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f'user{index}') for index in range(4)]
+
+    def run_view(self, view):
+        middleware = QueryInstrumentationMiddleware(view)
+        return middleware(RequestFactory().get('/api/things/'))
+
+    def test_fingerprint_collapses_in_lists(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            fingerprint('SELECT * FROM t WHERE id IN (%s,%s)')
+        )
+        self.assertNotEqual(fingerprint('SELECT a FROM t'), fingerprint('SELECT b FROM t'))
+
+    def test_recorder_reports_repeats_most_first(self):
+        recorder = QueryRecorder()
+        for sql in ['A'] * 3 + ['B'] * 5 + ['C']:
+            recorder.add(sql, 0.001)
+        self.assertEqual(recorder.count, 9)
+        self.assertEqual(recorder.repeated(3), [('B', 5), ('A', 3)])
+
+    def test_counts_queries_into_headers(self):
+        def view(request):
+            list(User.objects.all())
+            User.objects.count()
+            return HttpResponse()
+
+        with self.assertLogs('salon.sql', 'INFO') as logs:
+            response = self.run_view(view)
+        self.assertEqual(response['X-SQL-Queries'], '2')
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+        self.assertFalse(response.has_header('X-SQL-Repeated'))
+        self.assertIn('queries=2', logs.output[0])
+
+    def test_warns_about_repeated_queries(self):
+        def view(request):
+            for user in self.users:
+                User.objects.get(id=user.id)
+            return HttpResponse()
+
+        with self.assertLogs('salon.sql', 'INFO') as logs:
+            response = self.run_view(view)
+        self.assertEqual(response['X-SQL-Repeated'], '4x')
+        self.assertTrue(any('Possible N+1' in line for line in logs.output))
+
+    @override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_left_alone(self):
+        def view(request):
+            User.objects.count()
+            return HttpResponse()
+
+        with self.assertNoLogs('salon.sql'):
+            response = self.run_view(view)
+        self.assertFalse(response.has_header('X-SQL-Queries'))
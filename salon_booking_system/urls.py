@@ -5,6 +5,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from backend.api.metrics import metrics_view
 from .views import home_view
 
 urlpatterns = [
@@ -16,6 +17,7 @@ urlpatterns = [
     path('appointments/', include('backend.appointments.urls')),
     path('schedules/', include('backend.schedules.urls')),
     path('api/', include('backend.api.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Serve static and media files in development
@@ -1,8 +1,8 @@
 from django.shortcuts import render
-from backend.services.models import Service
+from backend.services.catalog import get_active_services
 
 
 def home_view(request):
     """Display home page with featured services."""
-    services = Service.objects.filter(is_active=True)[:4]  # Show first 4 services
+    services = get_active_services()[:4]  # Show first 4 services
     return render(request, 'home.html', {'services': services})